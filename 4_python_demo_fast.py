@@ -6,9 +6,10 @@ from API import APIWorldCoordinates, Area, EnvironmentGen, GridLocation, LongLat
     WebPathOwner, WebSpaceOwner, generate_config, generate_output
 from Demos.Priority import PriorityAllocator, PriorityPathBiddingStrategy, PriorityPathValueFunction, \
     PriorityPaymentRule, PrioritySpaceBiddingStrategy, PrioritySpaceValueFunction
-from Simulator import Coordinate4D, Mechanism, Simulator
+from Simulator import Coordinate4D, Mechanism, Simulator, setup_logging
 
 random.seed(3)
+setup_logging()
 
 """
 Environment
@@ -12,9 +12,10 @@ from Demos.FCFS.BiddingStrategy.FCFSSpaceBiddingStrategy import FCFSSpaceBidding
 from Demos.FCFS.PaymentRule.FCFSPaymentRule import FCFSPaymentRule
 from Demos.Priority import PriorityAllocator, PriorityPaymentRule, PriorityPathBiddingStrategy, \
     PriorityPathValueFunction, PrioritySpaceBiddingStrategy, PrioritySpaceValueFunction
-from Simulator import Simulator, Coordinate4D, Mechanism
+from Simulator import Simulator, Coordinate4D, Mechanism, setup_logging
 
 random.seed(3)
+setup_logging()
 
 TIMESTEPS = 4000
 ALLOCATION_PERIOD = 1000
@@ -125,8 +126,9 @@ for i in range(len(allocators)):
 
     # Run simulation for as long as ticks are left
     start = time_ns()
+    simulator.skip_idle_ticks()
     while simulator.tick():
-        pass
+        simulator.skip_idle_ticks()
     simulation_time = time_ns() - start
 
     # Generate config that can be interpreted by API
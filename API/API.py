@@ -2,9 +2,9 @@
 Run server using >>> uvicorn API:app --reload
 App runs on 'https://localhost:8000/'
 """
+import logging
 import random
 import time
-import traceback
 from typing import Any, Dict, TYPE_CHECKING
 
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
@@ -19,6 +19,8 @@ from .config import available_allocators
 if TYPE_CHECKING:
     from .Generator.Generator import Generator
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI()
 
 random.seed(2)
@@ -99,7 +101,6 @@ def get_value_functions(allocator, bidding_strategy):
 
 @app.get("/biddingStrategies/{allocator}")
 def get_strategies_for_allocator(allocator):
-    print(available_allocators[0])
     allocators = list(filter(lambda x: (x.__name__ == allocator), available_allocators))
     if len(allocators) != 1:
         return []
@@ -120,9 +121,9 @@ async def simulate(config: "APISimulationConfig", client_id: str):
     try:
         generator, duration = await run_from_config(config, cm, client_id)
     except ValueError as e:
-        traceback.print_exc()
+        logger.exception("Simulation failed")
         raise HTTPException(status_code=404, detail=str(e))
-    print("--Simulation Completed--")
+    logger.info("--Simulation Completed--")
     if generator.simulator.time_step != generator.simulator.environment.dimension.t + 1:
         raise HTTPException(status_code=400, detail="Client aborted: Websocket disconnected")
     return build_json(config.model_dump(), generator, duration)
@@ -144,7 +145,7 @@ async def websocket(_websocket: WebSocket, client_id: str):
     try:
         while True:
             data = await _websocket.receive_text()
-            print(data)
+            logger.debug("Received from %s: %s", client_id, data)
     except WebSocketDisconnect:
         cm.disconnect(client_id=client_id)
-        print(client_id + " disconnected")
+        logger.info("%s disconnected", client_id)
@@ -0,0 +1,70 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Dict, List, Optional
+
+# Part of every key, increase it if the format of the cached buildings changes
+CACHE_VERSION = 1
+
+
+class BuildingCache:
+    """
+    On-disk cache of the parsed buildings of map tiles.
+    The buildings are stored in longitude / latitude, so they are independent of the playing field and the resolution
+    they are converted to. Entries are addressed by the hash of everything the response depends on, the tile and the
+    Overpass query. A changed query therefore never returns stale buildings.
+    """
+
+    def __init__(self, directory: str):
+        """
+        :param directory: created on the first write
+        """
+        self.directory: str = directory
+
+    @staticmethod
+    def key(zxy: List[int], query: str) -> str:
+        """
+        Returns the content address of the buildings of a tile.
+        :param zxy:
+        :param query: the Overpass query of the tile
+        :return:
+        """
+        content = json.dumps({"version": CACHE_VERSION, "zxy": list(zxy), "query": query}, sort_keys=True)
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Returns the cached buildings, None if they are not cached or the entry is unreadable.
+        :param key:
+        :return:
+        """
+        try:
+            with open(self.path(key), "r") as f:
+                return json.load(f)["buildings"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put(self, key: str, buildings: List[Dict[str, Any]], zxy: List[int]):
+        """
+        Stores buildings. The entry is written to a temporary file and moved into place, so concurrent readers never
+        see a partially written entry.
+        :param key:
+        :param buildings:
+        :param zxy: stored with the buildings to make the entry readable
+        :return:
+        """
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "w") as f:
+                json.dump({"zxy": list(zxy), "buildings": buildings}, f)
+            os.replace(temporary_path, path)
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
@@ -0,0 +1,183 @@
+import math
+import random
+from typing import Any, Dict, List, Optional, TYPE_CHECKING, Type
+
+from Simulator import BuildingBlocker, Coordinate3D, Coordinate4D, DynamicBlocker
+from ..GridLocation.GridLocation import GridLocation
+from ..GridLocation.GridLocationType import GridLocationType
+from ..WebClasses.Owners.WebPathOwner import WebPathOwner
+
+if TYPE_CHECKING:
+    from Simulator import BiddingStrategy, ValueFunction
+    from Simulator.Blocker.Blocker import Blocker
+
+
+class CityGen:
+    """
+    Procedurally generates a city without network access, as replacement for the buildings of the map tiles.
+    The map is divided into square blocks separated by streets. Every block is divided into lots, each lot is built
+    with the probability `density`. The heights of the buildings are log-normal distributed.
+    Weather fronts are walls spanning the full height that move across the map.
+    Everything is generated by a random generator seeded with `seed`, so the same parameters always result in the
+    same city.
+    """
+
+    def __init__(self,
+                 dimensions: "Coordinate4D",
+                 seed: int = 0,
+                 density: float = 0.5,
+                 block_size: int = 60,
+                 street_width: int = 10,
+                 min_building_size: int = 8,
+                 max_building_size: int = 25,
+                 median_height: float = 0.2,
+                 height_sigma: float = 0.5,
+                 max_height: float = 0.9,
+                 weather_fronts: int = 0,
+                 front_width: int = 20,
+                 front_ticks_per_step: int = 2):
+        """
+        :param dimensions: dimensions of the environment in voxels
+        :param seed:
+        :param density: probability that a lot is built, between 0 and 1
+        :param block_size: side length of the blocks between the streets
+        :param street_width:
+        :param min_building_size: minimum side length of a building
+        :param max_building_size: maximum side length of a building, which is also the side length of a lot
+        :param median_height: median height of the buildings as fraction of the height of the map
+        :param height_sigma: standard deviation of the logarithm of the heights, 0 builds all at the median height
+        :param max_height: maximum height of the buildings as fraction of the height of the map
+        :param weather_fronts: number of weather fronts
+        :param front_width: thickness of a weather front in the direction it moves
+        :param front_ticks_per_step: number of ticks a weather front needs to move by one voxel
+        """
+        if not 0 <= density <= 1:
+            raise Exception(f"Density must be between 0 and 1, got {density}.")
+        if not 0 < min_building_size <= max_building_size <= block_size:
+            raise Exception("Building sizes must be positive and not exceed each other or the block size.")
+        self.dimensions: "Coordinate4D" = dimensions
+        self.seed: int = seed
+        self.density: float = density
+        self.block_size: int = block_size
+        self.street_width: int = street_width
+        self.min_building_size: int = min_building_size
+        self.max_building_size: int = max_building_size
+        self.median_height: float = median_height
+        self.height_sigma: float = height_sigma
+        self.max_height: float = max_height
+        self.weather_fronts: int = weather_fronts
+        self.front_width: int = front_width
+        self.front_ticks_per_step: int = front_ticks_per_step
+
+    def building_height(self, rng: random.Random) -> float:
+        height = self.dimensions.y * self.median_height * math.exp(rng.gauss(0, self.height_sigma))
+        return min(max(height, 1.), self.dimensions.y * self.max_height)
+
+    def buildings(self) -> List["BuildingBlocker"]:
+        """
+        Returns the buildings of the city.
+        :return:
+        """
+        rng = random.Random(f"{self.seed}-buildings")
+        buildings: List["BuildingBlocker"] = []
+        block_step = self.block_size + self.street_width
+        lots_per_block = max(self.block_size // self.max_building_size, 1)
+        lot_size = self.block_size / lots_per_block
+        for block_x in range(0, math.floor(self.dimensions.x), block_step):
+            for block_z in range(0, math.floor(self.dimensions.z), block_step):
+                for lot_x in range(lots_per_block):
+                    for lot_z in range(lots_per_block):
+                        if rng.random() >= self.density:
+                            continue
+                        size_x = rng.randint(self.min_building_size, min(self.max_building_size, math.floor(lot_size)))
+                        size_z = rng.randint(self.min_building_size, min(self.max_building_size, math.floor(lot_size)))
+                        min_x = block_x + lot_x * lot_size + rng.uniform(0, lot_size - size_x)
+                        min_z = block_z + lot_z * lot_size + rng.uniform(0, lot_size - size_z)
+                        max_x = min(min_x + size_x, self.dimensions.x)
+                        max_z = min(min_z + size_z, self.dimensions.z)
+                        if max_x - min_x < 1 or max_z - min_z < 1:
+                            continue
+                        height = self.building_height(rng)
+                        vertices = [[min_x, min_z], [max_x, min_z], [max_x, max_z], [min_x, max_z], [min_x, min_z]]
+                        bounds = [Coordinate3D(min_x, 0, min_z), Coordinate3D(max_x, height, max_z)]
+                        buildings.append(BuildingBlocker(vertices, bounds, [], osm_id=-len(buildings) - 1))
+        return buildings
+
+    def fronts(self) -> List["DynamicBlocker"]:
+        """
+        Returns the weather fronts. Each front spans half of the map and moves once across it along the x or z axis,
+        starting at a random tick in the first half of the simulation.
+        :return:
+        """
+        rng = random.Random(f"{self.seed}-fronts")
+        fronts: List["DynamicBlocker"] = []
+        dimension_x, dimension_z = math.floor(self.dimensions.x), math.floor(self.dimensions.z)
+        for _ in range(self.weather_fronts):
+            along_x = rng.random() < 0.5
+            distance = dimension_x if along_x else dimension_z
+            length = (dimension_z if along_x else dimension_x) // 2
+            offset = rng.randint(0, length)
+            start_tick = rng.randint(0, self.dimensions.t // 2)
+            end_tick = min(start_tick + max(distance - self.front_width, 0) * self.front_ticks_per_step,
+                           self.dimensions.t)
+            locations = []
+            for t in range(start_tick, end_tick + 1):
+                progress = (t - start_tick) // self.front_ticks_per_step
+                locations.append(Coordinate4D(progress, 0, offset, t) if along_x else
+                                 Coordinate4D(offset, 0, progress, t))
+            dimension = Coordinate3D(self.front_width, self.dimensions.y, length) if along_x else \
+                Coordinate3D(length, self.dimensions.y, self.front_width)
+            fronts.append(DynamicBlocker(locations, dimension))
+        return fronts
+
+    def blockers(self) -> List["Blocker"]:
+        """
+        Returns the buildings and the weather fronts.
+        :return:
+        """
+        return [*self.buildings(), *self.fronts()]
+
+    def path_owners(self,
+                    nr_owners: int,
+                    nr_agents: int,
+                    allocation_period: int,
+                    bidding_strategy: Type["BiddingStrategy"],
+                    value_function: Type["ValueFunction"],
+                    nr_stops: int = 2,
+                    near_radius: int = 1,
+                    battery: Optional[int] = None,
+                    speed: int = 1,
+                    config: Optional[Dict[str, Any]] = None) -> List["WebPathOwner"]:
+        """
+        Returns path owners with random stops, which together create nr_agents agents at random ticks of the
+        allocation period. Unlike owners of a config, the number of agents per owner is not limited.
+        The creation ticks are seeded, the positions of the stops are drawn from the global random generator while
+        the agents are created, like for all web owners.
+        :param nr_owners:
+        :param nr_agents: total number of agents of all owners
+        :param allocation_period: ticks in which the agents are created
+        :param bidding_strategy:
+        :param value_function:
+        :param nr_stops: number of stops of every agent
+        :param near_radius:
+        :param battery: defaults to the number of ticks of the simulation
+        :param speed:
+        :param config: config of the bidding strategy, e.g. the priority of the owners
+        :return:
+        """
+        rng = random.Random(f"{self.seed}-owners")
+        owners: List["WebPathOwner"] = []
+        for index in range(nr_owners):
+            agents = nr_agents // nr_owners + (1 if index < nr_agents % nr_owners else 0)
+            owners.append(WebPathOwner(str(index),
+                                       f"Synthetic {index}",
+                                       f"#{rng.randint(0, 0xffffff):06x}",
+                                       [GridLocation(str(GridLocationType.RANDOM.value)) for _ in range(nr_stops)],
+                                       [rng.randint(0, allocation_period - 1) for _ in range(agents)],
+                                       bidding_strategy(),
+                                       value_function(),
+                                       near_radius=near_radius,
+                                       battery=battery if battery is not None else self.dimensions.t,
+                                       speed=speed,
+                                       config=config))
+        return owners
@@ -1,10 +1,12 @@
 from typing import List, Optional, TYPE_CHECKING
 
 from Simulator import Environment
+from .OverpassClient import OverpassClient
 
 if TYPE_CHECKING:
     from Simulator.Blocker.Blocker import Blocker
     from Simulator import Coordinate4D
+    from .CityGen import CityGen
     from .MapTile import MapTile
     from API.Area import Area
 
@@ -14,17 +16,35 @@ class EnvironmentGen:
     def __init__(self,
                  dimensions: "Coordinate4D",
                  maptiles: List["MapTile"],
-                 map_area: "Area",
-                 blockers: Optional[List["Blocker"]] = None
+                 map_area: Optional["Area"],
+                 blockers: Optional[List["Blocker"]] = None,
+                 city: Optional["CityGen"] = None,
+                 overpass: Optional["OverpassClient"] = None
                  ):
+        """
+        :param dimensions:
+        :param maptiles: tiles whose buildings are requested from the Overpass API
+        :param map_area: only optional for a synthetic city
+        :param blockers: additional blockers
+        :param city: generates the buildings offline instead of requesting the buildings of the tiles
+        :param overpass: requests the buildings of the tiles, the default client if not given
+        """
         self.dimensions = dimensions
         self.maptiles = maptiles
         self.map_area = map_area
         self.blockers = [] if blockers is None else blockers
+        self.city = city
+        self.overpass = overpass
 
     def generate(self) -> "Environment":
         blockers = [*self.blockers]
-        for tile in self.maptiles:
-            blockers += tile.resolve_buildings(self.map_area)
-        env = Environment(self.dimensions, blockers, min_height=self.map_area.min_height)
+        if self.city is not None:
+            blockers += self.city.blockers()
+        else:
+            overpass = self.overpass if self.overpass is not None else OverpassClient.default()
+            buildings = overpass.buildings(self.maptiles)
+            for tile in self.maptiles:
+                blockers += tile.resolve_buildings(self.map_area, buildings[(tile.z, tile.x, tile.y)])
+        min_height = self.map_area.min_height if self.map_area is not None else 0
+        env = Environment(self.dimensions, blockers, min_height=min_height)
         return env
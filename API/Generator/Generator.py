@@ -1,3 +1,4 @@
+import logging
 import random
 from typing import Dict, List, Optional, TYPE_CHECKING
 
@@ -11,6 +12,8 @@ from ..GridLocation.HeatmapType import HeatmapType
 from ..WebClasses.Owners.WebPathOwner import WebPathOwner
 from ..WebClasses.Owners.WebSpaceOwner import WebSpaceOwner
 
+logger = logging.getLogger(__name__)
+
 if TYPE_CHECKING:
     from .MapTile import MapTile
     from Simulator import Owner, Environment, PaymentRule, Coordinate2D
@@ -30,7 +33,8 @@ class Generator:
                  payment_rule: "PaymentRule",
                  allocation_period: int,
                  connection_manager: "Optional[ConnectionManager]" = None,
-                 client_id: "Optional[str]" = ""):
+                 client_id: "Optional[str]" = "",
+                 environment: "Optional[Environment]" = None):
         self.connection_manager = connection_manager
         self.client_id = client_id
         self.total_agents = sum([owner.agents for owner in owners])
@@ -38,9 +42,8 @@ class Generator:
         self.owners: List["Owner"] = []
         self.allocator: "WebAllocator" = allocator
         self.allocation_period: int = allocation_period
-        self.environment: "Environment" = EnvironmentGen(dimensions,
-                                                         maptiles,
-                                                         map_area=map_playing_field_area).generate()
+        self.environment: "Environment" = environment if environment is not None else \
+            EnvironmentGen(dimensions, maptiles, map_area=map_playing_field_area).generate()
         self.simulator: Optional["Simulator"] = None
         self.map_playing_field_area = map_playing_field_area
         self.payment_rule = payment_rule
@@ -79,7 +82,6 @@ class Generator:
                 raise Exception(f"{len(bidding_strategy)} bidding strategies found")
             selected_bidding_strategy = bidding_strategy[0]()
 
-            print(api_owner.valueFunction)
             value_functions = [vf for vf in selected_bidding_strategy.compatible_value_functions() if
                                vf.__name__ == api_owner.valueFunction]
             if len(value_functions) != 1:
@@ -141,23 +143,24 @@ class Generator:
 
     async def simulate(self):
         self.init_simulation()
+        self.simulator.skip_idle_ticks()
         while self.simulator.tick():
+            self.simulator.skip_idle_ticks()
             if self.connection_manager:
                 tick = await self.connection_manager.tick(client_id=self.client_id,
                                                           percentage=len(self.environment.agents) / self.total_agents)
                 if not tick:
                     break
 
-        print(f"DONE!")
-        print(f"STEP: {self.simulator.time_step}")
+        logger.info("DONE! STEP: %s", self.simulator.time_step)
 
     def simulate_cli(self):
         self.init_simulation()
+        self.simulator.skip_idle_ticks()
         while self.simulator.tick():
-            pass
+            self.simulator.skip_idle_ticks()
 
-        print(f"DONE!")
-        print(f"STEP: {self.simulator.time_step}")
+        logger.info("DONE! STEP: %s", self.simulator.time_step)
 
     @staticmethod
     def creation_ticks(duration, total) -> List[int]:
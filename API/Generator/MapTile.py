@@ -1,16 +1,15 @@
-from typing import List, TYPE_CHECKING, Tuple
+from typing import Any, Dict, List, Optional, TYPE_CHECKING, Tuple
 
-import requests
 import mpmath as mp
 
 from API.Area import Area
 from API.LongLatCoordinate import LongLatCoordinate
 from Simulator import BuildingBlocker, Coordinate3D
+from .OverpassClient import OverpassClient
 
 if TYPE_CHECKING:
     from API.Types import APIWorldCoordinates
 
-OVERPASS_URL = "https://overpass-api.de/api/interpreter"
 DEFAULT_BUILDING_HEIGHT_M = 10
 METERS_PER_LEVEL = 3
 
@@ -67,12 +66,42 @@ class MapTile:
                 pass
         return DEFAULT_BUILDING_HEIGHT_M
 
-    def _geom_to_grid(self, geom: list, map_playfield_area: Area) -> list:
-        return [
-            map_playfield_area.lon_lat_to_grid(LongLatCoordinate(pt["lon"], pt["lat"]))
-            for pt in geom
-            if "lat" in pt and "lon" in pt
-        ]
+    @staticmethod
+    def _geom_to_lon_lat(geom: list) -> List[List[float]]:
+        return [[pt["lon"], pt["lat"]] for pt in geom if "lat" in pt and "lon" in pt]
+
+    @staticmethod
+    def parse_buildings(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Extracts the buildings of an Overpass API response.
+        :param data: response of the overpass query
+        :return: buildings with id, height in meters and outline and holes in longitude / latitude
+        """
+        buildings = []
+        for element in data.get("elements", []):
+            if element["type"] == "way":
+                outline = MapTile._geom_to_lon_lat(element.get("geometry", []))
+                holes = []
+
+            elif element["type"] == "relation":
+                members = element.get("members", [])
+                outers = [m for m in members if m.get("role") == "outer" and m.get("geometry")]
+                inners = [m for m in members if m.get("role") == "inner" and m.get("geometry")]
+                if not outers:
+                    continue
+                outline = MapTile._geom_to_lon_lat(outers[0]["geometry"])
+                holes = [MapTile._geom_to_lon_lat(m["geometry"]) for m in inners]
+
+            else:
+                continue
+
+            buildings.append({"id": element.get("id", 0), "height": MapTile._parse_height(element.get("tags", {})),
+                              "outline": outline, "holes": holes})
+        return buildings
+
+    @staticmethod
+    def _lon_lat_to_grid(points: List[List[float]], map_playfield_area: Area) -> list:
+        return [map_playfield_area.lon_lat_to_grid(LongLatCoordinate(lon, lat)) for lon, lat in points]
 
     def _build_blocker(self, coords: list, holes: list, height_m: float,
                        map_playfield_area: Area, element_id: int):
@@ -89,49 +118,23 @@ class MapTile:
             return None
         return BuildingBlocker(coords, bounds, holes, element_id)
 
-    def resolve_buildings(self, map_playfield_area: Area):
+    def resolve_buildings(self, map_playfield_area: Area, buildings: Optional[List[Dict[str, Any]]] = None):
         """
-        Extract building information via Overpass API and convert to building blockers.
+        Converts the buildings of the tile to building blockers on the playing field.
+        :param map_playfield_area:
+        :param buildings: parsed buildings of the tile, requested with the default OverpassClient if not given
         :return: BuildingBlocker[]
         """
         if len(self.blockers) > 0:
             return self.blockers
-        try:
-            resp = requests.post(
-                OVERPASS_URL,
-                data={"data": self.overpass_query},
-                timeout=35,
-            )
-            resp.raise_for_status()
-            data = resp.json()
-        except Exception as e:
-            print(f"Overpass API error: {e}")
-            return []
+        if buildings is None:
+            buildings = OverpassClient.default().buildings([self])[(self.z, self.x, self.y)]
 
         res = []
-        for element in data.get("elements", []):
-            tags = element.get("tags", {})
-            height_m = self._parse_height(tags)
-            element_id = element.get("id", 0)
-
-            if element["type"] == "way":
-                geom = element.get("geometry", [])
-                coords = self._geom_to_grid(geom, map_playfield_area)
-                blocker = self._build_blocker(coords, [], height_m, map_playfield_area, element_id)
-
-            elif element["type"] == "relation":
-                members = element.get("members", [])
-                outers = [m for m in members if m.get("role") == "outer" and m.get("geometry")]
-                inners = [m for m in members if m.get("role") == "inner" and m.get("geometry")]
-                if not outers:
-                    continue
-                coords = self._geom_to_grid(outers[0]["geometry"], map_playfield_area)
-                holes = [self._geom_to_grid(m["geometry"], map_playfield_area) for m in inners]
-                blocker = self._build_blocker(coords, holes, height_m, map_playfield_area, element_id)
-
-            else:
-                continue
-
+        for building in buildings:
+            coords = self._lon_lat_to_grid(building["outline"], map_playfield_area)
+            holes = [self._lon_lat_to_grid(hole, map_playfield_area) for hole in building["holes"]]
+            blocker = self._build_blocker(coords, holes, building["height"], map_playfield_area, building["id"])
             if blocker is not None:
                 res.append(blocker)
 
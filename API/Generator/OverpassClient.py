@@ -0,0 +1,123 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, TYPE_CHECKING, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .BuildingCache import BuildingCache
+
+logger = logging.getLogger(__name__)
+
+if TYPE_CHECKING:
+    from .MapTile import MapTile
+
+OVERPASS_URL = "https://overpass-api.de/api/interpreter"
+DEFAULT_CACHE_DIRECTORY = os.path.join(os.path.expanduser("~"), ".cache", "simulator", "overpass")
+
+
+class OverpassClient:
+    """
+    Requests the buildings of map tiles from the Overpass API.
+    Buildings are looked up in the on-disk cache first, the missing tiles are requested concurrently through one
+    pooled session. Failed requests are logged and not cached, their tiles have no buildings.
+    The url can point to any server answering like the Overpass API, e.g. a local stand-in in tests.
+    """
+
+    _default: Optional["OverpassClient"] = None
+
+    def __init__(self,
+                 url: str = OVERPASS_URL,
+                 cache_directory: Optional[str] = DEFAULT_CACHE_DIRECTORY,
+                 max_workers: int = 8,
+                 timeout: float = 35):
+        """
+        :param url:
+        :param cache_directory: None disables the cache
+        :param max_workers: maximum number of concurrent requests
+        :param timeout: timeout of a request in seconds
+        """
+        self.url: str = url
+        self.cache: Optional[BuildingCache] = BuildingCache(cache_directory) if cache_directory is not None else None
+        self.max_workers: int = max_workers
+        self.timeout: float = timeout
+        self.session: requests.Session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @staticmethod
+    def default() -> "OverpassClient":
+        """
+        Returns the client used to resolve map tiles if no client is given.
+        :return:
+        """
+        if OverpassClient._default is None:
+            OverpassClient._default = OverpassClient()
+        return OverpassClient._default
+
+    @staticmethod
+    def set_default(client: Optional["OverpassClient"]):
+        """
+        Replaces the default client, None restores a client with the default settings.
+        :param client:
+        :return:
+        """
+        OverpassClient._default = client
+
+    def fetch(self, tile: "MapTile") -> Optional[Dict[str, Any]]:
+        """
+        Requests the buildings of a tile, returns the response or None if the request failed.
+        :param tile:
+        :return:
+        """
+        try:
+            response = self.session.post(self.url, data={"data": tile.overpass_query}, timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            logger.warning("Overpass API error for tile %s: %s", tile, e)
+            return None
+
+    def _resolve_missing(self, tile: "MapTile", key: str) -> Optional[List[Dict[str, Any]]]:
+        data = self.fetch(tile)
+        if data is None:
+            return None
+        buildings = tile.parse_buildings(data)
+        if self.cache is not None:
+            self.cache.put(key, buildings, tile.zxy)
+        return buildings
+
+    def buildings(self, tiles: List["MapTile"]) -> Dict[Tuple[int, int, int], List[Dict[str, Any]]]:
+        """
+        Returns the parsed buildings of the tiles by their z, x, y.
+        :param tiles:
+        :return:
+        """
+        result: Dict[Tuple[int, int, int], List[Dict[str, Any]]] = {}
+        missing: Dict[Tuple[int, int, int], Tuple["MapTile", str]] = {}
+        for tile in tiles:
+            zxy = (tile.z, tile.x, tile.y)
+            if zxy in result or zxy in missing:
+                continue
+            key = BuildingCache.key(tile.zxy, tile.overpass_query)
+            cached = self.cache.get(key) if self.cache is not None else None
+            if cached is not None:
+                result[zxy] = cached
+            else:
+                missing[zxy] = (tile, key)
+
+        if len(missing) > 0:
+            logger.info("Requesting the buildings of %s tiles, %s were cached.", len(missing), len(result))
+            with ThreadPoolExecutor(max_workers=max(min(self.max_workers, len(missing)), 1)) as executor:
+                futures = {zxy: executor.submit(self._resolve_missing, tile, key)
+                           for zxy, (tile, key) in missing.items()}
+                failed = 0
+                for zxy, future in futures.items():
+                    buildings = future.result()
+                    failed += buildings is None
+                    result[zxy] = buildings if buildings is not None else []
+            if failed > 0:
+                logger.warning("%s of %s tiles could not be requested and have no buildings.", failed, len(missing))
+        return result
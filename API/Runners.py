@@ -1,21 +1,29 @@
 import time
-from typing import List, Optional, TYPE_CHECKING, Tuple
+from typing import Any, Dict, List, Optional, TYPE_CHECKING, Tuple
 
 from Simulator import Coordinate4D
 from .Area import Area
+from .Generator.CityGen import CityGen
+from .Generator.EnvironmentGen import EnvironmentGen
 from .Generator.Generator import Generator
 from .Generator.MapTile import MapTile
+from .Generator.OverpassClient import OverpassClient
 from .Types import APIWorldCoordinates
 from .config import available_allocators
 
 if TYPE_CHECKING:
+    from Simulator import Environment, Tracer
     from .API import ConnectionManager
     from .Types import APISimulationConfig
 
 
-def init_generator(config: "APISimulationConfig",
-                   connection_manager: Optional["ConnectionManager"] = None,
-                   client_id: Optional[str] = None) -> "Generator":
+def init_map(config: "APISimulationConfig") -> Tuple[List["MapTile"], "Area", "Coordinate4D"]:
+    """
+    Computes the map tiles, the playing field and the dimensions of the environment of a config.
+    Fills in the tiles and the bounding box of the map of the config.
+    :param config:
+    :return: map tiles, playing field area, dimensions
+    """
     maptiles: List["MapTile"] = MapTile.tiles_from_coordinates(config.map.coordinates, config.map.neighbouringTiles,
                                                                config.map.resolution)
     config.map.tiles = [tile.zxy for tile in maptiles]
@@ -41,6 +49,67 @@ def init_generator(config: "APISimulationConfig",
                               config.map.height / map_playing_field_area.resolution,
                               size[1],
                               config.map.timesteps)
+    return maptiles, map_playing_field_area, dimensions
+
+
+def init_environment(config: "APISimulationConfig",
+                     maptiles: List["MapTile"],
+                     map_playing_field_area: "Area",
+                     dimensions: "Coordinate4D") -> "Environment":
+    """
+    Builds the environment of a config, with the buildings of the map tiles or a synthetic city if configured.
+    :param config:
+    :param maptiles:
+    :param map_playing_field_area:
+    :param dimensions:
+    :return:
+    """
+    city = None
+    synthetic = config.map.synthetic
+    if synthetic is not None:
+        city = CityGen(dimensions, seed=synthetic.seed, density=synthetic.density, block_size=synthetic.blockSize,
+                       street_width=synthetic.streetWidth, min_building_size=synthetic.minBuildingSize,
+                       max_building_size=synthetic.maxBuildingSize, median_height=synthetic.medianHeight,
+                       height_sigma=synthetic.heightSigma, max_height=synthetic.maxHeight,
+                       weather_fronts=synthetic.weatherFronts)
+    return EnvironmentGen(dimensions, maptiles, map_area=map_playing_field_area, city=city).generate()
+
+
+def warm_overpass_cache(configs: List[Dict[str, Any]], overpass: Optional["OverpassClient"] = None) -> int:
+    """
+    Requests the buildings of the map tiles of the configs that are not cached yet, so simulations of the configs
+    start without waiting for the Overpass API. Configs with a synthetic city are skipped.
+    :param configs: configs as stored in JSON, e.g. the prefabs. Only the coordinates, neighbouring tiles and
+    resolution of the map are used
+    :param overpass: the default client if not given
+    :return: number of distinct map tiles of the configs
+    """
+    maptiles: List["MapTile"] = []
+    for config in configs:
+        map_config = config["map"]
+        if map_config.get("synthetic") is None:
+            maptiles += MapTile.tiles_from_coordinates(APIWorldCoordinates(**map_config["coordinates"]),
+                                                       map_config.get("neighbouringTiles", 0),
+                                                       map_config.get("resolution", 1))
+    buildings = (overpass if overpass is not None else OverpassClient.default()).buildings(maptiles)
+    return len(buildings)
+
+
+def init_generator(config: "APISimulationConfig",
+                   connection_manager: Optional["ConnectionManager"] = None,
+                   client_id: Optional[str] = None,
+                   environment: Optional["Environment"] = None) -> "Generator":
+    """
+    Creates the generator for a config.
+    :param config:
+    :param connection_manager:
+    :param client_id:
+    :param environment: environment of the map to simulate on, it is built with `init_environment` if not given
+    :return:
+    """
+    maptiles, map_playing_field_area, dimensions = init_map(config)
+    if environment is None:
+        environment = init_environment(config, maptiles, map_playing_field_area, dimensions)
 
     allocators = list(filter(lambda x: (x.__name__ == config.allocator), available_allocators))
     if len(allocators) != 1:
@@ -55,7 +124,7 @@ def init_generator(config: "APISimulationConfig",
 
     generator = Generator(config.owners, dimensions, maptiles, allocator, map_playing_field_area, selected_payment_rule,
                           allocation_period=config.map.allocationPeriod, connection_manager=connection_manager,
-                          client_id=client_id)
+                          client_id=client_id, environment=environment)
     return generator
 
 
@@ -77,13 +146,16 @@ async def run_from_config(config: "APISimulationConfig",
     return generator, duration
 
 
-def run_from_config_for_cli(config: "APISimulationConfig") -> Tuple[Generator, int]:
+def run_from_config_for_cli(config: "APISimulationConfig",
+                            tracer: Optional["Tracer"] = None) -> Tuple[Generator, int]:
     """
     Runs an AirspaceAuctionSimulation using a config that is generated using the CLI.
     :param config: Configuration object, defining all parameters of the Simulation
+    :param tracer: records the phases of the simulation if given
     :return: Simulated generator, simulation duration in seconds
     """
     generator = init_generator(config)
+    generator.environment.tracer = tracer
     start_time = time.time_ns()
     generator.simulate_cli()
     end_time = time.time_ns()
@@ -0,0 +1,162 @@
+import contextlib
+import functools
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import random
+import time
+import traceback
+from typing import Any, Dict, List, Optional, TYPE_CHECKING, Tuple
+
+from Simulator import flush_logging
+from .API import build_json
+from .Runners import init_environment, init_generator, init_map
+from .Types import APISimulationConfig
+
+if TYPE_CHECKING:
+    from Simulator import Environment
+
+logger = logging.getLogger(__name__)
+
+SweepRun = Tuple[int, Dict[str, Any], "APISimulationConfig"]
+
+# Fields of the map config that determine the environment
+MAP_FIELDS = {"coordinates", "neighbouringTiles", "subselection", "resolution", "height", "timesteps", "minHeight",
+              "synthetic"}
+
+# Environments of the running sweep by map key, inherited by the forked worker processes
+_environments: Dict[str, "Environment"] = {}
+
+
+def map_key(config: "APISimulationConfig") -> str:
+    """
+    Returns a key that is equal for all configs with the same environment.
+    :param config:
+    :return:
+    """
+    return json.dumps(config.map.model_dump(include=MAP_FIELDS), sort_keys=True)
+
+
+def expand_grid(base: "APISimulationConfig", grid: Dict[str, List[Any]]) -> List[SweepRun]:
+    """
+    Returns a config for every combination of the parameter values of the grid.
+    The parameters are dotted paths into the config, e.g. `allocator`, `map.allocationPeriod` or `owners.0.agents`.
+    Parameters that have to change together are joined by commas, e.g. `allocator,paymentRule`, their values are
+    lists with a value per parameter.
+    The parameter `seed` seeds the random generator of a run, by default the index of the run is used.
+    :param base:
+    :param grid: values per parameter
+    :return: index, parameters and config of every run
+    """
+    keys = list(grid.keys())
+    runs: List[SweepRun] = []
+    for index, values in enumerate(itertools.product(*[grid[key] for key in keys])):
+        params = dict(zip(keys, values))
+        data = base.model_dump()
+        for key, value in params.items():
+            joined_keys = key.split(",")
+            for joined_key, joined_value in zip(joined_keys, value if len(joined_keys) > 1 else [value]):
+                if joined_key != "seed":
+                    _set_parameter(data, joined_key.strip(), joined_value)
+        runs.append((index, params, APISimulationConfig(**data)))
+    return runs
+
+
+def _set_parameter(data: Dict[str, Any], path: str, value: Any):
+    parts = path.split(".")
+    target: Any = data
+    try:
+        for part in parts[:-1]:
+            target = target[int(part)] if isinstance(target, list) else target[part]
+        if isinstance(target, list):
+            target[int(parts[-1])] = value
+        elif parts[-1] in target:
+            target[parts[-1]] = value
+        else:
+            raise KeyError(parts[-1])
+    except (KeyError, IndexError, ValueError, TypeError):
+        raise Exception(f"Unknown sweep parameter {path}.")
+
+
+def _run(run: SweepRun, output_dir: str) -> Dict[str, Any]:
+    """
+    Simulates a single run of the sweep on a clone of the environment of its map and writes the output to disk.
+    Exceptions are reported in the returned summary, so a failed run does not stop the sweep.
+    :param run:
+    :param output_dir:
+    :return: summary of the run
+    """
+    index, params, config = run
+    summary: Dict[str, Any] = {"index": index, "params": params}
+    start_time = time.time_ns()
+    try:
+        random.seed(params.get("seed", index))
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            generator = init_generator(config, environment=_environments[map_key(config)].clone())
+            generator.simulate_cli()
+            duration = int((time.time_ns() - start_time) / 1e9)
+            simulation_json = build_json(config.model_dump(), generator, duration)
+        simulation_json["sweep"] = params
+        output_path = os.path.join(output_dir, f"{index:04d}-{config.name}-simulation.json")
+        with open(output_path, "w") as f:
+            json.dump(simulation_json, f)
+        summary["status"] = "ok"
+        summary["output"] = output_path
+    except Exception:
+        summary["status"] = "failed"
+        summary["error"] = traceback.format_exc()
+    summary["duration"] = (time.time_ns() - start_time) / 1e9
+    flush_logging()
+    return summary
+
+
+def run_sweep(base: "APISimulationConfig", grid: Dict[str, List[Any]], output_dir: str,
+              workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Runs the base config for every combination of the parameter values of the grid.
+    The environment of every map is built once and inherited by forked worker processes, so the buildings are only
+    requested once per map. The output of every run is written to `output_dir` as soon as it finishes and a summary
+    line per run is appended to `sweep.jsonl` in the same folder.
+    :param base:
+    :param grid: values per parameter, see `expand_grid`
+    :param output_dir:
+    :param workers: number of worker processes, defaults to the number of CPUs, runs sequentially for 1
+    :return: summaries of all runs ordered by index
+    """
+    global _environments
+    workers = workers if workers is not None else os.cpu_count() or 1
+    os.makedirs(output_dir, exist_ok=True)
+    runs = expand_grid(base, grid)
+
+    _environments = {}
+    summaries: List[Dict[str, Any]] = []
+    try:
+        for _, _, config in runs:
+            key = map_key(config)
+            if key not in _environments:
+                maptiles, map_playing_field_area, dimensions = init_map(config)
+                _environments[key] = init_environment(config, maptiles, map_playing_field_area, dimensions)
+        logger.info("Sweep of %s runs on %s maps with %s workers", len(runs), len(_environments), workers)
+
+        with open(os.path.join(output_dir, "sweep.jsonl"), "a") as log:
+            def record(summary: Dict[str, Any]):
+                summaries.append(summary)
+                log.write(json.dumps(summary) + "\n")
+                log.flush()
+                logger.info("[%s/%s] Run %s %s: %s in %.1fs", len(summaries), len(runs), summary["index"],
+                            summary["params"], summary["status"], summary["duration"], extra={"sweep_run": summary})
+
+            run = functools.partial(_run, output_dir=output_dir)
+            flush_logging()
+            if workers > 1 and len(runs) > 1 and "fork" in multiprocessing.get_all_start_methods():
+                with multiprocessing.get_context("fork").Pool(min(workers, len(runs))) as pool:
+                    for result in pool.imap_unordered(run, runs):
+                        record(result)
+            else:
+                for sweep_run in runs:
+                    record(run(sweep_run))
+    finally:
+        _environments = {}
+    return sorted(summaries, key=lambda summary: summary["index"])
@@ -44,6 +44,19 @@ class APIOwner(BaseModel):
     valueFunction: str
 
 
+class APISyntheticCity(BaseModel):
+    seed: int = 0
+    density: float = Field(0.5, ge=0, le=1)
+    blockSize: int = Field(60, ge=1)
+    streetWidth: int = Field(10, ge=0)
+    minBuildingSize: int = Field(8, ge=1)
+    maxBuildingSize: int = Field(25, ge=1)
+    medianHeight: float = Field(0.2, gt=0, le=1)
+    heightSigma: float = Field(0.5, ge=0)
+    maxHeight: float = Field(0.9, gt=0, le=1)
+    weatherFronts: int = Field(0, ge=0)
+
+
 class APIMap(BaseModel):
     coordinates: APIWorldCoordinates
     locationName: str
@@ -57,6 +70,7 @@ class APIMap(BaseModel):
     tiles: Optional[List[List[int]]] = None
     minHeight: int = Field(ge=0, le=100)
     allocationPeriod: int = Field(ge=1, le=100)
+    synthetic: Optional[APISyntheticCity] = None
 
 
 class APISimulationConfig(BaseModel):
@@ -1,5 +1,7 @@
+import bisect
 from abc import ABC
-from typing import List
+from collections import Counter
+from typing import Dict, List, Optional
 
 
 class WebOwnerMixin(ABC):
@@ -13,3 +15,15 @@ class WebOwnerMixin(ABC):
         self.name: str = name
         self.color: str = color
         self.creation_ticks: List[int] = creation_ticks
+        # Number of agents to generate per tick
+        self.creation_schedule: Dict[int, int] = dict(Counter(creation_ticks))
+        self._schedule_ticks: List[int] = sorted(self.creation_schedule.keys())
+
+    def next_creation_tick(self, t: int) -> Optional[int]:
+        """
+        Returns the first creation tick from t on, None if all agents were created.
+        :param t:
+        :return:
+        """
+        index = bisect.bisect_left(self._schedule_ticks, t)
+        return self._schedule_ticks[index] if index < len(self._schedule_ticks) else None
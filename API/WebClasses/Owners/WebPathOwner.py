@@ -1,3 +1,4 @@
+import logging
 import math
 import random
 from typing import Any, Dict, List, Optional, TYPE_CHECKING
@@ -5,6 +6,8 @@ from typing import Any, Dict, List, Optional, TYPE_CHECKING
 from Simulator import PathAgent, PathOwner
 from .WebOwnerMixin import WebOwnerMixin
 
+logger = logging.getLogger(__name__)
+
 if TYPE_CHECKING:
     from Simulator import BiddingStrategy, ValueFunction, Coordinate4D, Environment
     from ...GridLocation.GridLocation import GridLocation
@@ -48,14 +51,14 @@ class WebPathOwner(WebOwnerMixin, PathOwner):
             coord.y += 1
             if coord.y > env.dimension.y:
                 coord.y = env.min_height
-                print("BLOCKED")
+                logger.debug("No unblocked height for stop at %s", coord)
                 break
 
         return coord
 
     def generate_agents(self, t: int, environment: "Environment") -> List["PathAgent"]:
         res = []
-        for _ in range(self.creation_ticks.count(t)):
+        for _ in range(self.creation_schedule.get(t, 0)):
 
             start = self.generate_stop_coordinate(self.stops[0], environment, t, self.near_radius)
 
@@ -76,7 +79,8 @@ class WebPathOwner(WebOwnerMixin, PathOwner):
             stays.pop()
             agent = self.initialize_agent(locations, stays)
             res.append(agent)
-            print(f"{agent} {' -> '.join([str(loc) for loc in locations])}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("%s %s", agent, " -> ".join([str(loc) for loc in locations]))
 
         self.agents += res
         return res
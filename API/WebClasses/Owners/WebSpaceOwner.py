@@ -1,9 +1,12 @@
+import logging
 import random
 from typing import Any, Dict, List, Optional, TYPE_CHECKING
 
 from Simulator import SpaceAgent, SpaceOwner, SpaceSegment
 from .WebOwnerMixin import WebOwnerMixin
 
+logger = logging.getLogger(__name__)
+
 if TYPE_CHECKING:
     from Simulator import Coordinate4D, BiddingStrategy, ValueFunction, Environment
     from ...GridLocation.GridLocation import GridLocation
@@ -35,7 +38,7 @@ class WebSpaceOwner(WebOwnerMixin, SpaceOwner):
 
     def generate_agents(self, t: int, environment: "Environment") -> List["SpaceAgent"]:
         res = []
-        for _ in range(self.creation_ticks.count(t)):
+        for _ in range(self.creation_schedule.get(t, 0)):
             blocks: List["SpaceSegment"] = []
             for idx, stop in enumerate(self.stops):
                 center = self.generate_stop_coordinates(stop, environment, t)
@@ -46,7 +49,8 @@ class WebSpaceOwner(WebOwnerMixin, SpaceOwner):
                 blocks.append(SpaceSegment(bottom_left, top_right, idx))
             agent = self.initialize_agent(blocks)
             res.append(agent)
-            print(f"{agent} {', '.join([str(block) for block in blocks])}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("%s %s", agent, ", ".join([str(block) for block in blocks]))
 
         self.agents += res
         return res
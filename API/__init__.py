@@ -1,12 +1,15 @@
 from .API import APISimulationConfig, app, build_json
 from .Area import Area
+from .Generator.CityGen import CityGen
 from .Generator.EnvironmentGen import EnvironmentGen
 from .Generator.MapTile import MapTile
+from .Generator.OverpassClient import OverpassClient
 from .GridLocation.GridLocation import GridLocation
 from .GridLocation.Heatmap import InverseSparseHeatmap, MatrixHeatmap, SparseHeatmap
 from .LongLatCoordinate import LongLatCoordinate
-from .Runners import run_from_config, run_from_config_for_cli
-from .Types import APISubselection, APIWorldCoordinates
+from .Runners import run_from_config, run_from_config_for_cli, warm_overpass_cache
+from .Sweep import expand_grid, run_sweep
+from .Types import APISubselection, APISyntheticCity, APIWorldCoordinates
 from .WebClasses.Owners.WebPathOwner import WebPathOwner
 from .WebClasses.Owners.WebSpaceOwner import WebSpaceOwner
 from .config import available_allocators
@@ -0,0 +1,212 @@
+from typing import Any, Callable, Dict, Tuple, TYPE_CHECKING
+
+from Demos.CBS.BiddingStrategy.CBSPathBiddingStrategy import CBSPathBiddingStrategy
+from Demos.CBS.CBSAstar.CBSAstar import CBSAStar
+from Demos.CBS.ValueFunction.CBSPathValueFunction import CBSPathValueFunction
+from Demos.FCFS import FCFSAllocator, FCFSBidTracker, FCFSPathBiddingStrategy, FCFSPathValueFunction, \
+    FCFSPaymentRule
+from Demos.Priority import PriorityAllocator, PriorityPathBiddingStrategy, PriorityPathValueFunction, \
+    PriorityPaymentRule
+from Simulator import AStar, Mechanism, PathAgent, Simulator, Statistics, Tracer, get_simulation_dict
+
+if TYPE_CHECKING:
+    from .Scenario import Scenario
+
+# A benchmark prepares a run on a scenario, only the returned run is measured. The run returns additional metrics.
+Run = Callable[[], Dict[str, Any]]
+Benchmark = Callable[["Scenario"], Run]
+
+# Simulations by scenario name and allocator, shared by the benchmarks that need a simulated environment
+_simulations: Dict[Tuple[str, str], "Simulator"] = {}
+
+
+def _simulator(scenario: "Scenario", allocator: str) -> "Simulator":
+    """
+    Returns a new simulator of the scenario with the given allocator and a tracer attached to its environment.
+    :param scenario:
+    :param allocator: "priority" or "fcfs"
+    :return:
+    """
+    environment = scenario.environment()
+    environment.tracer = Tracer()
+    if allocator == "priority":
+        owners = scenario.owners(PriorityPathBiddingStrategy, PriorityPathValueFunction)
+        mechanism = Mechanism(PriorityAllocator(), PriorityPaymentRule())
+    elif allocator == "fcfs":
+        owners = scenario.owners(FCFSPathBiddingStrategy, FCFSPathValueFunction)
+        mechanism = Mechanism(FCFSAllocator(), FCFSPaymentRule())
+    else:
+        raise Exception(f"Unknown allocator {allocator}.")
+    return Simulator(owners, mechanism, environment)
+
+
+def simulated(scenario: "Scenario", allocator: str = "priority") -> "Simulator":
+    """
+    Returns a finished simulation of the scenario, it is only simulated once.
+    :param scenario:
+    :param allocator:
+    :return:
+    """
+    key = (scenario.name, allocator)
+    if key not in _simulations:
+        simulator = _simulator(scenario, allocator)
+        simulator.run()
+        simulator.environment.tracer = None
+        _simulations[key] = simulator
+    return _simulations[key]
+
+
+def _simulation_metrics(simulator: "Simulator") -> Dict[str, Any]:
+    tracer = simulator.environment.tracer
+    assert tracer is not None
+    summary = tracer.summary()
+    return {"allocate_s": summary["spans"].get("allocate", {}).get("total_ms", 0) / 1000,
+            "allocated_agents": len(simulator.environment.agents),
+            "expansions": tracer.counters["astar_expansions"],
+            "displacements": tracer.counters["displacements"]}
+
+
+def astar(scenario: "Scenario") -> Run:
+    """
+    Searches the routes of the scenario with AStar in the empty city.
+    :param scenario:
+    :return:
+    """
+    environment = scenario.environment()
+    environment.tracer = Tracer()
+    routes = scenario.routes(environment)
+    search = AStar(environment, FCFSBidTracker(), max_iter=scenario.max_iter)
+
+    def run():
+        found = 0
+        for index, (start, end) in enumerate(routes):
+            agent = PathAgent(f"route-{index}", FCFSPathBiddingStrategy(), FCFSPathValueFunction(), [start, end], [])
+            path, _ = search.astar(start, end, agent)
+            found += len(path) > 0
+        return {"paths": found, "expansions": environment.tracer.counters["astar_expansions"]}
+
+    return run
+
+
+def cbs_astar(scenario: "Scenario") -> Run:
+    """
+    Searches the routes of the scenario with CBSAStar in the empty city, without constraints.
+    :param scenario:
+    :return:
+    """
+    environment = scenario.environment()
+    environment.tracer = Tracer()
+    routes = scenario.routes(environment)
+    search = CBSAStar(environment, max_iter=scenario.max_iter)
+
+    def run():
+        found = 0
+        for index, (start, end) in enumerate(routes):
+            agent = PathAgent(f"route-{index}", CBSPathBiddingStrategy(), CBSPathValueFunction(), [start, end], [])
+            found += len(search.astar(start, end, agent, set())) > 0
+        return {"paths": found, "expansions": environment.tracer.counters["astar_expansions"]}
+
+    return run
+
+
+def priority_allocate(scenario: "Scenario") -> Run:
+    """
+    Simulates the scenario with the PriorityAllocator, allocate_s is the time spent in the allocator.
+    :param scenario:
+    :return:
+    """
+    simulator = _simulator(scenario, "priority")
+
+    def run():
+        simulator.run()
+        return _simulation_metrics(simulator)
+
+    return run
+
+
+def fcfs_allocate(scenario: "Scenario") -> Run:
+    """
+    Simulates the scenario with the FCFSAllocator, allocate_s is the time spent in the allocator.
+    :param scenario:
+    :return:
+    """
+    simulator = _simulator(scenario, "fcfs")
+
+    def run():
+        simulator.run()
+        return _simulation_metrics(simulator)
+
+    return run
+
+
+def environment_clone(scenario: "Scenario") -> Run:
+    """
+    Clones the environment at the end of the priority simulation of the scenario.
+    :param scenario:
+    :return:
+    """
+    environment = simulated(scenario).environment
+
+    def run():
+        clone = environment.clone()
+        return {"agents": len(clone.agents)}
+
+    return run
+
+
+def environment_deallocate(scenario: "Scenario") -> Run:
+    """
+    Deallocates all agents at the end of the priority simulation of the scenario.
+    :param scenario:
+    :return:
+    """
+    environment = simulated(scenario).environment.clone()
+
+    def run():
+        for agent in list(environment.agents.values()):
+            environment.deallocate_agent(agent, 0)
+        return {"deallocated_agents": len(environment.agents)}
+
+    return run
+
+
+def statistics(scenario: "Scenario") -> Run:
+    """
+    Builds the statistics of the priority simulation of the scenario.
+    :param scenario:
+    :return:
+    """
+    simulator = simulated(scenario)
+
+    def run():
+        Statistics(simulator).build_statistics()
+        return {}
+
+    return run
+
+
+def simulation_dict(scenario: "Scenario") -> Run:
+    """
+    Builds the JSON of the priority simulation of the scenario.
+    :param scenario:
+    :return:
+    """
+    simulator = simulated(scenario)
+
+    def run():
+        get_simulation_dict(simulator)
+        return {}
+
+    return run
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    "astar": astar,
+    "cbs_astar": cbs_astar,
+    "priority_allocate": priority_allocate,
+    "fcfs_allocate": fcfs_allocate,
+    "environment_clone": environment_clone,
+    "environment_deallocate": environment_deallocate,
+    "statistics": statistics,
+    "simulation_dict": simulation_dict,
+}
@@ -0,0 +1,99 @@
+import random
+from typing import List, Optional, Tuple, TYPE_CHECKING, Type
+
+from API.Generator.CityGen import CityGen
+from Simulator import Coordinate4D, Environment
+
+if TYPE_CHECKING:
+    from API import WebPathOwner
+    from Simulator import BiddingStrategy, ValueFunction
+
+
+class Scenario:
+    """
+    A fixed offline scenario the benchmarks run on: a synthetic city, the owners of a simulation and random routes
+    for path searches. Everything is seeded, so a scenario is the same on every run.
+    """
+
+    def __init__(self,
+                 name: str,
+                 dimensions: "Coordinate4D",
+                 nr_agents: int,
+                 nr_routes: int,
+                 allocation_period: int,
+                 nr_owners: int = 4,
+                 weather_fronts: int = 0,
+                 max_iter: int = 20_000,
+                 seed: int = 0):
+        """
+        :param name:
+        :param dimensions:
+        :param nr_agents: number of agents of the simulations
+        :param nr_routes: number of routes for the path search benchmarks
+        :param allocation_period: ticks in which the agents of the simulations are created
+        :param nr_owners:
+        :param weather_fronts:
+        :param max_iter: maximum number of expanded nodes of a search of the path search benchmarks
+        :param seed:
+        """
+        self.name: str = name
+        self.dimensions: "Coordinate4D" = dimensions
+        self.nr_agents: int = nr_agents
+        self.nr_routes: int = nr_routes
+        self.allocation_period: int = allocation_period
+        self.nr_owners: int = nr_owners
+        self.max_iter: int = max_iter
+        self.seed: int = seed
+        self.city: CityGen = CityGen(dimensions, seed=seed, weather_fronts=weather_fronts)
+        self._environment: Optional["Environment"] = None
+
+    def environment(self) -> "Environment":
+        """
+        Returns a new environment with the buildings of the city, the city is only generated once.
+        :return:
+        """
+        if self._environment is None:
+            self._environment = Environment(self.dimensions, self.city.blockers())
+        return self._environment.new_clear()
+
+    def owners(self, bidding_strategy: Type["BiddingStrategy"],
+               value_function: Type["ValueFunction"]) -> List["WebPathOwner"]:
+        """
+        Returns the path owners of the simulations and seeds the global random generator they draw their stops from.
+        :param bidding_strategy:
+        :param value_function:
+        :return:
+        """
+        random.seed(self.seed)
+        return self.city.path_owners(self.nr_owners, self.nr_agents, self.allocation_period, bidding_strategy,
+                                     value_function, config={"priority": 0.5})
+
+    def routes(self, environment: "Environment") -> List[Tuple["Coordinate4D", "Coordinate4D"]]:
+        """
+        Returns start and end of the routes for the path search benchmarks, the ends are reachable in time.
+        :param environment:
+        :return:
+        """
+        rng = random.Random(f"{self.seed}-routes")
+        routes: List[Tuple["Coordinate4D", "Coordinate4D"]] = []
+        while len(routes) < self.nr_routes:
+            start = Coordinate4D(rng.randint(0, int(self.dimensions.x) - 1), environment.min_height,
+                                 rng.randint(0, int(self.dimensions.z) - 1), 0)
+            end = Coordinate4D(rng.randint(0, int(self.dimensions.x) - 1), environment.min_height,
+                               rng.randint(0, int(self.dimensions.z) - 1), 0)
+            while start.y < self.dimensions.y and environment.is_coordinate_blocked_forever(start, 1):
+                start.y += 1
+            while end.y < self.dimensions.y and environment.is_coordinate_blocked_forever(end, 1):
+                end.y += 1
+            if start.y < self.dimensions.y and end.y < self.dimensions.y and \
+                    start.distance(end) < self.dimensions.t // 2:
+                routes.append((start, end))
+        return routes
+
+
+SCENARIOS = {
+    "small": Scenario("small", Coordinate4D(120, 20, 120, 300), nr_agents=40, nr_routes=20, allocation_period=50),
+    "medium": Scenario("medium", Coordinate4D(250, 30, 250, 600), nr_agents=150, nr_routes=40, allocation_period=100),
+    "large": Scenario("large", Coordinate4D(500, 40, 500, 1200), nr_agents=500, nr_routes=80, allocation_period=200,
+                      weather_fronts=1),
+}
@@ -0,0 +1,156 @@
+import gc
+import json
+import os
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+from .Benchmarks import BENCHMARKS
+
+if TYPE_CHECKING:
+    from .Scenario import Scenario
+
+BASELINE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+# Metrics compared against the baseline, higher is worse
+COMPARED_METRICS = ("wall_time_s", "allocate_s", "peak_memory_mb", "expansions")
+
+# Columns of the result table: metric, header, width and number of digits
+COLUMNS = (("wall_time_s", "wall time [s]", 22, 4),
+           ("allocate_s", "allocate [s]", 22, 4),
+           ("peak_memory_mb", "peak memory [MB]", 24, 2),
+           ("expansions", "expansions", 22, 0))
+
+
+def measure(scenario: "Scenario", name: str, repeat: int = 3, memory: bool = True) -> Dict[str, Any]:
+    """
+    Runs a benchmark on a scenario. The wall time is the minimum of the repeated runs, the peak memory is measured
+    in an additional run, as tracing the allocations slows the run down.
+    The setup of every run is not measured.
+    :param scenario:
+    :param name: name of the benchmark
+    :param repeat: number of timed runs
+    :param memory: measure the peak memory
+    :return: the metrics of the benchmark
+    """
+    if name not in BENCHMARKS:
+        raise Exception(f"Unknown benchmark {name}, available: {', '.join(BENCHMARKS)}.")
+    benchmark = BENCHMARKS[name]
+    wall_times: List[float] = []
+    metrics: Dict[str, Any] = {}
+    for _ in range(max(repeat, 1)):
+        run = benchmark(scenario)
+        gc.collect()
+        start = time.perf_counter()
+        metrics = run()
+        wall_times.append(time.perf_counter() - start)
+    result: Dict[str, Any] = {"wall_time_s": min(wall_times), **metrics}
+    if memory:
+        run = benchmark(scenario)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        result["peak_memory_mb"] = peak / 2 ** 20
+    return result
+
+
+def run_suite(scenario: "Scenario", names: Optional[List[str]] = None, repeat: int = 3,
+              memory: bool = True) -> Dict[str, Dict[str, Any]]:
+    """
+    Runs the given benchmarks, all by default, on a scenario.
+    :param scenario:
+    :param names:
+    :param repeat:
+    :param memory:
+    :return: the metrics by benchmark
+    """
+    return {name: measure(scenario, name, repeat, memory) for name in (names or list(BENCHMARKS))}
+
+
+def baseline_path(scale: str) -> str:
+    return os.path.join(BASELINE_DIRECTORY, f"{scale}.json")
+
+
+def load_baseline(path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Returns the stored results, or an empty baseline if there is none.
+    :param path:
+    :return:
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_baseline(path: str, results: Dict[str, Dict[str, Any]]):
+    """
+    Stores results as baseline, benchmarks that were not run keep their previous baseline.
+    :param path:
+    :param results:
+    :return:
+    """
+    baseline = load_baseline(path)
+    baseline.update(results)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+
+
+def missing_baselines(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]]) -> List[str]:
+    """
+    Returns the benchmarks of the results without a baseline, their regressions can not be detected.
+    :param results:
+    :param baseline:
+    :return:
+    """
+    return [name for name in results if name not in baseline]
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            threshold: float = 0.2) -> List[Dict[str, Any]]:
+    """
+    Compares results to a baseline.
+    :param results:
+    :param baseline:
+    :param threshold: relative increase of a metric above which it is a regression
+    :return: the compared metrics, with their relative change and whether they regressed
+    """
+    comparison: List[Dict[str, Any]] = []
+    for name, metrics in results.items():
+        for metric in COMPARED_METRICS:
+            if metric not in metrics or metric not in baseline.get(name, {}):
+                continue
+            before, after = baseline[name][metric], metrics[metric]
+            change = (after - before) / before if before > 0 else (0. if after == before else float("inf"))
+            comparison.append({"benchmark": name, "metric": metric, "baseline": before, "value": after,
+                               "change": change, "regression": change > threshold})
+    return comparison
+
+
+def format_results(results: Dict[str, Dict[str, Any]], comparison: List[Dict[str, Any]]) -> str:
+    """
+    Returns a table of the results, with the changes to the baseline.
+    :param results:
+    :param comparison:
+    :return:
+    """
+    changes = {(entry["benchmark"], entry["metric"]): entry for entry in comparison}
+    lines = [f"{'benchmark':<24}" + "".join(f"{header:>{width}}" for _, header, width, _ in COLUMNS)]
+    for name, metrics in results.items():
+        cells = []
+        for metric, _, width, digits in COLUMNS:
+            if metric not in metrics:
+                cells.append(f"{'-':>{width}}")
+                continue
+            cell = f"{metrics[metric]:.{digits}f}"
+            entry = changes.get((name, metric))
+            if entry is not None:
+                cell += f" ({entry['change']:+.0%}{'!' if entry['regression'] else ''})"
+            cells.append(f"{cell:>{width}}")
+        lines.append(f"{name:<24}{''.join(cells)}")
+    return "\n".join(lines)
@@ -0,0 +1,4 @@
+from .Scenario import SCENARIOS, Scenario
+from .Benchmarks import BENCHMARKS
+from .Suite import baseline_path, compare, format_results, load_baseline, measure, missing_baselines, run_suite, \
+    save_baseline
@@ -0,0 +1,54 @@
+"""
+Runs the benchmarks on a fixed offline scenario and compares them to the stored baseline, e.g.:
+python -m Benchmarks --scale small
+python -m Benchmarks --scale medium --benchmark astar --benchmark priority_allocate --save-baseline
+Exits with 1 if a metric regressed by more than the threshold and with 2 if a benchmark has no baseline.
+"""
+
+import argparse
+import sys
+
+from Simulator import setup_logging
+from .Benchmarks import BENCHMARKS
+from .Scenario import SCENARIOS
+from .Suite import baseline_path, compare, format_results, load_baseline, missing_baselines, run_suite, \
+    save_baseline
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m Benchmarks", description="Benchmarks of the simulator.")
+    parser.add_argument("--scale", choices=list(SCENARIOS), default="small", help="scenario to run on")
+    parser.add_argument("--benchmark", dest="benchmarks", action="append", choices=list(BENCHMARKS),
+                        help="benchmark to run, can be given multiple times, all by default")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark, the fastest is reported")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="do not measure the peak memory")
+    parser.add_argument("--baseline", dest="baselinePath", help="baseline file, by default one per scale")
+    parser.add_argument("--save-baseline", dest="saveBaseline", action="store_true",
+                        help="store the results as new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative increase of a metric above which it is reported as regression")
+    args = parser.parse_args()
+    setup_logging("WARNING")
+
+    path = args.baselinePath or baseline_path(args.scale)
+    results = run_suite(SCENARIOS[args.scale], args.benchmarks, args.repeat, args.memory)
+    baseline = load_baseline(path)
+    comparison = compare(results, baseline, args.threshold)
+    print(format_results(results, comparison))
+
+    if args.saveBaseline:
+        save_baseline(path, results)
+        print(f"Saved baseline to {path}")
+        return 0
+    regressions = [entry for entry in comparison if entry["regression"]]
+    for entry in regressions:
+        print(f"REGRESSION {entry['benchmark']} {entry['metric']}: {entry['baseline']:.4g} -> {entry['value']:.4g} "
+              f"({entry['change']:+.0%})")
+    missing = missing_baselines(results, baseline)
+    if len(missing) > 0:
+        print(f"WARNING no baseline for {', '.join(missing)} in {path}, store one with --save-baseline")
+    return 1 if regressions else 2 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,6 +11,7 @@ import glob
 import json
 import os
 import random
+import sys
 from typing import Any, Dict, List, Optional, Type
 
 import requests
@@ -19,10 +20,12 @@ from InquirerPy import inquirer
 from InquirerPy.base.control import Choice
 from InquirerPy.validator import EmptyInputValidator, PathValidator
 
-from API import APISimulationConfig, available_allocators, build_json, run_from_config_for_cli
+from API import APISimulationConfig, APISyntheticCity, OverpassClient, available_allocators, build_json, \
+    run_from_config_for_cli, run_sweep, warm_overpass_cache
+from API.Generator.OverpassClient import DEFAULT_CACHE_DIRECTORY, OVERPASS_URL
 from API.WebClasses import WebAllocator, WebBiddingStrategy
 from Development.playground import color_generator
-from Simulator import PaymentRule
+from Simulator import PaymentRule, Tracer, setup_logging
 
 PREFAB_PATH = "./Prefabs/configs"
 HOME_PATH = "~/" if os.name == "posix" else "C:\\"
@@ -268,7 +271,53 @@ parser.add_argument('--owner', dest="owners", action='append', nargs='+', defaul
                          "BiddingStrategies. The supported pairs are listed here. "
                          f"{all_bidding_strategies_and_value_functions_str()}")
 
+parser.add_argument('--synthetic-city', dest="syntheticCitySeed", type=int, metavar="SEED",
+                    help='Replace the buildings of the map by a synthetic city generated with the given seed, so no '
+                         'buildings are requested from the Overpass API. The parameters of the city can be changed in '
+                         'map.synthetic of the configuration.')
+parser.add_argument('--sweep', dest="sweepPath", type=str,
+                    help='Path to a JSON file with a parameter grid. Instead of a single simulation, the configuration '
+                         'is simulated for every combination of the parameter values, e.g. {"seed": [1, 2, 3], '
+                         '"allocator,paymentRule": [["FCFSAllocator", "FCFSPaymentRule"], ["PriorityAllocator", '
+                         '"PriorityPaymentRule"]], "owners.0.agents": [10, 20]}. Parameters are dotted paths into the '
+                         'configuration, parameters that change together are joined by commas.')
+parser.add_argument('--sweep-output', dest="sweepOutputPath", type=str,
+                    help='Folder to which the outputs of all sweep runs and the summary sweep.jsonl are written. '
+                         'Defaults to {name}-sweep in the current folder.')
+parser.add_argument('--workers', dest="workers", type=int,
+                    help='Number of processes running the sweep in parallel. Defaults to the number of CPUs.')
+parser.add_argument('--log-level', dest="logLevel", type=str, default="INFO",
+                    choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                    help='Minimum level of the simulation log. DEBUG logs every tick, allocation and path search, '
+                         'which slows down large simulations. Defaults to INFO.')
+parser.add_argument('--log-file', dest="logFilePath", type=str,
+                    help='File to which the simulation log is additionally appended as JSON lines.')
+parser.add_argument('--trace', dest="tracePath", type=str,
+                    help='File to which a trace of the simulation phases, path searches and query counts is written '
+                         'in the Chrome trace event format. Open it with chrome://tracing or https://ui.perfetto.dev.')
+parser.add_argument('--overpass-url', dest="overpassUrl", type=str, default=OVERPASS_URL,
+                    help='Server the buildings of the map tiles are requested from, e.g. a local Overpass instance.')
+parser.add_argument('--overpass-cache', dest="overpassCachePath", type=str,
+                    default=DEFAULT_CACHE_DIRECTORY,
+                    help='Folder in which the buildings of the map tiles are cached.')
+parser.add_argument('--no-overpass-cache', dest="noOverpassCache", action="store_true",
+                    help='Always request the buildings of the map tiles, without reading or writing the cache.')
+parser.add_argument('--warm-cache', dest="warmCachePrefabs", nargs="*", metavar="PREFAB",
+                    help='Request the buildings of the map tiles of the given prefabs, or of all prefabs if none are '
+                         'given, into the cache and exit.')
+
 args = parser.parse_args()
+setup_logging(args.logLevel, args.logFilePath)
+OverpassClient.set_default(OverpassClient(args.overpassUrl, None if args.noOverpassCache else args.overpassCachePath))
+
+if args.warmCachePrefabs is not None:
+    prefab_configs = []
+    for prefab_name in args.warmCachePrefabs or available_prefab_names():
+        with open(f"{PREFAB_PATH}/{prefab_name}-config.json", "r") as f:
+            prefab_configs.append(json.load(f))
+    nr_tiles = warm_overpass_cache(prefab_configs)
+    print(f"Resolved the buildings of {nr_tiles} map tiles of {len(prefab_configs)} prefabs")
+    sys.exit(0)
 
 # Pre-Checks
 # If owners are given, bidding strategies must be set
@@ -499,6 +548,12 @@ if model_config is None:
 
     model_config = APISimulationConfig(**model_data)
 
+# Generate the buildings offline if --synthetic-city is given
+if args.syntheticCitySeed is not None:
+    if model_config.map.synthetic is None:
+        model_config.map.synthetic = APISyntheticCity()
+    model_config.map.synthetic.seed = args.syntheticCitySeed
+
 # Ask for model summary if user did not specify either --summary or --skip-summary
 if not args.skipSummary:
     summarize = args.summary
@@ -532,8 +587,18 @@ if not args.skipSaveConfig:
         with open(output_path, "w") as f:
             f.write(model_config.model_dump_json())
 
+# Run a parameter sweep instead of a single simulation if a grid is given
+if args.sweepPath:
+    with open(args.sweepPath, "r") as f:
+        sweep_grid = json.load(f)
+    sweep_output = args.sweepOutputPath or os.path.join(os.getcwd(), f"{model_config.name}-sweep")
+    summaries = run_sweep(model_config, sweep_grid, sweep_output, args.workers)
+    nr_failed = len([summary for summary in summaries if summary["status"] != "ok"])
+    print(f"-- Sweep Completed: {len(summaries) - nr_failed} of {len(summaries)} runs succeeded, "
+          f"outputs in {sweep_output} --")
+
 # Skip this flow if user provided --skip-simulation argument
-if not args.skipSimulation:
+if not args.skipSimulation and not args.sweepPath:
     # Ask user if simulation should be run if he provided neither --skip-simulation nor --simulate
     simulate = True
     if not args.simulate:
@@ -541,8 +606,12 @@ if not args.skipSimulation:
     # Run actual simulation
     if simulate:
         print("Running simulation. This may take a while!")
-        generator, duration = run_from_config_for_cli(model_config)
+        tracer = Tracer() if args.tracePath else None
+        generator, duration = run_from_config_for_cli(model_config, tracer)
         print(f"-- Simulation Completed in {duration} seconds --")
+        if tracer is not None:
+            tracer.export(args.tracePath)
+            print(f"Trace written to {args.tracePath}")
         simulation_json = build_json(model_config.model_dump(), generator, duration)
 
         # Printing simulation summary flow if user did not provide --skip-summary flag
@@ -3,14 +3,12 @@ Implementation of Conflict-based search based on Ashwin Bose (@atb033)'s impleme
 https://github.com/atb033/multi_agent_path_planning/blob/master/centralized/cbs/cbs.py
 """
 import abc
-from typing import Dict, Iterator, List, Optional, Set, TYPE_CHECKING, Tuple, Type
-
-from rtree import Index
-from rtree.index import Property
+import math
+from typing import Callable, Dict, List, Optional, Set, TYPE_CHECKING, Tuple, Type
 
 from API.WebClasses import WebAllocator
 from Simulator import Allocation, AllocationHistory, AllocationReason, PathAgent, PathSegment
-from .CBSAllocatorHelpers import Conflict, HighLevelNode
+from .CBSAllocatorHelpers import Conflict, ConflictTable, FocalList, HighLevelNode, PathCache
 from .CBSCostFunctions import CostFunction, PathLength
 from ..BidTracker.CBSBidTracker import CBSBidTracker
 from ..BiddingStrategy.CBSPathBiddingStrategy import CBSPathBiddingStrategy
@@ -40,15 +38,34 @@ class CBSAllocator(WebAllocator):
     def compatible_payment_functions():
         return [CBSPaymentRule]
 
-    def __init__(self, cost_function: "abc.ABCMeta" = PathLength):
+    def __init__(self, cost_function: "abc.ABCMeta" = PathLength, distance_heuristic: bool = False,
+                 suboptimality: float = 1., path_cache_size: int = 1_000_000):
         """
         Initialize the CBS-bid-tracker (currently the same as FCFS).
         """
         self.bid_tracker = CBSBidTracker()
         """
+        Guide the low-level search by the exact distances around static obstacles
+        """
+        self.distance_heuristic: bool = distance_heuristic
+        """
         Initializes the cost function to optimize
         """
         self.cost_function: "CostFunction" = cost_function()
+        """
+        Enhanced CBS with focal lists on both levels if above 1, the cost of the allocation is at most suboptimality
+        times the optimum. The bound is split evenly between the high-level and the low-level search,
+        both prefer solutions with fewer conflicts within their bound.
+        """
+        if suboptimality < 1:
+            raise Exception(f"Suboptimality {suboptimality} has to be at least 1.")
+        if suboptimality > 1 and not self.cost_function.bounded_suboptimal:
+            raise Exception(f"{cost_function.__name__} does not support bounded suboptimal allocations.")
+        self.suboptimality: float = suboptimality
+        """
+        Maximum number of voxels of the low-level paths that are memoized during an allocation, 0 disables the cache
+        """
+        self.path_cache_size: int = path_cache_size
 
     def get_bid_tracker(self) -> "BidTracker":
         """
@@ -65,36 +82,49 @@ class CBSAllocator(WebAllocator):
         :param tick:
         :return:
         """
-        astar = CBSAStar(env)
+        level_suboptimality = math.sqrt(self.suboptimality)
+        astar = CBSAStar(env, distance_heuristic=self.distance_heuristic, suboptimality=level_suboptimality)
+        path_cache = PathCache(self.path_cache_size)
+        # Ordered by cost, nodes without conflict first, then by the tick of the first conflict.
+        # For bounded suboptimal allocations nodes with fewer conflicts are preferred within the bound.
+        open_list = FocalList(level_suboptimality)
         open_set: Set["HighLevelNode"] = set()
         closed_set: Set["HighLevelNode"] = set()
         start: "HighLevelNode" = HighLevelNode()
-        start.constraint_dict = {}
-        for _agent in agents:
-            start.constraint_dict[_agent] = set()
-            start.solution[_agent], start.reason = self.allocate_path(_agent, start.constraint_dict[_agent], env, tick,
-                                                                      astar)
+        all_agents: List["PathAgent"] = list(agents) + list(env.agents.values())
+        start.conflict_table = ConflictTable(all_agents,
+                                             max([env.max_near_radius] + [agent.near_radius for agent in all_agents]))
         for existing_agent in env.agents.values():
             assert isinstance(existing_agent, PathAgent)
-            start.constraint_dict[existing_agent] = set()
+            start.conflict_table.update(existing_agent, existing_agent.allocated_segments)
+        for _agent in agents:
+            start.solution[_agent], start.reason = self.allocate_path(_agent, set(), env, tick, astar,
+                                                                      start.conflict_table)
+            path_cache.put(_agent, frozenset(), (start.solution[_agent], start.reason))
+            if start.solution[_agent] is not None:
+                start.conflict_table.update(_agent, start.solution[_agent])
+        for existing_agent in env.agents.values():
             start.solution[existing_agent] = existing_agent.allocated_segments
 
         if not start.solution:
             return {}
         start.cost = self.cost_function(start)
-        start.first_conflict = CBSAllocator.get_first_conflict(start.solution, env.max_near_radius)
-        open_set |= {start}
+        start.first_conflict = CBSAllocator.get_first_conflict(start)
+        open_list.push(start.cost, self.focal_key(start), start)
+        open_set.add(start)
 
-        while open_set:
-            P: "HighLevelNode" = min(open_set)
-            open_set -= {P}
-            closed_set |= {P}
+        while len(open_list) > 0:
+            P: "HighLevelNode" = open_list.pop()
+            open_set.remove(P)
+            closed_set.add(P)
+            env.trace_count("cbs_expanded_nodes")
 
             first_conflict = P.first_conflict
             if not first_conflict:
                 allocations = {}
+                constrained_agents = P.constraints.agents()
                 for agent, path in P.solution.items():
-                    if agent in env.agents.values() and len(P.constraint_dict[agent]) == 0:
+                    if agent in env.agents.values() and agent not in constrained_agents:
                         continue
                     allocations[agent] = Allocation(agent, path, AllocationHistory(
                         self.bid_tracker.get_last_bid_for_tick(tick, agent, env), 0, AllocationReason.FIRST_ALLOCATION,
@@ -103,48 +133,78 @@ class CBSAllocator(WebAllocator):
 
             constraint_dict = self.create_constraints_from_conflict(first_conflict)
             assert len(constraint_dict.keys()) == 2
-            for _agent in constraint_dict.keys():
+            for _agent, location in constraint_dict.items():
+                constraint = location.packed_key(env.dimension)
+                # The node would have the same constraints as P
+                if P.constraints.contains(_agent, constraint):
+                    continue
                 new_node: "HighLevelNode" = P.copy()
-                new_node.add_constraint(_agent, constraint_dict[_agent])
-                if new_node not in closed_set:
-                    self.compute_solution(env, new_node, tick, astar)
+                new_node.add_constraint(_agent, constraint)
+                if new_node not in closed_set and new_node not in open_set:
+                    self.compute_solution(env, new_node, tick, astar, path_cache)
                     if not new_node.solution and not self.cost_function.failed_allocation_valid:
                         continue
-                    open_set |= {new_node}
 
                     new_node.cost = self.cost_function(new_node)
-                    new_node.first_conflict = CBSAllocator.get_first_conflict(new_node.solution, env.max_near_radius)
+                    new_node.first_conflict = CBSAllocator.get_first_conflict(new_node)
+                    open_list.push(new_node.cost, self.focal_key(new_node), new_node)
+                    open_set.add(new_node)
             P.solution = {}
+            P.conflict_table = None
 
         return {}
 
+    def focal_key(self, node: "HighLevelNode") -> Tuple[int, bool, int]:
+        """
+        Returns the secondary key of a node in the open list, the number of conflicts is only considered for
+        bounded suboptimal allocations.
+        :param node:
+        :return:
+        """
+        conflict = node.first_conflict
+        nr_conflicts = node.conflict_table.nr_conflicts() if self.suboptimality > 1 and node.solution else 0
+        return nr_conflicts, conflict is not None, conflict.location_1.t if conflict else 0
+
     def compute_solution(self,
                          env,
                          high_level_node: "HighLevelNode",
                          tick: int,
-                         astar: "CBSAStar"):
+                         astar: "CBSAStar",
+                         path_cache: Optional["PathCache"] = None):
         """
-        Intermediate step in the pathfinding handling the HighLevelNode
+        Intermediate step in the pathfinding handling the HighLevelNode.
+        The path of the agent under its constraints without the new one is reused if it avoids the new constraint,
+        otherwise the search is warm-started from it.
         :param env:
         :param high_level_node:
         :param tick:
         :param astar:
+        :param path_cache:
         :return:
         """
         to_recompute = high_level_node.newly_constraint
-        new_recomputed_solution, reason = self.allocate_path(to_recompute,
-                                                             high_level_node.constraint_dict[to_recompute], env, tick,
-                                                             astar)
+        constraints = high_level_node.constraints.of(to_recompute)
+        key = frozenset(constraints)
+        cached = path_cache.get(to_recompute, key) if path_cache is not None else None
+        if cached is None:
+            previous = path_cache.get(to_recompute, key - {high_level_node.constraints.constraint}) \
+                if path_cache is not None else None
+            cached = self.allocate_path(to_recompute, constraints, env, tick, astar, high_level_node.conflict_table,
+                                        previous[0] if previous is not None else None)
+            if path_cache is not None:
+                path_cache.put(to_recompute, key, cached)
+        new_recomputed_solution, reason = cached
         if not new_recomputed_solution:
             high_level_node.solution = {}
             return
         high_level_node.solution[to_recompute] = new_recomputed_solution
+        high_level_node.conflict_table.update(to_recompute, new_recomputed_solution)
         high_level_node.reason = reason
         return
 
-    def allocate_path(self, agent: "PathAgent", constraints: "Set[Coordinate4D]", env: "Environment", tick,
-                      astar: "CBSAStar") -> \
-            Tuple[Optional[List["PathSegment"]], str]:
+    def allocate_path(self, agent: "PathAgent", constraints: "Set[int]", env: "Environment", tick,
+                      astar: "CBSAStar", conflict_table: Optional["ConflictTable"] = None,
+                      previous: Optional[List["PathSegment"]] = None) -> Tuple[Optional[List["PathSegment"]], str]:
         """
         Allocate a path for a given path-bid.
         Returns `None` if no valid path could be allocated.
@@ -153,13 +213,22 @@ class CBSAllocator(WebAllocator):
         :param env:
         :param tick:
         :param astar:
+        :param conflict_table: positions of the other agents, the focal search avoids conflicts with them
+        :param previous: path found for a subset of the constraints. The segments before the first violated
+        constraint are kept, the search of the violated segment is started at the last position before the violation.
         :return:
         """
+        reused, warm_start = len(previous) if previous is not None else 0, None
+        if previous is not None:
+            violation = self.first_violation(previous, constraints, agent, env)
+            if violation is None:
+                return previous, "Path allocated."
+            reused, warm_start = violation
+        conflicts = conflict_table.conflict_counter(agent) if conflict_table is not None and \
+            astar.suboptimality > 1 else None
         bid = self.bid_tracker.get_last_bid_for_tick(tick, agent, env)
         assert isinstance(bid, CBSPathBid) and isinstance(agent, PathAgent)
         a = bid.locations[0].clone()
-        if agent.id == "0-0" and tick == 5:
-            print("test")
         if bid.flying:
             if a.t != tick:
                 return None, f"Cannot teleport to {a} at tick {tick}."
@@ -184,19 +253,28 @@ class CBSAllocator(WebAllocator):
             if env.is_coordinate_blocked_forever(b, bid.agent.near_radius):
                 return None, f"Static blocker at target {b}."
 
-            a_t = find_valid_path_tick(env, a, agent, tick, env.dimension.t, constraints)
-            if a_t is None:
-                return None, f"Start {a} is invalid until max tick {env.dimension.t}."
-            a.t = a_t
-
-            b_t = find_valid_path_tick(env, b, agent, tick, env.dimension.t, constraints)
-            if b_t is None:
-                return None, f"Target {b} is invalid until max tick {env.dimension.t}."
-            b.t = b_t
-
-            ab_path = astar.astar(a, b, agent, constraints)
-            if len(ab_path) == 0:
-                return None, f"No path {a} -> {b} found."
+            if previous is not None and _index < reused:
+                ab_path = previous[_index].coordinates
+            else:
+                a_t = find_valid_path_tick(env, a, agent, tick, env.dimension.t, constraints)
+                if a_t is None:
+                    return None, f"Start {a} is invalid until max tick {env.dimension.t}."
+                a.t = a_t
+
+                b_t = find_valid_path_tick(env, b, agent, tick, env.dimension.t, constraints)
+                if b_t is None:
+                    return None, f"Target {b} is invalid until max tick {env.dimension.t}."
+                b.t = b_t
+
+                ab_path = []
+                if previous is not None and _index == reused and warm_start is not None and \
+                        previous[_index].min == a:
+                    ab_path = self.warm_start_path(previous[_index].coordinates, warm_start, b, agent, constraints,
+                                                   astar, conflicts)
+                if len(ab_path) == 0:
+                    ab_path = astar.astar(a, b, agent, constraints, conflicts)
+                if len(ab_path) == 0:
+                    return None, f"No path {a} -> {b} found."
             time += ab_path[-1].t - ab_path[0].t
             if time > bid.battery:
                 return None, f"Not enough battery left for path {a} -> {b}."
@@ -214,45 +292,64 @@ class CBSAllocator(WebAllocator):
         return optimal_path_segments, "Path allocated."
 
     @staticmethod
-    def get_first_conflict(solution: Dict["PathAgent", List["PathSegment"]], max_near_radius: float) -> "Conflict|None":
+    def first_violation(path: List["PathSegment"], constraints: "Set[int]", agent: "PathAgent",
+                        env: "Environment") -> Optional[Tuple[int, Optional[int]]]:
+        """
+        Finds the first position of the path that is checked against the constraints by the search and violates them.
+        Returns the index of the segment and the index of the last checked coordinate before the violation in it,
+        None for the coordinate if the start of the segment violates the constraints.
+        Returns None if the path violates no constraint.
+        :param path:
+        :param constraints:
+        :param agent:
+        :param env:
+        :return:
+        """
+        if len(constraints) == 0:
+            return None
+        for segment_index, segment in enumerate(path):
+            # The search only checks the positions it reaches, the agent waits there for speed - 1 ticks
+            for index, coordinate in enumerate(segment.iter_coordinates(0, None, agent.speed)):
+                if coordinate.packed_key(env.dimension) in constraints:
+                    return segment_index, (index - 1) * agent.speed if index > 0 else None
+        return None
+
+    @staticmethod
+    def warm_start_path(coordinates: List["Coordinate4D"], warm_start: int, end: "Coordinate4D", agent: "PathAgent",
+                        constraints: "Set[int]", astar: "CBSAStar",
+                        conflicts: Optional[Callable[["Coordinate4D"], int]]) -> List["Coordinate4D"]:
+        """
+        Searches a path from a position of a previous path that reaches the end at the same tick as the previous one.
+        The previous path was found with fewer constraints, so no path can be shorter than it is and the result keeps
+        the optimality or the bound of a search from the start. Returns an empty list if there is no such path.
+        :param coordinates: previous path
+        :param warm_start: index of the position to search from
+        :param end:
+        :param agent:
+        :param constraints:
+        :param astar:
+        :param conflicts:
+        :return:
+        """
+        rest = astar.astar(coordinates[warm_start], end, agent, constraints, conflicts)
+        if len(rest) == 0 or rest[-1].t != coordinates[-1].t:
+            return []
+        return coordinates[:warm_start] + rest
+
+    @staticmethod
+    def get_first_conflict(node: "HighLevelNode") -> "Conflict|None":
         """
         Finds the first position where the computed allocation is invalid.
-        This is done by incrementally adding each allocated position into a Rtree
-        :param solution:
-        :param max_near_radius:
+        The conflicts are kept up to date by the conflict table of the node whenever a path changes.
+        :param node:
         :return:
         """
-        props = Property()
-        props.dimension = 4
-        tree = Index(properties=props)
+        solution = node.solution
+        if not solution:
+            return None
         start_t = min([plan[0].min.t for plan in solution.values()])
         max_t = max([plan[-1].max.t for plan in solution.values()])
-        agents: Dict[int, "PathAgent"] = {hash(agent): agent for agent in solution.keys()}
-        new_max_near_radius = max([max_near_radius] + [agent.near_radius for agent in agents.values()])
-        for t in range(start_t, max_t):
-            for _agent in agents.values():
-                if len(solution[_agent]) > 0:
-                    segment_index = 0
-                    while len(solution[_agent]) > segment_index and solution[_agent][segment_index].min.t <= t:
-                        if solution[_agent][segment_index].max.t >= t:
-                            segment = solution[_agent][segment_index]
-                            posi = segment.coordinates[t - segment.min.t]
-                            bl = posi - new_max_near_radius
-                            tr = posi + new_max_near_radius
-                            intersections: Iterator[int] = tree.intersection(bl.list_rep() + tr.list_rep())
-                            intersecting_agents = set(
-                                [agents[agent_hash] for agent_hash in intersections if agent_hash != hash(_agent)])
-                            for intersecting_agent in intersecting_agents:
-                                local_max_near_radius = max(_agent.near_radius, intersecting_agent.near_radius)
-                                path_coordinate = segment.coordinates[t - segment.min.t]
-                                distance = posi.distance(path_coordinate, l2=True)
-                                if distance <= local_max_near_radius:
-                                    return Conflict(_agent, intersecting_agent, posi, path_coordinate)
-                            tree.insert(hash(_agent), posi.list_rep())
-                            break
-                        segment_index += 1
-
-        return None
+        return node.conflict_table.first_conflict(start_t, max_t)
 
     @staticmethod
     def create_constraints_from_conflict(conflict: "Conflict") -> Dict["PathAgent", "Coordinate4D"]:
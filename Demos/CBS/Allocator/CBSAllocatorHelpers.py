@@ -1,4 +1,7 @@
-from typing import Dict, TYPE_CHECKING, Set, List, Optional
+import heapq
+import math
+from collections import OrderedDict
+from typing import AbstractSet, Any, Callable, Dict, FrozenSet, TYPE_CHECKING, Set, List, Optional, Tuple
 
 if TYPE_CHECKING:
     from Simulator.Segments.PathSegment import PathSegment
@@ -24,6 +27,300 @@ class Conflict(object):
                ', ' + str(self.location_1) + ', ' + str(self.location_2) + ')'
 
 
+class ConflictTable(object):
+    """
+    Caches the positions of all agents per tick and the conflicts between them.
+    Two agents conflict at a tick if their positions are in a cube with the given radius around each other.
+    Copies share the cached positions, so after an agent was replanned only its own positions have to be checked
+    against the positions of the others.
+    """
+
+    def __init__(self, agents: List["PathAgent"], radius: float):
+        """
+        :param agents: all agents in the order in which conflicts at the same tick are reported,
+        of agents with the same hash only the last one is checked at the position of the first one
+        :param radius:
+        """
+        by_hash: Dict[int, "PathAgent"] = {hash(agent): agent for agent in agents}
+        self.agents: List["PathAgent"] = list(by_hash.values())
+        self.index: Dict[int, int] = {agent_hash: index for index, agent_hash in enumerate(by_hash.keys())}
+        self.radius: float = radius
+        self.positions: Dict[int, Dict[int, "Coordinate4D"]] = {}
+        # (tick, index of an agent) -> indices of the agents before it that it conflicts with
+        self.conflicts: Dict[Tuple[int, int], Set[int]] = {}
+
+    def copy(self) -> "ConflictTable":
+        cpy = ConflictTable.__new__(ConflictTable)
+        cpy.agents = self.agents
+        cpy.index = self.index
+        cpy.radius = self.radius
+        cpy.positions = dict(self.positions)
+        cpy.conflicts = {key: indices.copy() for key, indices in self.conflicts.items()}
+        return cpy
+
+    def update(self, agent: "PathAgent", path: List["PathSegment"]):
+        """
+        Replace the path of an agent and recompute its conflicts.
+        :param agent:
+        :param path:
+        :return:
+        """
+        agent_index = self.index[hash(agent)]
+        if self.agents[agent_index] is not agent:
+            return
+        for key in list(self.conflicts.keys()):
+            indices = self.conflicts[key]
+            indices.discard(agent_index)
+            if key[1] == agent_index or len(indices) == 0:
+                del self.conflicts[key]
+
+        positions: Dict[int, "Coordinate4D"] = {}
+        for segment in path:
+            for offset, coordinate in enumerate(segment.iter_coordinates(0, segment.max.t - segment.min.t + 1)):
+                positions.setdefault(segment.min.t + offset, coordinate)
+        self.positions[hash(agent)] = positions
+
+        radius = self.radius
+        for other_hash, other_positions in self.positions.items():
+            other_index = self.index[other_hash]
+            if other_index == agent_index:
+                continue
+            for t, position in positions.items():
+                other_position = other_positions.get(t)
+                if other_position is not None and abs(position.x - other_position.x) <= radius and \
+                        abs(position.y - other_position.y) <= radius and abs(position.z - other_position.z) <= radius:
+                    key = (t, max(agent_index, other_index))
+                    if key not in self.conflicts:
+                        self.conflicts[key] = set()
+                    self.conflicts[key].add(min(agent_index, other_index))
+
+    def nr_conflicts(self) -> int:
+        """
+        Returns the number of conflicting pairs of agents summed over all ticks.
+        :return:
+        """
+        return sum([len(indices) for indices in self.conflicts.values()])
+
+    def conflict_counter(self, agent: "PathAgent") -> Callable[["Coordinate4D"], int]:
+        """
+        Returns a function that counts the conflicts of the agent at a position with the cached positions of all other
+        agents. All ticks from position.t to position.t + speed - 1 are considered.
+        :param agent:
+        :return:
+        """
+        agent_hash = hash(agent)
+        occupancy: Dict[int, List["Coordinate4D"]] = {}
+        for other_hash, positions in self.positions.items():
+            if other_hash != agent_hash:
+                for t, position in positions.items():
+                    if t not in occupancy:
+                        occupancy[t] = []
+                    occupancy[t].append(position)
+        radius = self.radius
+        speed = agent.speed
+
+        def count(position: "Coordinate4D") -> int:
+            nr_conflicts = 0
+            for t in range(position.t, position.t + speed):
+                for other_position in occupancy.get(t, []):
+                    if abs(position.x - other_position.x) <= radius and abs(position.y - other_position.y) <= radius \
+                            and abs(position.z - other_position.z) <= radius:
+                        nr_conflicts += 1
+            return nr_conflicts
+
+        return count
+
+    def first_conflict(self, start_t: int, max_t: int) -> "Optional[Conflict]":
+        """
+        Returns the conflict with the earliest tick in [start_t, max_t), ties are broken by the agent order.
+        :param start_t:
+        :param max_t:
+        :return:
+        """
+        keys = [key for key in self.conflicts.keys() if start_t <= key[0] < max_t]
+        if len(keys) == 0:
+            return None
+        t, agent_index = min(keys)
+        agent = self.agents[agent_index]
+        position = self.positions[hash(agent)][t]
+        intersecting_agents = set([self.agents[other_index] for other_index in self.conflicts[(t, agent_index)]])
+        return Conflict(agent, next(iter(intersecting_agents)), position, position)
+
+
+class FocalList(object):
+    """
+    Open list of a focal search. Of all entries whose cost is at most suboptimality times the minimal cost,
+    the entry with the smallest secondary key is popped first, ties are broken by cost and then by insertion order.
+    With a suboptimality of 1 this is a best-first open list with the secondary key as tie-breaker.
+    """
+
+    def __init__(self, suboptimality: float):
+        """
+        :param suboptimality: factor by which the cost of a popped entry may exceed the minimal cost, at least 1
+        """
+        self.suboptimality: float = suboptimality
+        self.open: List[Tuple[float, int]] = []
+        self.focal: List[Tuple[Any, float, int, Any]] = []
+        # Entries that are not in the focal list, because their cost was too high
+        self.pending: List[Tuple[float, Any, int, Any]] = []
+        self.popped: Set[int] = set()
+        self._counter: int = 0
+
+    def push(self, cost: float, secondary: Any, item: Any):
+        heapq.heappush(self.open, (cost, self._counter))
+        heapq.heappush(self.pending, (cost, secondary, self._counter, item))
+        self._counter += 1
+
+    def min_cost(self) -> float:
+        """
+        Returns the minimal cost of all entries that were not popped yet.
+        :return:
+        """
+        while len(self.open) > 0 and self.open[0][1] in self.popped:
+            self.popped.remove(heapq.heappop(self.open)[1])
+        return self.open[0][0] if len(self.open) > 0 else math.inf
+
+    def pop(self) -> Any:
+        """
+        Remove and return the next item. Returns None if the list is empty.
+        :return:
+        """
+        while True:
+            bound = self.min_cost() * self.suboptimality
+            while len(self.pending) > 0 and self.pending[0][0] <= bound:
+                cost, secondary, counter, item = heapq.heappop(self.pending)
+                heapq.heappush(self.focal, (secondary, cost, counter, item))
+            if len(self.focal) == 0:
+                return None
+            secondary, cost, counter, item = heapq.heappop(self.focal)
+            # The minimal cost can decrease if entries with a lower cost than the popped ones were pushed
+            if cost > bound:
+                heapq.heappush(self.pending, (cost, secondary, counter, item))
+                continue
+            self.popped.add(counter)
+            return item
+
+    def __len__(self) -> int:
+        return len(self.focal) + len(self.pending)
+
+
+class PathCache(object):
+    """
+    Memoizes the results of the CBS low-level search by agent and constraint set for one allocation.
+    The least recently used results are evicted once the cached paths have more voxels than the capacity.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        :param capacity: maximum number of voxels of all cached paths, 0 disables the cache
+        """
+        self.capacity: int = capacity
+        self.nr_voxels: int = 0
+        self.results: "OrderedDict[Tuple[int, FrozenSet[int]], Tuple[Optional[List[PathSegment]], str]]" = \
+            OrderedDict()
+
+    @staticmethod
+    def _size(result: Tuple[Optional[List["PathSegment"]], str]) -> int:
+        return 1 + sum([segment.nr_voxels for segment in result[0]]) if result[0] is not None else 1
+
+    def get(self, agent: "PathAgent", constraints: FrozenSet[int]) -> \
+            Optional[Tuple[Optional[List["PathSegment"]], str]]:
+        """
+        Returns the cached path and reason for the agent and constraints, None if nothing is cached.
+        :param agent:
+        :param constraints:
+        :return:
+        """
+        key = (hash(agent), constraints)
+        if key not in self.results:
+            return None
+        self.results.move_to_end(key)
+        return self.results[key]
+
+    def put(self, agent: "PathAgent", constraints: FrozenSet[int], result: Tuple[Optional[List["PathSegment"]], str]):
+        if self.capacity <= 0:
+            return
+        key = (hash(agent), constraints)
+        if key in self.results:
+            self.nr_voxels -= self._size(self.results.pop(key))
+        self.results[key] = result
+        self.nr_voxels += self._size(result)
+        while self.nr_voxels > self.capacity and len(self.results) > 0:
+            self.nr_voxels -= self._size(self.results.popitem(last=False)[1])
+
+
+class ConstraintSet(object):
+    """
+    Persistent set of the constraints of all agents. A set maps every constrained agent to a frozenset of its
+    constraints. Adding a constraint copies only this mapping and replaces the frozenset of one agent, the frozensets
+    of all other agents are shared with the parent, so sets of sibling nodes share the constraints they have in common.
+    Looking up a constraint or the constraints of an agent is O(1).
+    The hash key is maintained incrementally as the xor of the hashes of all (agent, constraint) pairs.
+    """
+
+    def __init__(self, parent: Optional["ConstraintSet"] = None, agent: Optional["PathAgent"] = None,
+                 constraint: int = 0):
+        """
+        Use add to create a set with an additional constraint.
+        :param parent:
+        :param agent:
+        :param constraint:
+        """
+        self.agent: Optional["PathAgent"] = agent
+        self.constraint: int = constraint
+        self.size: int = 0 if parent is None else parent.size + 1
+        self.key: int = 0 if parent is None else parent.key ^ hash((hash(agent), constraint))
+        self._by_agent: Dict["PathAgent", FrozenSet[int]] = {} if parent is None else dict(parent._by_agent)
+        if parent is not None:
+            self._by_agent[agent] = self._by_agent.get(agent, frozenset()) | {constraint}
+
+    def add(self, agent: "PathAgent", constraint: int) -> "ConstraintSet":
+        """
+        Returns a new set with the additional constraint, the constraint must not be in this set already.
+        :param agent:
+        :param constraint:
+        :return:
+        """
+        return ConstraintSet(self, agent, constraint)
+
+    def contains(self, agent: "PathAgent", constraint: int) -> bool:
+        constraints = self._by_agent.get(agent)
+        return constraints is not None and constraint in constraints
+
+    def of(self, agent: "PathAgent") -> FrozenSet[int]:
+        """
+        Returns the constraints of a single agent.
+        :param agent:
+        :return:
+        """
+        return self._by_agent.get(agent, frozenset())
+
+    def agents(self) -> AbstractSet["PathAgent"]:
+        """
+        Returns all agents with at least one constraint.
+        :return:
+        """
+        return self._by_agent.keys()
+
+    def pairs(self) -> Set[Tuple["PathAgent", int]]:
+        return set((agent, constraint) for agent, constraints in self._by_agent.items() for constraint in constraints)
+
+    def __eq__(self, other):
+        if not isinstance(other, type(self)): return NotImplemented
+        if self is other:
+            return True
+        return self.key == other.key and self.size == other.size and self._by_agent == other._by_agent
+
+    def __hash__(self):
+        return self.key
+
+    def __str__(self):
+        res = ""
+        for agent in self.agents():
+            res += f"{agent}: {str(set(self.of(agent)))}\n"
+        return res
+
+
 class HighLevelNode(object):
     """
     HighLevelNode for CBS. Saves a (possibly invalid) allocation for all agents and
@@ -32,19 +329,19 @@ class HighLevelNode(object):
 
     def __init__(self):
         self.solution: Dict["PathAgent", List["PathSegment"]] = dict()
-        self.constraint_dict: Dict["PathAgent", Set["Coordinate4D"]] = dict()
+        self.constraints: "ConstraintSet" = ConstraintSet()
         self.first_conflict: "Optional[Conflict]" = None
         self.newly_constraint: "Optional[PathAgent]" = None
         self.reason: "str" = ""
         self.cost = 0
+        self.conflict_table: "Optional[ConflictTable]" = None
 
     def __eq__(self, other):
         if not isinstance(other, type(self)): return NotImplemented
-        return self.constraint_dict == other.constraint_dict
+        return self.constraints == other.constraints
 
     def __hash__(self):
-        return hash(','.join(
-            [str(agent) + str(constraints) for agent, constraints in self.constraint_dict.items()]))
+        return hash(self.constraints)
 
     def __lt__(self, other):
         if not isinstance(other, type(self)): return NotImplemented
@@ -56,21 +353,21 @@ class HighLevelNode(object):
             return self.first_conflict.location_1.t < other.first_conflict.location_1.t
         return self.cost < other.cost
 
-    def add_constraint(self, agent: "PathAgent", constraint: "Coordinate4D"):
-        self.constraint_dict[agent].add(constraint)
+    def add_constraint(self, agent: "PathAgent", constraint: int):
+        self.constraints = self.constraints.add(agent, constraint)
         self.newly_constraint = agent
 
     def copy(self):
+        """
+        Copies the node, the paths and the constraints are shared with this node.
+        :return:
+        """
         cpy = HighLevelNode()
-        for agent in list(self.constraint_dict.keys()):
-            cpy.constraint_dict[agent] = self.constraint_dict[agent].copy()
-        for agent in list(self.solution.keys()):
-            cpy.solution[agent] = self.solution[agent].copy()
+        cpy.constraints = self.constraints
+        cpy.solution = dict(self.solution)
+        if self.conflict_table is not None:
+            cpy.conflict_table = self.conflict_table.copy()
         return cpy
 
     def __str__(self):
-        res = ""
-        for agent, constraint in self.constraint_dict.items():
-            if len(constraint) > 0:
-                res += f"{agent}: {str(constraint)}\n"
-        return res
+        return str(self.constraints)
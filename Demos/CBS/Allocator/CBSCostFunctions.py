@@ -8,6 +8,7 @@ class CostFunction(ABC):
     The cost function CBS should optimize
     """
     failed_allocation_valid = False  # Whether an allocation where not all agents have a path is valid
+    bounded_suboptimal = False  # Whether the cost is a sum of path costs, so ECBS can bound the suboptimality
 
     def __init__(self):
         pass
@@ -23,13 +24,14 @@ class PathLength(CostFunction):
     Minimize the total number of allocated ticks
     """
     failed_allocation_valid = False
+    bounded_suboptimal = True
 
     @staticmethod
     def __call__(node: "HighLevelNode") -> int:
         total_path_length = 0
         for path_segements in node.solution.values():
             for segment in path_segements:
-                total_path_length += len(segment.coordinates)
+                total_path_length += segment.nr_voxels
         return total_path_length
 
 
@@ -38,6 +40,7 @@ class Welfare(CostFunction):
     Minimize the negative summed value of all agents
     """
     failed_allocation_valid = True
+    bounded_suboptimal = False
 
     @staticmethod
     def __call__(node: "HighLevelNode") -> float:
@@ -1,8 +1,13 @@
 import heapq
-from typing import List, TYPE_CHECKING, Optional, Set
+import logging
+from typing import Callable, Dict, List, TYPE_CHECKING, Optional, Set, Tuple
 
 from Simulator.AStar.Node import Node
 from Simulator.Agents.PathAgent import PathAgent
+from Simulator.History.Tracer import span
+from ..Allocator.CBSAllocatorHelpers import FocalList
+
+logger = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
     from Simulator.Coordinates.Coordinate4D import Coordinate4D
@@ -11,19 +16,43 @@ if TYPE_CHECKING:
 
 class CBSAStar:
     """
-    Optimal Astar for CBS. Positions are only valid if they are not in the constraints of the agent
+    Optimal Astar for CBS. Positions are only valid if they are not in the constraints of the agent.
+    With a suboptimality above 1 a focal search is used instead, which returns a path at most suboptimality times
+    longer than the optimum and prefers paths with fewer conflicts with the other agents.
     """
 
-    def __init__(self, environment: "Environment", max_iter: int = 4_000_000):
+    def __init__(self, environment: "Environment", max_iter: int = 4_000_000, distance_heuristic: bool = False,
+                 suboptimality: float = 1.):
+        """
+        :param environment:
+        :param max_iter: maximum number of expanded nodes, -1 for no limit
+        :param distance_heuristic: estimate the remaining distance by the exact distance around static obstacles
+        instead of the manhattan distance, both are admissible
+        :param suboptimality: bound of the focal search, 1 for an optimal search
+        """
         self.environment: "Environment" = environment
         self.max_iter: int = max_iter
+        self.distance_heuristic: bool = distance_heuristic
+        self.suboptimality: float = suboptimality
+
+    def heuristic(self, position: "Coordinate4D", end: "Coordinate4D", agent: "PathAgent") -> float:
+        """
+        Admissible estimate of the number of steps from the position to the end.
+        :param position:
+        :param end:
+        :param agent:
+        :return:
+        """
+        if self.distance_heuristic:
+            return self.environment.distance_heuristic.distance(position, end, agent.near_radius)
+        return position.distance(end, l2=False)
 
     # Implementation based on https://www.annytab.com/a-star-search-algorithm-in-python/
     def astar_loop(self,
                    start: "Coordinate4D",
                    end: "Coordinate4D",
                    agent: "PathAgent",
-                   constraints: "Set[Coordinate4D]"):
+                   constraints: "Set[int]"):
         """
         Computes a path for a single agent respecting the agents constraints
         :param start:
@@ -38,7 +67,8 @@ class CBSAStar:
 
         start_node = Node(start, None, set())
         end_node = Node(end, None, set())
-        open_nodes[hash(start_node)] = start_node
+        dimension = self.environment.dimension
+        open_nodes[start.packed_key(dimension)] = start_node
         heapq.heappush(heap, start_node)
 
         steps = 0
@@ -52,8 +82,9 @@ class CBSAStar:
 
             current_node = heapq.heappop(heap)
 
-            del open_nodes[hash(current_node)]
-            closed_nodes[hash(current_node)] = current_node
+            current_key = current_node.position.packed_key(dimension)
+            del open_nodes[current_key]
+            closed_nodes[current_key] = current_node
 
             # Target reached
             if current_node.position.inter_temporal_equal(end_node.position):
@@ -68,28 +99,97 @@ class CBSAStar:
                 break
 
             # Find non-occupied neighbor
-            neighbors = current_node.adjacent_coordinates(self.environment.dimension, agent.speed)
+            neighbors = current_node.adjacent_coordinates(dimension, agent.speed)
             for next_neighbor in neighbors:
                 valid = is_valid_for_path_allocation(self.environment, next_neighbor, agent, constraints)
-                if valid and next_neighbor.t <= self.environment.dimension.t:
+                if valid and next_neighbor.t <= dimension.t:
                     neighbor = Node(next_neighbor, current_node, set())
 
                     # Closed node
-                    if hash(neighbor) in closed_nodes:
+                    neighbor_key = next_neighbor.packed_key(dimension)
+                    if neighbor_key in closed_nodes:
                         continue
 
                     neighbor.g = current_node.g + 1
-                    neighbor.h = neighbor.position.distance(end_node.position, l2=False)
+                    neighbor.h = self.heuristic(neighbor.position, end_node.position, agent)
                     neighbor.f = neighbor.g + neighbor.h
 
-                    if hash(neighbor) in open_nodes:
-                        if open_nodes[hash(neighbor)].f > neighbor.f:
-                            open_nodes[hash(neighbor)] = neighbor
+                    if neighbor_key in open_nodes:
+                        if open_nodes[neighbor_key].f > neighbor.f:
+                            open_nodes[neighbor_key] = neighbor
                     else:
-                        open_nodes[hash(neighbor)] = neighbor
+                        open_nodes[neighbor_key] = neighbor
                         heapq.heappush(heap, neighbor)
         return path, steps
 
+    def focal_loop(self,
+                   start: "Coordinate4D",
+                   end: "Coordinate4D",
+                   agent: "PathAgent",
+                   constraints: "Set[int]",
+                   conflicts: Callable[["Coordinate4D"], int]) -> Tuple[List["Coordinate4D"], int]:
+        """
+        Focal search for a path respecting the agents constraints. Of all nodes with f at most suboptimality times
+        the minimal f, the node with the fewest conflicts on its way is expanded first.
+        Closed nodes are reopened if they are reached with a lower cost, which keeps the bound.
+        :param start:
+        :param end:
+        :param agent:
+        :param constraints:
+        :param conflicts: returns the number of conflicts with other agents at a position
+        :return:
+        """
+        dimension = self.environment.dimension
+        focal = FocalList(self.suboptimality)
+        # Cost and number of conflicts of the best node per position
+        best: Dict[int, Tuple[float, int]] = {}
+        closed: Dict[int, float] = {}
+
+        start_node = Node(start, None, set())
+        start_node.h = self.heuristic(start, end, agent)
+        start_node.f = start_node.h
+        start_conflicts = conflicts(start)
+        best[start.packed_key(dimension)] = (0, start_conflicts)
+        focal.push(start_node.f, start_conflicts, (start_node, start_conflicts))
+
+        steps = 0
+        while len(focal) > 0 and (self.max_iter == -1 or steps < self.max_iter):
+            current_node, current_conflicts = focal.pop()
+            current_key = current_node.position.packed_key(dimension)
+            if best[current_key] != (current_node.g, current_conflicts) or \
+                    closed.get(current_key, current_node.g + 1) <= current_node.g:
+                continue
+            closed[current_key] = current_node.g
+            steps += 1
+
+            # Target reached
+            if current_node.position.inter_temporal_equal(end):
+                reverse_path = []
+                while current_node is not None:
+                    reverse_path.append(current_node.position)
+                    current_node = current_node.parent
+                return reverse_path[::-1], steps
+
+            for next_neighbor in current_node.adjacent_coordinates(dimension, agent.speed):
+                if next_neighbor.t > dimension.t or \
+                        not is_valid_for_path_allocation(self.environment, next_neighbor, agent, constraints):
+                    continue
+                neighbor_key = next_neighbor.packed_key(dimension)
+                g = current_node.g + 1
+                if closed.get(neighbor_key, g + 1) <= g:
+                    continue
+                neighbor_conflicts = current_conflicts + conflicts(next_neighbor)
+                if neighbor_key in best and best[neighbor_key] <= (g, neighbor_conflicts):
+                    continue
+                best[neighbor_key] = (g, neighbor_conflicts)
+
+                neighbor = Node(next_neighbor, current_node, set())
+                neighbor.g = g
+                neighbor.h = self.heuristic(next_neighbor, end, agent)
+                neighbor.f = neighbor.g + neighbor.h
+                focal.push(neighbor.f, neighbor_conflicts, (neighbor, neighbor_conflicts))
+        return [], steps
+
     @staticmethod
     def complete_path(path: List["Coordinate4D"], agent: "PathAgent") -> List["Coordinate4D"]:
         """
@@ -113,32 +213,41 @@ class CBSAStar:
               start: "Coordinate4D",
               end: "Coordinate4D",
               agent: "PathAgent",
-              constraints: Set["Coordinate4D"]) -> List["Coordinate4D"]:
+              constraints: Set[int],
+              conflicts: Optional[Callable[["Coordinate4D"], int]] = None) -> List["Coordinate4D"]:
         """
-        Asserts paths plausibility and calls astar-loop
+        Asserts paths plausibility and calls astar-loop, or focal-loop for a suboptimality above 1
         :param start:
         :param end:
         :param agent:
         :param constraints:
+        :param conflicts: returns the number of conflicts with other agents at a position, used by the focal search
         :return:
         """
         distance = start.distance(end)
         time_left = self.environment.dimension.t - start.t
 
         if distance * agent.speed > time_left:
-            print(f"ASTAR failed: Distance {distance} is too great for agent with speed {agent.speed}.")
+            logger.debug("ASTAR failed: Distance %s is too great for agent with speed %s.", distance, agent.speed)
             return []
 
         valid = is_valid_for_path_allocation(self.environment, start, agent, constraints)
 
         if not valid:
-            print(f"ASTAR failed: Start {start} is not valid.")
+            logger.debug("ASTAR failed: Start %s is not valid.", start)
             return []
 
-        path, steps = self.astar_loop(start, end, agent, constraints)
+        with span(self.environment.tracer, "cbs_astar", "path_planning"):
+            if self.suboptimality > 1:
+                path, steps = self.focal_loop(start, end, agent, constraints,
+                                              conflicts if conflicts is not None else lambda _position: 0)
+            else:
+                path, steps = self.astar_loop(start, end, agent, constraints)
+        self.environment.trace_count("astar_searches")
+        self.environment.trace_count("astar_expansions", steps)
 
         if len(path) == 0:
-            print(f"ASTAR failed: {'MaxIter' if steps == self.max_iter else 'No valid Allocation'}")
+            logger.debug("ASTAR failed: %s", "MaxIter" if steps == self.max_iter else "No valid Allocation")
             return []
 
         complete_path = self.complete_path(path, agent)
@@ -147,16 +256,17 @@ class CBSAStar:
 
 
 def is_valid_for_path_allocation(env: "Environment", position: "Coordinate4D",
-                                 path_agent: "PathAgent", constraints: "Set[Coordinate4D]") -> bool:
+                                 path_agent: "PathAgent", constraints: "Set[int]") -> bool:
     """
-    Checks if the position is blocked or in the agent's constraints
+    Checks if the position is blocked or in the agent's constraints.
+    The constraints are the packed keys of the forbidden coordinates.
     :param env:
     :param position:
     :param path_agent:
     :param constraints:
     :return:
     """
-    if position in constraints:
+    if position.packed_key(env.dimension) in constraints:
         return False
     if env.is_coordinate_blocked(position, path_agent):
         return False
@@ -165,7 +275,7 @@ def is_valid_for_path_allocation(env: "Environment", position: "Coordinate4D",
 
 def find_valid_path_tick(environment: "Environment", position: "Coordinate4D",
                          path_agent: "PathAgent", min_tick: int, max_tick: int,
-                         constraints: "Set[Coordinate4D]") -> Optional[int]:
+                         constraints: "Set[int]") -> Optional[int]:
     """
     Finds the first tick where it can allocate a position
     :param environment:
@@ -1,10 +1,11 @@
+import logging
 import random
 from time import time_ns
-from typing import Dict, List, Optional, TYPE_CHECKING, Tuple
+from typing import Dict, List, Optional, Set, TYPE_CHECKING, Tuple, Type, Union
 
 from API.WebClasses import WebAllocator
-from Simulator import AStar, Agent, Allocation, AllocationHistory, AllocationReason, PathSegment, \
-    SpaceSegment, find_valid_path_tick, find_valid_space_tick, is_valid_for_space_allocation
+from Simulator import AStar, Agent, Allocation, AllocationHistory, AllocationReason, PathSegment, SIPP, \
+    SpaceSegment, SpeculativePathPlanner, find_valid_path_tick, find_valid_space_tick, is_valid_for_space_allocation
 from ..BidTracker.FCFSBidTracker import FCFSBidTracker
 from ..BiddingStrategy.FCFSPathBiddingStrategy import FCFSPathBiddingStrategy
 from ..BiddingStrategy.FCFSSpaceBiddingStrategy import FCFSSpaceBiddingStrategy
@@ -12,8 +13,10 @@ from ..Bids.FCFSPathBid import FCFSPathBid
 from ..Bids.FCFSSpaceBid import FCFSSpaceBid
 from ..PaymentRule.FCFSPaymentRule import FCFSPaymentRule
 
+logger = logging.getLogger(__name__)
+
 if TYPE_CHECKING:
-    from Simulator import Environment
+    from Simulator import Environment, PathAgent
 
 
 class FCFSAllocator(WebAllocator):
@@ -26,11 +29,19 @@ class FCFSAllocator(WebAllocator):
     def compatible_payment_functions():
         return [FCFSPaymentRule]
 
-    def __init__(self):
+    def __init__(self, distance_heuristic: bool = False, path_planner: Union[Type["AStar"], Type["SIPP"]] = AStar,
+                 parallel_workers: int = 0):
         """
         Initialize the FCFS-bid-tracker.
+        :param distance_heuristic: guide the path planner by the exact distances around static obstacles
+        :param path_planner: AStar or SIPP, SIPP searches over safe intervals and is faster for long waits
+        :param parallel_workers: number of processes that plan independent path agents speculatively,
+        0 or 1 to plan all agents sequentially
         """
         self.bid_tracker = FCFSBidTracker()
+        self.distance_heuristic: bool = distance_heuristic
+        self.path_planner: Union[Type["AStar"], Type["SIPP"]] = path_planner
+        self.parallel_workers: int = parallel_workers
 
     @staticmethod
     def compatible_bidding_strategies():
@@ -106,6 +117,20 @@ class FCFSAllocator(WebAllocator):
 
         return optimal_path_segments, "Path allocated."
 
+    def speculate_path(self, agent: "PathAgent", environment: "Environment", astar: "AStar",
+                       tick: int) -> Tuple[Optional[List["PathSegment"]], Set["Agent"], str]:
+        """
+        Plan the path of an agent in a worker of the speculative path planner.
+        :param agent:
+        :param environment:
+        :param astar:
+        :param tick:
+        :return:
+        """
+        bid = self.bid_tracker.request_new_bid(tick, agent, environment)
+        optimal_segments, explanation = self.allocate_path(bid, environment, astar, tick)
+        return optimal_segments, set(), explanation
+
     def allocate_space(self, bid: "FCFSSpaceBid", environment: "Environment",
                        tick: int) -> Tuple[List["SpaceSegment"], str]:
         """
@@ -144,12 +169,14 @@ class FCFSAllocator(WebAllocator):
         :param tick:
         :return:
         """
-        astar = AStar(environment, self.bid_tracker, tick)
+        astar = self.path_planner(environment, self.bid_tracker, tick, distance_heuristic=self.distance_heuristic)
         allocations: Dict["Agent", "Allocation"] = {}
         random.shuffle(agents)
+        speculation = SpeculativePathPlanner(environment, self.parallel_workers)
+        speculation.speculate(agents, tick, lambda _agent: self.speculate_path(_agent, environment, astar, tick))
 
         for agent in agents:
-            print(f"allocating: {agent}")
+            logger.debug("allocating: %s", agent)
             start_time = time_ns()
             bid = self.bid_tracker.request_new_bid(tick, agent, environment)
 
@@ -158,7 +185,12 @@ class FCFSAllocator(WebAllocator):
 
             # Path Agents
             if isinstance(bid, FCFSPathBid):
-                optimal_segments, explanation = self.allocate_path(bid, environment, astar, tick)
+                speculative = speculation.take(agent)
+                if speculative is not None:
+                    (optimal_segments, _, explanation), planning_time = speculative
+                    start_time -= planning_time
+                else:
+                    optimal_segments, explanation = self.allocate_path(bid, environment, astar, tick)
 
                 if optimal_segments is None:
                     allocations[agent] = Allocation(agent, [],
@@ -182,6 +214,7 @@ class FCFSAllocator(WebAllocator):
                                                           explanation))
             allocations[agent] = new_allocation
             environment.allocate_segments_for_agents([new_allocation], tick)
+            speculation.committed(agent)
 
         return allocations
 
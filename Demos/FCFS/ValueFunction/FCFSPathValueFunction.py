@@ -1,7 +1,10 @@
+import logging
 from typing import List, TYPE_CHECKING
 
 from Simulator import ValueFunction
 
+logger = logging.getLogger(__name__)
+
 if TYPE_CHECKING:
     from Simulator import PathAgent, Segment
 
@@ -24,7 +27,7 @@ class FCFSPathValueFunction(ValueFunction):
             return 0.
 
         if len(segments) != len(agent.locations) - 1:
-            print(f"Crash {agent}: Not all locations reached")
+            logger.debug("Crash %s: Not all locations reached", agent)
             return violationValue
 
         expected_distance = 0
@@ -37,14 +40,14 @@ class FCFSPathValueFunction(ValueFunction):
         for path, location in zip(segments, agent.locations[1:]):
             destination = path.max
             if not destination.inter_temporal_equal(location):
-                print(f"Crash {agent}: no further path found")
+                logger.debug("Crash %s: no further path found", agent)
                 return violationValue
 
             time += destination.t - path.min.t
             value -= max(destination.t - location.t, 0) / 100
 
         if time > agent.battery:
-            print(f"Crash {self}: empty battery")
+            logger.debug("Crash %s: empty battery", agent)
             return violationValue
 
         return round(max(0., value), 2)
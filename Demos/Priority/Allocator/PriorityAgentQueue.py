@@ -0,0 +1,52 @@
+import heapq
+from typing import Callable, List, Optional, Set, TYPE_CHECKING, Tuple
+
+if TYPE_CHECKING:
+    from Simulator import Agent
+
+
+class PriorityAgentQueue:
+    """
+    Max-heap of the agents that still need to be allocated, ordered by priority and secondly by hash.
+    Entries are invalidated lazily: agents that were already popped or whose priority changed are skipped,
+    so agents can be pushed again at any time.
+    """
+
+    def __init__(self, priority: Callable[["Agent"], float]):
+        """
+        :param priority: returns the current priority of an agent
+        """
+        self.priority: Callable[["Agent"], float] = priority
+        self.heap: List[Tuple[float, int, int, "Agent"]] = []
+        self.agents: Set["Agent"] = set()
+        self._counter: int = 0
+
+    def push(self, agent: "Agent"):
+        """
+        Add an agent with its current priority. Adding an agent that is already queued only updates its priority.
+        :param agent:
+        :return:
+        """
+        self.agents.add(agent)
+        heapq.heappush(self.heap, (-self.priority(agent), -hash(agent), self._counter, agent))
+        self._counter += 1
+
+    def pop(self) -> Optional["Agent"]:
+        """
+        Remove and return the agent with the highest priority, ties are broken by the highest hash.
+        Returns None if the queue is empty.
+        :return:
+        """
+        while len(self.heap) > 0:
+            negative_priority, _, _, agent = heapq.heappop(self.heap)
+            if agent not in self.agents:
+                continue
+            if -negative_priority != self.priority(agent):
+                self.push(agent)
+                continue
+            self.agents.remove(agent)
+            return agent
+        return None
+
+    def __len__(self) -> int:
+        return len(self.agents)
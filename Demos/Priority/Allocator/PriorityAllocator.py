@@ -1,18 +1,23 @@
+import logging
 from time import time_ns
-from typing import Dict, List, Optional, Set, TYPE_CHECKING, Tuple
+from typing import Dict, List, Optional, Set, TYPE_CHECKING, Tuple, Type, Union
 
 from API.WebClasses import WebAllocator
-from Simulator import AStar, Allocation, AllocationHistory, AllocationReason, PathSegment, SpaceSegment, \
-    find_valid_path_tick, find_valid_space_tick, is_valid_for_path_allocation, is_valid_for_space_allocation
+from Simulator import AStar, Allocation, AllocationHistory, AllocationReason, PathSegment, SIPP, SpaceSegment, \
+    SpeculativePathPlanner, find_valid_path_tick, find_valid_space_tick, is_valid_for_path_allocation, \
+    is_valid_for_space_allocation
 from ..BidTracker.PriorityBidTracker import PriorityBidTracker
 from ..BiddingStrategy.PriorityPathBiddingStrategy import PriorityPathBiddingStrategy
 from ..BiddingStrategy.PrioritySpaceBiddingStrategy import PrioritySpaceBiddingStrategy
 from ..Bids.PriorityPathBid import PriorityPathBid
 from ..Bids.PrioritySpaceBid import PrioritySpaceBid
 from ..PaymentRule.PriorityPaymentRule import PriorityPaymentRule
+from .PriorityAgentQueue import PriorityAgentQueue
+
+logger = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
-    from Simulator import Environment, Agent
+    from Simulator import Environment, Agent, PathAgent
 
 
 class PriorityAllocator(WebAllocator):
@@ -21,11 +26,19 @@ class PriorityAllocator(WebAllocator):
     Agents with higher priority bids can deallocate agents with lower priority bids.
     """
 
-    def __init__(self):
+    def __init__(self, distance_heuristic: bool = False, path_planner: Union[Type["AStar"], Type["SIPP"]] = AStar,
+                 parallel_workers: int = 0):
         """
         Initialize the priority-bid-tracker that remembers the max priority of an agents bids.
+        :param distance_heuristic: guide the path planner by the exact distances around static obstacles
+        :param path_planner: AStar or SIPP, SIPP searches over safe intervals and is faster for long waits
+        :param parallel_workers: number of processes that plan independent path agents speculatively,
+        0 or 1 to plan all agents sequentially
         """
         self.bid_tracker = PriorityBidTracker()
+        self.distance_heuristic: bool = distance_heuristic
+        self.path_planner: Union[Type["AStar"], Type["SIPP"]] = path_planner
+        self.parallel_workers: int = parallel_workers
 
     @staticmethod
     def compatible_bidding_strategies():
@@ -53,26 +66,27 @@ class PriorityAllocator(WebAllocator):
 
         if bid.flying:
             if a.t != tick:
-                print(f"not next tick{bid.agent} - {tick}")
+                logger.debug("not next tick %s - %s", bid.agent, tick)
                 return None, None, f"Cannot teleport to {a} at tick {tick}."
             allocated_segments = bid.agent.allocated_segments
 
             # If an agents already waited at a position for already part of his speed he can start his allocation
             # in the past and thus wait at most his speed
-            if len(allocated_segments) > 0 and len(allocated_segments[-1].coordinates) > 0 \
-                    and allocated_segments[-1].coordinates[-1].inter_temporal_equal(a) \
+            if len(allocated_segments) > 0 and allocated_segments[-1].nr_voxels > 0 \
+                    and allocated_segments[-1].max.inter_temporal_equal(a) \
                     and allocated_segments[-1].index == bid.index:
                 idx = 1
-                while len(allocated_segments[-1].coordinates) > idx \
-                        and allocated_segments[-1].coordinates[-(idx + 1)].inter_temporal_equal(a) \
+                while allocated_segments[-1].nr_voxels > idx \
+                        and allocated_segments[-1].coordinate_at(-(idx + 1)).inter_temporal_equal(a) \
                         and idx < bid.agent.speed:
                     idx += 1
-                print(f"moved start for agent {bid.agent} from {a} to {allocated_segments[-1].coordinates[-idx].t} ")
-                a.t = allocated_segments[-1].coordinates[-idx].t
+                logger.debug("moved start for agent %s from %s to %s", bid.agent, a,
+                             allocated_segments[-1].coordinate_at(-idx).t)
+                a.t = allocated_segments[-1].coordinate_at(-idx).t
 
             valid, _ = is_valid_for_path_allocation(tick, environment, self.bid_tracker, a, bid.agent)
             if not valid:
-                print(f"no valid re-start {bid.agent} - {tick} - {a}")
+                logger.debug("no valid re-start %s - %s - %s", bid.agent, tick, a)
                 return None, None, f"Cannot escape {a}."
 
         elif a.t == tick:
@@ -132,6 +146,20 @@ class PriorityAllocator(WebAllocator):
 
         return optimal_path_segments, total_collisions, "Path allocated."
 
+    def speculate_path(self, agent: "PathAgent", environment: "Environment", astar: "AStar",
+                       tick: int) -> Tuple[Optional[List["PathSegment"]], Set["Agent"], str]:
+        """
+        Plan the path of an agent in a worker of the speculative path planner.
+        :param agent:
+        :param environment:
+        :param astar:
+        :param tick:
+        :return:
+        """
+        bid = self.bid_tracker.request_new_bid(tick, agent, environment)
+        optimal_segments, collisions, explanation = self.allocate_path(bid, environment, astar, tick)
+        return optimal_segments, collisions if collisions is not None else set(), explanation
+
     def allocate_space(self, bid: "PrioritySpaceBid", environment: "Environment",
                        tick: int) -> Tuple[List["SpaceSegment"], Optional[Set["Agent"]], str]:
         """
@@ -187,20 +215,22 @@ class PriorityAllocator(WebAllocator):
         :param tick:
         :return:
         """
-        astar = AStar(environment, self.bid_tracker, tick)
+        astar = self.path_planner(environment, self.bid_tracker, tick, distance_heuristic=self.distance_heuristic)
         allocations: Dict["Agent", "Allocation"] = {}
         displacements: Dict["Agent", Set["Agent"]] = {}
-        agents_to_allocate = set(agents)
+        # Enforce consistent ordering of agents by firstly sorting by priority and secondly by hash
+        agents_to_allocate = PriorityAgentQueue(lambda _agent: self.priority(_agent, tick, environment))
+        for _agent in agents:
+            agents_to_allocate.push(_agent)
+        speculation = SpeculativePathPlanner(environment, self.parallel_workers)
+        speculation.speculate(sorted(agents, key=lambda _agent: (self.priority(_agent, tick, environment),
+                                                                 hash(_agent)), reverse=True),
+                              tick, lambda _agent: self.speculate_path(_agent, environment, astar, tick))
         while len(agents_to_allocate) > 0:
             start_time = time_ns()
 
-            # Enforce consistent ordering of agents by firstly sorting by priority and secondly by hash
-            max_prio = max([self.priority(_agent, tick, environment) for _agent in agents_to_allocate])
-            agent = max(
-                [_agent for _agent in agents_to_allocate if self.priority(_agent, tick, environment) == max_prio],
-                key=lambda _agent: hash(_agent))
-            agents_to_allocate.remove(agent)
-            print(f"allocating: {agent}")
+            agent = agents_to_allocate.pop()
+            logger.debug("allocating: %s", agent)
             bid = self.bid_tracker.request_new_bid(tick, agent, environment)
 
             if bid is None:
@@ -208,7 +238,12 @@ class PriorityAllocator(WebAllocator):
 
             # Path Agents
             if isinstance(bid, PriorityPathBid):
-                optimal_segments, collisions, explanation = self.allocate_path(bid, environment, astar, tick)
+                speculative = speculation.take(agent)
+                if speculative is not None:
+                    (optimal_segments, collisions, explanation), planning_time = speculative
+                    start_time -= planning_time
+                else:
+                    optimal_segments, collisions, explanation = self.allocate_path(bid, environment, astar, tick)
 
                 if optimal_segments is None:
                     allocations[agent] = Allocation(agent, [],
@@ -226,9 +261,9 @@ class PriorityAllocator(WebAllocator):
                 raise Exception(f"Invalid Bid: {bid}")
 
             # Deallocate collisions
-            agents_to_allocate = agents_to_allocate.union(collisions)
             for agent_to_remove in collisions:
-                print(f"reallocating: {agent_to_remove}")
+                logger.debug("reallocating: %s", agent_to_remove)
+                environment.trace_count("displacements")
                 if agent_to_remove not in displacements:
                     displacements[agent_to_remove] = set()
                 displacements[agent_to_remove].add(agent)
@@ -260,6 +295,10 @@ class PriorityAllocator(WebAllocator):
                                                           displacing_agent_bids=displacing_agent_bids))
             allocations[agent] = new_allocation
             environment.allocate_segments_for_agents([new_allocation], tick)
+            speculation.committed(agent)
+
+            for agent_to_remove in collisions:
+                agents_to_allocate.push(agent_to_remove)
 
         return allocations
 
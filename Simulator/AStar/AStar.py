@@ -1,10 +1,14 @@
 import heapq
+import logging
 from typing import List, Set, TYPE_CHECKING, Tuple
 
 from Simulator.Agents.PathAgent import PathAgent
+from Simulator.History.Tracer import span
 from Simulator.helpers.helpers import is_valid_for_path_allocation
 from .Node import Node
 
+logger = logging.getLogger(__name__)
+
 if TYPE_CHECKING:
     from Simulator.Environment.Environment import Environment
     from Simulator.Coordinates.Coordinate4D import Coordinate4D
@@ -19,13 +23,25 @@ class AStar:
                  tick: int = -1,
                  max_iter: int = 100_000,
                  g_sum: float = 0.2,
-                 height_adjust: float = 0.05):
+                 height_adjust: float = 0.05,
+                 distance_heuristic: bool = False):
+        """
+        :param environment:
+        :param bid_tracker:
+        :param tick:
+        :param max_iter: maximum number of expanded nodes, -1 for no limit
+        :param g_sum: cost of a step
+        :param height_adjust: preference for higher coordinates
+        :param distance_heuristic: estimate the remaining distance by the exact distance around static obstacles
+        instead of the straight line
+        """
         self.environment: "Environment" = environment
         self.tick: int = tick
         self.max_iter: int = max_iter
         self.g_sum: float = g_sum
         self.height_adjust: float = height_adjust
         self.bid_tracker: "BidTracker" = bid_tracker
+        self.distance_heuristic: bool = distance_heuristic
 
     # Implementation based on https://www.annytab.com/a-star-search-algorithm-in-python/
     def astar_loop(self,
@@ -39,7 +55,8 @@ class AStar:
 
         start_node = Node(start, None, start_collisions)
         end_node = Node(end, None, set())
-        open_nodes[hash(start_node)] = start_node
+        dimension = self.environment.dimension
+        open_nodes[start.packed_key(dimension)] = start_node
         heapq.heappush(heap, start_node)
 
         steps = 0
@@ -53,8 +70,9 @@ class AStar:
 
             current_node = heapq.heappop(heap)
 
-            del open_nodes[hash(current_node)]
-            closed_nodes[hash(current_node)] = current_node
+            current_key = current_node.position.packed_key(dimension)
+            del open_nodes[current_key]
+            closed_nodes[current_key] = current_node
 
             # Target reached
             if current_node.position.inter_temporal_equal(end_node.position):
@@ -70,30 +88,37 @@ class AStar:
                 break
 
             # Find non-occupied neighbor
-            neighbors = current_node.adjacent_coordinates(self.environment.dimension, agent.speed)
+            neighbors = current_node.adjacent_coordinates(dimension, agent.speed)
             for next_neighbor in neighbors:
                 valid, collisions = is_valid_for_path_allocation(self.tick, self.environment, self.bid_tracker,
                                                                  next_neighbor, agent)
-                if valid and next_neighbor.t <= self.environment.dimension.t:
+                if valid and next_neighbor.t <= dimension.t:
                     neighbor = Node(next_neighbor, current_node, collisions)
 
                     # Closed node
-                    if hash(neighbor) in closed_nodes:
+                    neighbor_key = next_neighbor.packed_key(dimension)
+                    if neighbor_key in closed_nodes:
                         continue
 
                     neighbor.g = current_node.g + self.g_sum
-                    neighbor.h = neighbor.position.distance(end_node.position, l2=True)
+                    if self.distance_heuristic:
+                        # The field counts steps, each step costs g_sum
+                        neighbor.h = self.g_sum * self.environment.distance_heuristic.distance(neighbor.position,
+                                                                                               end_node.position,
+                                                                                               agent.near_radius)
+                    else:
+                        neighbor.h = neighbor.position.distance(end_node.position, l2=True)
                     neighbor.f = neighbor.g + neighbor.h
 
                     if self.height_adjust > 0.:
                         neighbor.f -= neighbor.position.y / self.environment.dimension.y * \
                                       self.height_adjust * neighbor.h
 
-                    if hash(neighbor) in open_nodes:
-                        if open_nodes[hash(neighbor)].f > neighbor.f:
-                            open_nodes[hash(neighbor)] = neighbor
+                    if neighbor_key in open_nodes:
+                        if open_nodes[neighbor_key].f > neighbor.f:
+                            open_nodes[neighbor_key] = neighbor
                     else:
-                        open_nodes[hash(neighbor)] = neighbor
+                        open_nodes[neighbor_key] = neighbor
                         heapq.heappush(heap, neighbor)
         return path, steps, total_collisions
 
@@ -119,23 +144,27 @@ class AStar:
         time_left = self.environment.dimension.t - start.t
 
         if distance * agent.speed > time_left:
-            print(f"ASTAR failed: Distance {distance} is too great for agent with speed {agent.speed}.")
+            logger.debug("ASTAR failed: Distance %s is too great for agent with speed %s.", distance, agent.speed)
             return [], set()
 
         valid, start_collisions = is_valid_for_path_allocation(self.tick, self.environment, self.bid_tracker, start,
                                                                agent)
 
         if not valid:
-            print(f"ASTAR failed: Start {start} is not valid.")
+            logger.debug("ASTAR failed: Start %s is not valid.", start)
             return [], set()
 
-        path, steps, collisions = self.astar_loop(start, end, agent, start_collisions)
+        with span(self.environment.tracer, "astar", "path_planning"):
+            path, steps, collisions = self.astar_loop(start, end, agent, start_collisions)
+        self.environment.trace_count("astar_searches")
+        self.environment.trace_count("astar_expansions", steps)
 
         if len(path) == 0:
-            print(f"ASTAR failed: {'MaxIter' if steps == self.max_iter else 'No valid Allocation'}")
+            logger.debug("ASTAR failed: %s", "MaxIter" if steps == self.max_iter else "No valid Allocation")
             return [], set()
 
         complete_path = self.complete_path(path, agent)
 
-        print(f"ASTAR: {complete_path[0]} -> {complete_path[-1]},\tPathLen: {len(path):3d},\tSteps: {steps:3d}")
+        logger.debug("ASTAR: %s -> %s,\tPathLen: %3d,\tSteps: %3d", complete_path[0], complete_path[-1], len(path),
+                     steps, extra={"agent": agent.id, "path_length": len(path), "steps": steps})
         return complete_path, collisions
@@ -0,0 +1,93 @@
+import heapq
+import math
+from typing import Callable, Dict, List, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..Coordinates.Coordinate4D import Coordinate4D
+
+Cell = Tuple[float, float, float]
+
+
+class DistanceField:
+    """
+    Exact number of steps from any cell to a target cell through the static free space.
+    The distances are computed lazily by a reverse resumable A* search (RRA*) that starts at the target:
+    a distance query continues the search until the queried cell is expanded. Expanded cells keep their distance,
+    so later queries for the same target are mostly lookups.
+    Moves and bounds are the same as for the time-expanded AStar, but waiting and all dynamic obstacles are ignored.
+    Therefore, the distance is a lower bound for the remaining steps of any valid path.
+    """
+
+    def __init__(self, target: Cell, dimension: "Coordinate4D", is_free: Callable[[Cell], bool]):
+        """
+        :param target: target cell
+        :param dimension: dimension of the environment
+        :param is_free: returns True if a cell is not blocked by a static obstacle
+        """
+        self.target: Cell = target
+        self.dimension: "Coordinate4D" = dimension
+        self.is_free: Callable[[Cell], bool] = is_free
+        self.distances: Dict[Cell, int] = {}
+        self.open_distances: Dict[Cell, int] = {target: 0}
+        self.heap: List[Tuple[float, int, Cell]] = [(0, 0, target)]
+        self.heuristic_target: Cell = target
+
+    def _neighbors(self, cell: Cell) -> List[Cell]:
+        x, y, z = cell
+        res = []
+        if x > 0:
+            res.append((x - 1, y, z))
+        if y > 0:
+            res.append((x, y - 1, z))
+        if z > 0:
+            res.append((x, y, z - 1))
+        if x < self.dimension.x - 1:
+            res.append((x + 1, y, z))
+        if y < self.dimension.y - 1:
+            res.append((x, y + 1, z))
+        if z < self.dimension.z - 1:
+            res.append((x, y, z + 1))
+        return res
+
+    def _heuristic(self, cell: Cell) -> float:
+        return abs(cell[0] - self.heuristic_target[0]) + abs(cell[1] - self.heuristic_target[1]) + \
+            abs(cell[2] - self.heuristic_target[2])
+
+    def distance(self, cell: Cell) -> float:
+        """
+        Returns the number of steps from the cell to the target or infinity if the target cannot be reached.
+        :param cell:
+        :return:
+        """
+        if cell in self.distances:
+            return self.distances[cell]
+
+        # The open list is ordered towards the first queried cell, the manhattan distance to any cell is consistent,
+        # so every expanded cell has its exact distance.
+        if len(self.distances) == 0:
+            self.heuristic_target = cell
+            self.heap = [(self._heuristic(queued) + g, g, queued) for _, g, queued in self.heap]
+            heapq.heapify(self.heap)
+
+        while len(self.heap) > 0:
+            _, g, current = heapq.heappop(self.heap)
+            if current in self.distances:
+                continue
+            self.distances[current] = g
+            del self.open_distances[current]
+
+            for neighbor in self._neighbors(current):
+                if neighbor in self.distances:
+                    continue
+                if neighbor in self.open_distances:
+                    if self.open_distances[neighbor] <= g + 1:
+                        continue
+                elif not self.is_free(neighbor):
+                    continue
+                self.open_distances[neighbor] = g + 1
+                heapq.heappush(self.heap, (g + 1 + self._heuristic(neighbor), g + 1, neighbor))
+
+            if current == cell:
+                return g
+
+        return math.inf
@@ -0,0 +1,73 @@
+import functools
+from collections import OrderedDict
+from typing import Tuple, TYPE_CHECKING
+
+from .DistanceField import Cell, DistanceField
+from ..Coordinates.Coordinate4D import Coordinate4D
+
+if TYPE_CHECKING:
+    from ..Environment.Environment import Environment
+
+
+class DistanceHeuristic:
+    """
+    Heuristic for the AStar search based on the exact distances through the static obstacles of an environment.
+    Keeps the distance fields of the most recently used targets and near-radii.
+    The fields only depend on the static blockers, so they can be shared by all clones of an environment.
+    The fields are not pickled, they are computed again when needed after unpickling.
+    """
+
+    def __init__(self, environment: "Environment", capacity: int = 32):
+        """
+        :param environment:
+        :param capacity: maximum number of cached distance fields
+        """
+        self.environment: "Environment" = environment
+        self.capacity: int = capacity
+        self.fields: "OrderedDict[Tuple[Cell, float], DistanceField]" = OrderedDict()
+
+    def get_field(self, target: "Coordinate4D", near_radius: float) -> "DistanceField":
+        """
+        Returns the distance field to the given target for agents with the given near-radius.
+        :param target:
+        :param near_radius:
+        :return:
+        """
+        key = ((target.x, target.y, target.z), near_radius)
+        if key in self.fields:
+            self.fields.move_to_end(key)
+            return self.fields[key]
+
+        field = DistanceField(key[0], self.environment.dimension, functools.partial(self.is_free, near_radius))
+        self.fields[key] = field
+        if len(self.fields) > self.capacity:
+            self.fields.popitem(last=False)
+        return field
+
+    def is_free(self, near_radius: float, cell: Cell) -> bool:
+        """
+        Returns True if an agent with the given near-radius can pass the cell.
+        :param near_radius:
+        :param cell:
+        :return:
+        """
+        return not self.environment.is_coordinate_blocked_forever(Coordinate4D(cell[0], cell[1], cell[2], 0),
+                                                                  near_radius)
+
+    def distance(self, position: "Coordinate4D", target: "Coordinate4D", near_radius: float) -> float:
+        """
+        Returns the minimal number of steps from the position to the target.
+        :param position:
+        :param target:
+        :param near_radius:
+        :return:
+        """
+        return self.get_field(target, near_radius).distance((position.x, position.y, position.z))
+
+    def __getstate__(self):
+        """
+        The distance fields are left out, they are cheap to compute again compared to their size.
+        """
+        state = self.__dict__.copy()
+        state["fields"] = OrderedDict()
+        return state
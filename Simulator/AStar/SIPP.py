@@ -0,0 +1,250 @@
+import heapq
+import logging
+import math
+from typing import Dict, List, Optional, Set, TYPE_CHECKING, Tuple
+
+from Simulator.Coordinates.Coordinate4D import Coordinate4D
+from Simulator.History.Tracer import span
+from Simulator.helpers.helpers import is_valid_for_path_allocation
+from .AStar import AStar
+
+logger = logging.getLogger(__name__)
+
+if TYPE_CHECKING:
+    from Simulator.Environment.Environment import Environment
+    from Simulator.Agents.Agent import Agent
+    from Simulator.Agents.PathAgent import PathAgent
+    from Simulator.Bids.BidTracker import BidTracker
+
+Cell = Tuple[float, float, float]
+State = Tuple[Cell, int]
+
+
+class SIPP:
+    """
+    Safe interval path planning. Drop-in replacement of the AStar with the same validity and collision semantics.
+    Instead of one node per cell and tick, the search uses one node per cell and safe interval, which is a maximal
+    range of ticks in which the agent can be allocated at the cell. Waiting inside a safe interval is free,
+    so long waits and long horizons do not expand more nodes.
+    Safe intervals are computed lazily per search: only ticks near other agents or dynamic blockers are validated,
+    all other ticks of a cell that is not blocked forever are valid without collisions.
+    The search finds the earliest arrival at the target, ties are broken towards the target.
+    """
+
+    def __init__(self,
+                 environment: "Environment",
+                 bid_tracker: "BidTracker",
+                 tick: int = -1,
+                 max_iter: int = 100_000,
+                 distance_heuristic: bool = False):
+        """
+        :param environment:
+        :param bid_tracker:
+        :param tick:
+        :param max_iter: maximum number of expanded nodes, -1 for no limit
+        :param distance_heuristic: estimate the remaining distance by the exact distance around static obstacles
+        instead of the manhattan distance
+        """
+        self.environment: "Environment" = environment
+        self.tick: int = tick
+        self.max_iter: int = max_iter
+        self.bid_tracker: "BidTracker" = bid_tracker
+        self.distance_heuristic: bool = distance_heuristic
+
+        self._min_tick: int = 0
+        self._max_tick: int = 0
+        self._start: Cell = (0, 0, 0)
+        self._intervals: Dict[Cell, List[Tuple[int, int]]] = {}
+        self._collisions: Dict[Tuple[Cell, int], Set["Agent"]] = {}
+
+    def _neighbors(self, cell: Cell) -> List[Cell]:
+        dimension = self.environment.dimension
+        x, y, z = cell
+        res = []
+        if x > 0:
+            res.append((x - 1, y, z))
+        if y > 0:
+            res.append((x, y - 1, z))
+        if z > 0:
+            res.append((x, y, z - 1))
+        if x < dimension.x - 1:
+            res.append((x + 1, y, z))
+        if y < dimension.y - 1:
+            res.append((x, y + 1, z))
+        if z < dimension.z - 1:
+            res.append((x, y, z + 1))
+        return res
+
+    def safe_intervals(self, cell: Cell, agent: "PathAgent") -> List[Tuple[int, int]]:
+        """
+        Returns the sorted safe intervals [first tick, last tick] of the cell for the running search.
+        Only ticks reachable by the agent are considered, i.e. the start tick plus multiples of the agents speed.
+        :param cell:
+        :param agent:
+        :return:
+        """
+        if cell in self._intervals:
+            return self._intervals[cell]
+
+        speed = agent.speed
+        intervals: List[Tuple[int, int]] = []
+        # The cell cannot be reached before the start tick plus one step per unit of manhattan distance
+        min_tick = self._min_tick + (abs(cell[0] - self._start[0]) + abs(cell[1] - self._start[1]) +
+                                     abs(cell[2] - self._start[2])) * speed
+        coordinate = Coordinate4D(cell[0], cell[1], cell[2], min_tick)
+        if min_tick <= self._max_tick and \
+                not self.environment.is_coordinate_blocked_forever(coordinate, agent.near_radius):
+            candidates: Set[int] = set()
+            occupied = self.environment.occupied_ticks(coordinate, agent, min_tick, self._max_tick + speed)
+            occupied.add(self.tick)
+            for occupied_tick in occupied:
+                first = self._min_tick + math.ceil((occupied_tick - speed - self._min_tick) / speed) * speed
+                candidates.update(range(max(first, min_tick), min(occupied_tick, self._max_tick) + 1, speed))
+
+            invalid_ticks = []
+            for t in sorted(candidates):
+                coordinate.t = t
+                valid, collisions = is_valid_for_path_allocation(self.tick, self.environment, self.bid_tracker,
+                                                                 coordinate, agent)
+                if not valid:
+                    invalid_ticks.append(t)
+                elif len(collisions) > 0:
+                    self._collisions[(cell, t)] = collisions
+
+            interval_start = min_tick
+            for t in invalid_ticks + [self._max_tick + speed]:
+                if t > interval_start:
+                    intervals.append((interval_start, t - speed))
+                interval_start = t + speed
+
+        self._intervals[cell] = intervals
+        return intervals
+
+    def _heuristic(self, cell: Cell, end: "Coordinate4D", agent: "PathAgent") -> float:
+        if self.distance_heuristic:
+            distance = self.environment.distance_heuristic.distance(Coordinate4D(cell[0], cell[1], cell[2], 0), end,
+                                                                    agent.near_radius)
+        else:
+            distance = abs(cell[0] - end.x) + abs(cell[1] - end.y) + abs(cell[2] - end.z)
+        return distance * agent.speed
+
+    def sipp_loop(self,
+                  start: "Coordinate4D",
+                  end: "Coordinate4D",
+                  agent: "PathAgent") -> Tuple[List["Coordinate4D"], int, Set["Agent"]]:
+        start_cell = (start.x, start.y, start.z)
+        end_cell = (end.x, end.y, end.z)
+        speed = agent.speed
+
+        start_state: Optional[State] = None
+        for interval_index, (first, last) in enumerate(self.safe_intervals(start_cell, agent)):
+            if first <= start.t <= last:
+                start_state = (start_cell, interval_index)
+        if start_state is None:
+            return [], 0, set()
+
+        arrivals: Dict[State, int] = {start_state: start.t}
+        parents: Dict[State, Optional[State]] = {start_state: None}
+        closed: Set[State] = set()
+        start_h = self._heuristic(start_cell, end, agent)
+        heap = [(start.t + start_h, start_h, 0, start_state)]
+        counter = 1
+        steps = 0
+        goal: Optional[State] = None
+
+        while len(heap) > 0 and (self.max_iter == -1 or steps < self.max_iter):
+            _, _, _, state = heapq.heappop(heap)
+            if state in closed:
+                continue
+            steps += 1
+            closed.add(state)
+            cell, interval_index = state
+
+            # Target reached
+            if cell == end_cell:
+                goal = state
+                break
+
+            # Leave at the earliest after one step and at the latest at the end of the current interval
+            earliest = arrivals[state] + speed
+            latest = self.safe_intervals(cell, agent)[interval_index][1] + speed
+            for neighbor in self._neighbors(cell):
+                for neighbor_index, (first, last) in enumerate(self.safe_intervals(neighbor, agent)):
+                    if first > latest:
+                        break
+                    if last < earliest:
+                        continue
+                    neighbor_state = (neighbor, neighbor_index)
+                    arrival = max(earliest, first)
+                    if neighbor_state in closed or arrivals.get(neighbor_state, math.inf) <= arrival:
+                        continue
+                    arrivals[neighbor_state] = arrival
+                    parents[neighbor_state] = state
+                    h = self._heuristic(neighbor, end, agent)
+                    heapq.heappush(heap, (arrival + h, h, counter, neighbor_state))
+                    counter += 1
+
+        if goal is None:
+            return [], steps, set()
+
+        states = [goal]
+        while parents[states[-1]] is not None:
+            states.append(parents[states[-1]])
+        states.reverse()
+
+        path: List["Coordinate4D"] = []
+        for state, next_state in zip(states, states[1:] + [None]):
+            last_tick = arrivals[state] if next_state is None else arrivals[next_state] - speed
+            for t in range(arrivals[state], last_tick + 1, speed):
+                path.append(Coordinate4D(state[0][0], state[0][1], state[0][2], t))
+
+        total_collisions = set()
+        for coordinate in path:
+            total_collisions.update(self._collisions.get(((coordinate.x, coordinate.y, coordinate.z), coordinate.t),
+                                                         set()))
+        return path, steps, total_collisions
+
+    def astar(self,
+              start: "Coordinate4D",
+              end: "Coordinate4D",
+              agent: "PathAgent") -> Tuple[List["Coordinate4D"], Set["Agent"]]:
+        """
+        Same interface as AStar.astar, returns the path including waiting coordinates and the agents it collides with.
+        :param start:
+        :param end:
+        :param agent:
+        :return:
+        """
+        distance = start.distance(end)
+        time_left = self.environment.dimension.t - start.t
+
+        if distance * agent.speed > time_left:
+            logger.debug("SIPP failed: Distance %s is too great for agent with speed %s.", distance, agent.speed)
+            return [], set()
+
+        valid, _ = is_valid_for_path_allocation(self.tick, self.environment, self.bid_tracker, start, agent)
+
+        if not valid:
+            logger.debug("SIPP failed: Start %s is not valid.", start)
+            return [], set()
+
+        self._min_tick = start.t
+        self._start = (start.x, start.y, start.z)
+        self._max_tick = start.t + (self.environment.dimension.t - start.t) // agent.speed * agent.speed
+        self._intervals = {}
+        self._collisions = {}
+
+        with span(self.environment.tracer, "sipp", "path_planning"):
+            path, steps, collisions = self.sipp_loop(start, end, agent)
+        self.environment.trace_count("sipp_searches")
+        self.environment.trace_count("sipp_expansions", steps)
+
+        if len(path) == 0:
+            logger.debug("SIPP failed: %s", "MaxIter" if steps == self.max_iter else "No valid Allocation")
+            return [], set()
+
+        complete_path = AStar.complete_path(path, agent)
+
+        logger.debug("SIPP: %s -> %s,\tPathLen: %3d,\tSteps: %3d", complete_path[0], complete_path[-1], len(path),
+                     steps, extra={"agent": agent.id, "path_length": len(path), "steps": steps})
+        return complete_path, collisions
@@ -1,3 +1,4 @@
+import hashlib
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional, TYPE_CHECKING
 
@@ -9,6 +10,16 @@ if TYPE_CHECKING:
     from ..ValueFunction.ValueFunction import ValueFunction
 
 
+def stable_hash(agent_id: str) -> int:
+    """
+    Returns a 64 bit hash of an agent id that is the same in every process. The hash of a str is randomized per
+    process, but the agent hashes are stored in checkpoints as keys of the agents, the rtree and the reservations.
+    :param agent_id:
+    :return:
+    """
+    return int.from_bytes(hashlib.blake2b(agent_id.encode(), digest_size=8).digest(), "little", signed=True)
+
+
 class Agent(ABC):
     agent_type: str
 
@@ -19,6 +30,7 @@ class Agent(ABC):
                  config: Optional[Dict[str, Any]] = None,
                  _is_clone: bool = False):
         self.id: str = agent_id
+        self._hash: int = stable_hash(agent_id)
         self.bidding_strategy: "BiddingStrategy" = bidding_strategy
         self.value_function = value_function
         self.config: Dict[str, Any] = config if config is not None else {}
@@ -26,7 +38,7 @@ class Agent(ABC):
         self.allocated_segments: List["Segment"] = []
 
     def __hash__(self):
-        return hash(self.id)
+        return self._hash
 
     def value_for_segments(self, segments: List["Segment"]) -> float:
         return self.value_function.value_for_segments(segments, self)
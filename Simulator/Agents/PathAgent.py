@@ -49,20 +49,64 @@ class PathAgent(Agent):
 
         self.allocated_segments: List["PathSegment"] = []
 
+    @property
+    def allocated_segments(self) -> List["PathSegment"]:
+        return self._allocated_segments
+
+    @allocated_segments.setter
+    def allocated_segments(self, segments: List["PathSegment"]):
+        self._allocated_segments = segments
+        self._positions: Optional[List[Optional["PathSegment"]]] = None
+        self._positions_offset: int = 0
+
+    def _get_positions(self) -> List[Optional["PathSegment"]]:
+        """
+        Returns the tick index of the allocated positions, the entry at index i is the segment holding the position
+        at tick i + _positions_offset or None if nothing is allocated at this tick.
+        The index is built lazily and dropped whenever the allocated segments are replaced.
+        :return:
+        """
+        if self._positions is None:
+            self._positions = []
+            for segment in self._allocated_segments:
+                self._index_segment(segment)
+        return self._positions
+
+    def _index_segment(self, path_segment: "PathSegment"):
+        """
+        Add the coordinates of a segment to the tick index. Ticks that are already indexed are not overwritten,
+        so the first segment covering a tick wins.
+        :param path_segment:
+        :return:
+        """
+        if path_segment.nr_voxels == 0:
+            return
+        if len(self._positions) == 0:
+            self._positions_offset = path_segment.min.t
+        elif path_segment.min.t < self._positions_offset:
+            self._positions[0:0] = [None] * (self._positions_offset - path_segment.min.t)
+            self._positions_offset = path_segment.min.t
+        end_index = path_segment.max.t - self._positions_offset + 1
+        if end_index > len(self._positions):
+            self._positions.extend([None] * (end_index - len(self._positions)))
+        for index in range(path_segment.min.t - self._positions_offset, end_index):
+            if self._positions[index] is None:
+                self._positions[index] = path_segment
+
     def get_position_at_tick(self, tick: int) -> Optional["Coordinate4D"]:
-        for segment in self.allocated_segments:
-            if segment.max.t >= tick >= segment.min.t:
-                index = tick - segment.min.t
-                return segment.coordinates[index]
+        positions = self._get_positions()
+        index = tick - self._positions_offset
+        if 0 <= index < len(positions) and positions[index] is not None:
+            segment = positions[index]
+            return segment.coordinate_at(tick - segment.min.t)
         return None
 
     def get_positions_at_ticks(self, min_tick: int, max_tick: int) -> List["Coordinate4D"]:
-        positions = []
-        for tick in range(min_tick, max_tick + 1):  # Include upper bound
-            position = self.get_position_at_tick(tick)
-            if position is not None:
-                positions.append(position)
-        return positions
+        positions = self._get_positions()
+        min_index = max(min_tick - self._positions_offset, 0)
+        max_index = min(max_tick - self._positions_offset + 1, len(positions))  # Include upper bound
+        return [positions[index].coordinate_at(index + self._positions_offset - positions[index].min.t)
+                for index in range(min_index, max_index) if positions[index] is not None]
 
     def initialize_clone(self):
         clone = PathAgent(self.id,
@@ -92,6 +136,8 @@ class PathAgent(Agent):
             self.allocated_segments[-1].join(path_segment)
         else:
             self.allocated_segments.append(path_segment)
+        if self._positions is not None:
+            self._index_segment(path_segment)
 
     def get_allocated_coords(self) -> List["Coordinate4D"]:
         return [coord for path_segment in self.allocated_segments for coord in path_segment.coordinates]
@@ -102,8 +148,8 @@ class PathAgent(Agent):
         for segment in self.allocated_segments:
             if segment.max.t >= min_t and segment.min.t <= max_t:
                 min_index = max(min_t - segment.min.t, 0)
-                max_index = min(max_t - segment.min.t, len(segment.coordinates) - 1)
-                for coordinate in segment.coordinates[min_index:max_index]:
+                max_index = min(max_t - segment.min.t, segment.nr_voxels - 1)
+                for coordinate in segment.iter_coordinates(min_index, max_index):
                     distance = coordinate.distance(other_coordinate)
                     if distance == 0:
                         return True
@@ -1,8 +1,11 @@
+import logging
 from typing import Any, Dict, List, Optional, Set, TYPE_CHECKING
 
 from .Agent import Agent
 from .AgentType import AgentType
 
+logger = logging.getLogger(__name__)
+
 if TYPE_CHECKING:
     from ..Segments.SpaceSegment import SpaceSegment
     from ..ValueFunction.ValueFunction import ValueFunction
@@ -31,9 +34,8 @@ class SpaceAgent(Agent):
                 assert existing_segment.max.inter_temporal_equal(space_segment.max)
                 assert existing_segment.max.t + 1 == space_segment.min.t
                 existing_segment.max.t = space_segment.max.t
-                print(
-                    f"merged: {existing_segment.min},\n{existing_segment.max} \nfrom {space_segment.min},"
-                    f"\n{space_segment.max}")
+                logger.debug("merged: %s,\n%s \nfrom %s,\n%s", existing_segment.min, existing_segment.max,
+                             space_segment.min, space_segment.max)
                 return
         self.allocated_segments.append(space_segment)
 
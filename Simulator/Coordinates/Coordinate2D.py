@@ -3,6 +3,7 @@ from typing import Dict
 
 
 class Coordinate2D:
+    __slots__ = ("x", "z")
 
     def __init__(self, x: float, z: float):
         self.x: float = x
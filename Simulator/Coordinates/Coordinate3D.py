@@ -5,6 +5,7 @@ from .Coordinate2D import Coordinate2D
 
 
 class Coordinate3D(Coordinate2D):
+    __slots__ = ("y",)
 
     def __init__(self, x: float, y: float, z: float):
         super().__init__(x, z)
@@ -6,6 +6,8 @@ from .Coordinate3D import Coordinate3D
 
 
 class Coordinate4D(Coordinate3D):
+    __slots__ = ("t",)
+
     def __init__(self, x: float, y: float, z: float, t: int):
         super().__init__(x, y, z)
         self.t: int = t
@@ -53,8 +55,17 @@ class Coordinate4D(Coordinate3D):
                self.z <= other.z and \
                self.t <= other.t
 
-    def __hash__(self) -> float:
-        return hash(f"{self.x}:{self.y}:{self.z}:{self.t}")
+    def __hash__(self) -> int:
+        return hash((self.x, self.y, self.z, self.t))
+
+    def packed_key(self, dimension: "Coordinate4D") -> int:
+        """
+        Packs the coordinate into a single integer, which is unique for all grid coordinates within the given
+        dimension. Cheaper to hash and to compare than the coordinate itself.
+        :param dimension: dimension of the environment
+        :return:
+        """
+        return ((self.t * (dimension.z + 1) + self.z) * (dimension.y + 1) + self.y) * (dimension.x + 1) + self.x
 
     def inter_temporal_equal(self, other) -> bool:
         return super().__eq__(other)
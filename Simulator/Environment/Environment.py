@@ -1,11 +1,19 @@
-from typing import Dict, Iterator, List, Optional, Set, TYPE_CHECKING, cast
+import heapq
+import math
+from typing import Dict, List, Optional, Set, TYPE_CHECKING, Tuple, cast
 
 from rtree import Index
 
+from ..AStar.DistanceHeuristic import DistanceHeuristic
 from ..Agents.PathAgent import PathAgent
 from ..Agents.SpaceAgent import SpaceAgent
 from ..Blocker.BlockerType import BlockerType
-from ..helpers.helpers import setup_rtree
+from ..Blocker.BuildingBlocker import BuildingBlocker
+from ..History.Tracer import span
+from ..helpers.helpers import rtree_entries, setup_rtree
+from .EnvironmentTransaction import EnvironmentTransaction
+from .HeightRaster import HeightRaster
+from .SpatialHashReservationIndex import SpatialHashReservationIndex
 
 if TYPE_CHECKING:
     from ..Blocker.Blocker import Blocker
@@ -14,13 +22,24 @@ if TYPE_CHECKING:
     from ..Allocations.Allocation import Allocation
     from ..Segments.PathSegment import PathSegment
     from ..Segments.SpaceSegment import SpaceSegment
+    from .ReservationIndex import ReservationIndex
+    from ..History.Tracer import Tracer
 
 
 class Environment:
     def __init__(self,
                  dimension: "Coordinate4D",
                  blockers: Optional[List["Blocker"]] = None,
-                 min_height: int = 0):
+                 min_height: int = 0,
+                 reservations: Optional["ReservationIndex"] = None,
+                 sliding_window: bool = False):
+        """
+        :param dimension:
+        :param blockers:
+        :param min_height:
+        :param reservations: index of the path agent reservations, a spatial hash by default
+        :param sliding_window: move allocations that can no longer be validated against from the rtree to an archive
+        """
 
         self.dimension: "Coordinate4D" = dimension
         self.min_height = min_height
@@ -34,11 +53,43 @@ class Environment:
             blocker.id = self._get_blocker_id()
             self.blocker_dict[blocker.id] = blocker
             blocker.add_to_tree(self.blocker_tree, self.dimension)
+        self.height_raster = HeightRaster(self.dimension,
+                                          [blocker for blocker in blockers if isinstance(blocker, BuildingBlocker)])
+        self.distance_heuristic = DistanceHeuristic(self)
 
         self.tree = setup_rtree()
+        self.agent_boxes: Dict[int, List[List[float]]] = {}
+        self.sliding_window: bool = sliding_window
+        self.archive = setup_rtree()
+        self.archived_until: Optional[int] = None
+        self._expiry_heap: List[Tuple[float, int, int, List[float]]] = []
+        self._nr_tree_inserts: int = 0
+        self.reservations: "ReservationIndex" = reservations if reservations is not None \
+            else SpatialHashReservationIndex()
         self.agents: Dict[int, "Agent"] = {}
         self.payments: Dict[int, float] = {}
         self.max_near_radius = 0
+        self.max_speed = 0
+        self.nr_space_agents = 0
+        self.transaction: Optional["EnvironmentTransaction"] = None
+        # Boxes of all queries for other agents while they are recorded, see SpeculativePathPlanner
+        self.query_log: Optional[List[List[float]]] = None
+        # Records the phases of the simulation and counts the queries if tracing is enabled
+        self.tracer: Optional["Tracer"] = None
+
+    def record_query(self, bbox: List[float]):
+        """
+        Remember that the result of a query depended on the agents inside the given box, if queries are recorded.
+        """
+        if self.query_log is not None:
+            self.query_log.append(bbox)
+
+    def trace_count(self, name: str, value: int = 1):
+        """
+        Increases a counter of the tracer, if tracing is enabled.
+        """
+        if self.tracer is not None:
+            self.tracer.count(name, value)
 
     def _get_blocker_id(self) -> int:
         """
@@ -59,10 +110,137 @@ class Environment:
         else:
             raise Exception(f"Unknown agent class {agent.__class__}")
 
+    def _tree_insert(self, agent_hash: int, bbox: List[float]):
+        """
+        Insert an entry into the rtree and record it in the active transaction.
+        """
+        self.tree.insert(agent_hash, bbox)
+        if agent_hash not in self.agent_boxes:
+            self.agent_boxes[agent_hash] = []
+        self.agent_boxes[agent_hash].append(bbox)
+        if self.sliding_window:
+            heapq.heappush(self._expiry_heap, (bbox[7], self._nr_tree_inserts, agent_hash, bbox))
+            self._nr_tree_inserts += 1
+        if self.transaction is not None:
+            self.transaction.log_tree_insert(agent_hash, bbox)
+
+    def _tree_delete(self, agent_hash: int, bbox: List[float]):
+        """
+        Delete an entry from the rtree and record it in the active transaction.
+        Entries that were never inserted are ignored.
+        """
+        boxes = self.agent_boxes.get(agent_hash, [])
+        if bbox not in boxes:
+            return
+        boxes.remove(bbox)
+        self.tree.delete(agent_hash, bbox)
+        if self.transaction is not None:
+            self.transaction.log_tree_delete(agent_hash, bbox)
+
+    def _reserve(self, agent_hash: int, coord: "Coordinate4D"):
+        """
+        Reserve a voxel in the reservation index and record it in the active transaction.
+        """
+        if self.reservations.insert(agent_hash, coord) and self.transaction is not None:
+            self.transaction.log_reservation(agent_hash, coord)
+
+    def _release(self, agent_hash: int, coord: "Coordinate4D"):
+        """
+        Release a voxel in the reservation index and record it in the active transaction.
+        """
+        if self.reservations.remove(agent_hash, coord) and self.transaction is not None:
+            self.transaction.log_release(agent_hash, coord)
+
+    def _touch_agent(self, agent: "Agent"):
+        """
+        Copy the segments of an agent before they are changed in the active transaction.
+        """
+        if self.transaction is not None:
+            self.transaction.touch_agent(agent)
+
+    def begin_transaction(self):
+        """
+        Start recording all changes to the environment, so they can be rolled back.
+        """
+        assert self.transaction is None
+        self.transaction = EnvironmentTransaction(self.max_near_radius, self.max_speed, self.nr_space_agents)
+
+    def commit_transaction(self):
+        """
+        Keep all changes of the active transaction.
+        """
+        assert self.transaction is not None
+        self.transaction = None
+
+    def rollback_transaction(self):
+        """
+        Undo all changes of the active transaction.
+        Restores the rtree, the reservations, the agents and their segments.
+        """
+        assert self.transaction is not None
+        transaction = self.transaction
+        self.transaction = None
+
+        for inserted, agent_hash, bbox in reversed(transaction.tree_log):
+            if inserted:
+                self._tree_delete(agent_hash, bbox)
+            else:
+                self._tree_insert(agent_hash, bbox)
+
+        for reserved, agent_hash, coord in reversed(transaction.reservation_log):
+            if reserved:
+                self.reservations.remove(agent_hash, coord)
+            else:
+                self.reservations.insert(agent_hash, coord)
+
+        for agent, segments in transaction.original_segments.values():
+            agent.allocated_segments = segments
+
+        for agent_hash in transaction.added_agents:
+            del self.agents[agent_hash]
+
+        self.max_near_radius = transaction.max_near_radius
+        self.max_speed = transaction.max_speed
+        self.nr_space_agents = transaction.nr_space_agents
+
+    def evict_expired(self, tick: int):
+        """
+        Move all rtree entries that ended before tick - max_speed to the archive.
+        No validation starting at the given tick or later can intersect these entries, so they only slow down
+        the queries. Queries reaching into the archived time range still consider the archive.
+        Does nothing if the sliding window is disabled.
+        """
+        if not self.sliding_window:
+            return
+        assert self.transaction is None
+        threshold = tick - self.max_speed
+        while len(self._expiry_heap) > 0 and self._expiry_heap[0][0] < threshold:
+            _, _, agent_hash, bbox = heapq.heappop(self._expiry_heap)
+            boxes = self.agent_boxes.get(agent_hash, [])
+            if bbox in boxes:
+                boxes.remove(bbox)
+                self.tree.delete(agent_hash, bbox)
+                self.archive.insert(agent_hash, bbox)
+        if self.archived_until is None or threshold > self.archived_until:
+            self.archived_until = threshold
+
+    def _tree_intersection(self, bbox: List[float]) -> Set[int]:
+        """
+        Returns the hashes of all agents with an rtree entry intersecting the given box.
+        The archive is only queried if the box reaches into the archived time range.
+        """
+        self.trace_count("rtree_queries")
+        agent_hashes = set(self.tree.intersection(bbox))
+        if self.archived_until is not None and bbox[3] < self.archived_until:
+            self.trace_count("rtree_queries")
+            agent_hashes.update(self.archive.intersection(bbox))
+        return agent_hashes
+
     def deallocate_path_agent(self, agent: "PathAgent", time_step: int):
         """
         Deallocate all future path segments of a path agent.
         """
+        self._touch_agent(agent)
         new_segments = []
         for path_segment in agent.allocated_segments:
             if path_segment.max.t <= time_step:
@@ -77,34 +255,36 @@ class Environment:
 
     def deallocate_path_segment_for_agent(self, agent: "PathAgent", path_segment: "PathSegment", time_step: int):
         """
-        Allocate a path segment.
+        Deallocate a path segment after the given time step.
         """
-        min_index = max(time_step - path_segment.min.t, 0)
-        for coord in path_segment.coordinates[min_index::agent.speed]:
-            intersections = self.tree.intersection(coord.tree_query_point_rep(), objects=True)
-            for intersection in intersections:
-                _index = intersection.id
-                bbox = intersection.bbox
-                if _index == hash(agent):
-                    self.tree.delete(hash(agent), bbox)
-                    if bbox[3] <= int(time_step):
-                        bbox[7] = int(time_step)
-                        self.tree.insert(hash(agent), bbox)
+        # The coordinate at the time step stays allocated, a segment starting after the time step is released fully
+        first_index = 0 if time_step < path_segment.min.t else time_step - path_segment.min.t + 1
+        for coord in path_segment.iter_coordinates(first_index):
+            self._release(hash(agent), coord)
+
+        agent_hash = hash(agent)
+        for bbox in list(self.agent_boxes.get(agent_hash, [])):
+            # Entries of this segment that are not over yet
+            if bbox[3] >= path_segment.min.t and bbox[7] <= path_segment.max.t and bbox[7] >= time_step:
+                self._tree_delete(agent_hash, bbox)
+                if bbox[3] <= int(time_step):
+                    self._tree_insert(agent_hash, bbox[:7] + [int(time_step)])
 
     def deallocate_space_agent(self, agent: "SpaceAgent", time_step: int):
         """
         Deallocate all future space segments of a space agent.
         """
+        self._touch_agent(agent)
         new_segments = []
         for space_segment in agent.allocated_segments:
             if space_segment.max.t <= time_step:
                 new_segments.append(space_segment)
             else:
-                self.tree.delete(hash(agent), space_segment.tree_rep())
+                self._tree_delete(hash(agent), space_segment.tree_rep())
                 if space_segment.min.t < time_step:
                     first, _ = space_segment.split_temporal(time_step)
                     new_segments.append(first)
-                    self.tree.insert(hash(agent), first.tree_rep())
+                    self._tree_insert(hash(agent), first.tree_rep())
 
         agent.allocated_segments = new_segments
 
@@ -126,22 +306,25 @@ class Environment:
         """
         Allocate a path segment.
         """
+        self._touch_agent(agent)
         agent.add_allocated_segment(path_segment)
         inter_temporal_equal: List["Coordinate4D"] = []
-        for coord in path_segment.coordinates:
+        for coord in path_segment.iter_coordinates():
+            self._reserve(hash(agent), coord)
             if len(inter_temporal_equal) != 0 and not coord.inter_temporal_equal(inter_temporal_equal[-1]):
-                self.tree.insert(hash(agent), inter_temporal_equal[0].list_rep() + inter_temporal_equal[-1].list_rep())
+                self._tree_insert(hash(agent), inter_temporal_equal[0].list_rep() + inter_temporal_equal[-1].list_rep())
                 inter_temporal_equal = []
             inter_temporal_equal.append(coord)
 
-        self.tree.insert(hash(agent), inter_temporal_equal[0].list_rep() + inter_temporal_equal[-1].list_rep())
+        self._tree_insert(hash(agent), inter_temporal_equal[0].list_rep() + inter_temporal_equal[-1].list_rep())
 
     def allocate_space_segment_for_agent(self, agent: "SpaceAgent", space_segment: "SpaceSegment"):
         """
         Allocate a space segment.
         """
+        self._touch_agent(agent)
         agent.add_allocated_segment(space_segment)
-        self.tree.insert(hash(agent), space_segment.tree_rep())
+        self._tree_insert(hash(agent), space_segment.tree_rep())
 
     def allocate_segments_for_agents(self,
                                      allocations: List["Allocation"],
@@ -196,6 +379,7 @@ class Environment:
         Returns a list of all blocker IDs that intersect a qube around the given coordinate with size 2 * radius.
         All time steps from coordinate.t to coordinate.t + speed are considered.
         """
+        self.trace_count("rtree_queries")
         blocker_ids = set(self.blocker_tree.intersection(coord.tree_query_cube_rep(radius, speed)))
         return set([self.blocker_dict[blocker_id] for blocker_id in blocker_ids])
 
@@ -203,6 +387,7 @@ class Environment:
         """
         Returns a list of all blocker IDs that intersect a space.
         """
+        self.trace_count("rtree_queries")
         blocker_ids = set(self.blocker_tree.intersection(min_coord.list_rep() + max_coord.list_rep()))
         return set([self.blocker_dict[blocker_id] for blocker_id in blocker_ids])
 
@@ -212,11 +397,25 @@ class Environment:
         All time steps from coordinate.t to coordinate.t + speed are considered.
         The radius is abstracted by a qube around the given coordinate with size 2 * radius.
         """
+        raster_blocking = self.height_raster.is_blocking(coord, agent.near_radius)
+        if raster_blocking:
+            return True
+        rasterized_ids = self._rasterized_blocker_ids(raster_blocking)
+        if len(rasterized_ids) == len(self.blocker_dict):
+            return False
         for blocker in self.get_blockers_at_coordinate(coord, agent.near_radius, agent.speed):
-            if blocker.is_blocking(coord, agent.near_radius):
+            if blocker.id not in rasterized_ids and blocker.is_blocking(coord, agent.near_radius):
                 return True
         return False
 
+    def _rasterized_blocker_ids(self, raster_blocking: Optional[bool]) -> Set[int]:
+        """
+        Returns the IDs of the blockers that were already checked by the height raster.
+        """
+        if raster_blocking is None:
+            return set()
+        return self.height_raster.blocker_ids
+
     def is_space_blocked(self, min_coord: "Coordinate4D", max_coord: "Coordinate4D") -> bool:
         """
         Returns True if there is a blocker in the given space.
@@ -231,8 +430,15 @@ class Environment:
         Returns True if there is a static blocker at the given coordinate or in its radius.
         The radius is abstracted by a qube around the given coordinate with size 2 * radius.
         """
+        raster_blocking = self.height_raster.is_blocking(coordinate, radius)
+        if raster_blocking:
+            return True
+        rasterized_ids = self._rasterized_blocker_ids(raster_blocking)
+        if len(rasterized_ids) == len(self.blocker_dict):
+            return False
         for blocker in self.get_blockers_at_coordinate(coordinate, radius, 0):
-            if blocker.blocker_type == BlockerType.STATIC.value and blocker.is_blocking(coordinate, radius):
+            if blocker.id not in rasterized_ids and blocker.blocker_type == BlockerType.STATIC.value and \
+                    blocker.is_blocking(coordinate, radius):
                 return True
         return False
 
@@ -265,9 +471,14 @@ class Environment:
         """
         Add a new agent and record its radii.
         """
+        if self.transaction is not None and hash(agent) not in self.agents:
+            self.transaction.added_agents.append(hash(agent))
         self.agents[hash(agent)] = agent
         if isinstance(agent, PathAgent):
             self.max_near_radius = max(self.max_near_radius, agent.near_radius)
+            self.max_speed = max(self.max_speed, agent.speed)
+        elif isinstance(agent, SpaceAgent):
+            self.nr_space_agents += 1
 
     def other_agents_in_space(self,
                               bottom_left: "Coordinate4D",
@@ -276,7 +487,7 @@ class Environment:
         """
         Returns a set of all agents in the given space that are not the given agent.
         """
-        intersections: Iterator[int] = self.tree.intersection(bottom_left.list_rep() + top_right.list_rep())
+        intersections: Set[int] = self._tree_intersection(bottom_left.list_rep() + top_right.list_rep())
         other_agents: List["Agent"] = [self.agents[intersection_id] for intersection_id in intersections if
                                        intersection_id != hash(agent)]
         return set(other_agents)
@@ -285,7 +496,7 @@ class Environment:
         """
         Returns all other agent in the space
         """
-        agent_hashes = set(self.tree.intersection(space_segment.tree_rep()))
+        agent_hashes = self._tree_intersection(space_segment.tree_rep())
         return set([self.agents[agent_hash] for agent_hash in agent_hashes if agent_hash != hash(space_agent)])
 
     def intersect_space_coordinates(self,
@@ -301,7 +512,7 @@ class Environment:
         max_corner = max_coords + self.max_near_radius if use_max_radius else max_coords
         min_corner.t = min_coords.t
         max_corner.t = max_coords.t
-        agent_hashes = set(self.tree.intersection(min_corner.list_rep() + max_corner.list_rep()))
+        agent_hashes = self._tree_intersection(min_corner.list_rep() + max_corner.list_rep())
         return set([self.agents[agent_hash] for agent_hash in agent_hashes if agent_hash != hash(space_agent)])
 
     def intersect_path_coordinate(self,
@@ -313,26 +524,83 @@ class Environment:
         Returns all other agents intersecting with the given coordinate.
         All time steps from coordinate.t to coordinate.t + speed are considered.
         The radius is abstracted by a qube around the given coordinate with size 2 * radius.
+        Path agents are looked up in the reservation index, the rtree is only queried for space agents.
         """
         speed: int = path_agent.speed - 1 if include_speed else 0
         radius: int = max(path_agent.near_radius, self.max_near_radius) if use_max_radius else path_agent.near_radius
-        agent_hashes = set(self.tree.intersection(coords.tree_query_cube_rep(radius, speed)))
+        self.record_query(coords.tree_query_cube_rep(radius, speed))
+        self.trace_count("reservation_queries")
+        agent_hashes = self.reservations.intersect(coords, radius, speed)
+        if self.nr_space_agents > 0:
+            agent_hashes.update(self._tree_intersection(coords.tree_query_cube_rep(radius, speed)))
         return set([self.agents[agent_hash] for agent_hash in agent_hashes if agent_hash != hash(path_agent)])
 
+    def occupied_ticks(self, coords: "Coordinate4D", path_agent: "PathAgent", min_tick: int, max_tick: int) -> Set[int]:
+        """
+        Returns a superset of the ticks in [min_tick, max_tick] at which another agent or a non-static blocker is
+        near the given coordinate. The time of the coordinate is ignored.
+        If the coordinate is not blocked forever, an allocation at tick t can only be invalid if one of the ticks
+        t to t + speed is returned.
+        """
+        radius: int = max(path_agent.near_radius, self.max_near_radius)
+        self.trace_count("reservation_queries")
+        ticks = self.reservations.reserved_ticks(coords, radius, min_tick, max_tick)
+        column = [coords.x - radius, coords.y - radius, coords.z - radius, min_tick,
+                  coords.x + radius, coords.y + radius, coords.z + radius, max_tick]
+        self.record_query(column)
+        if self.nr_space_agents > 0:
+            for agent_hash in self._tree_intersection(column):
+                agent = self.agents[agent_hash]
+                if isinstance(agent, SpaceAgent):
+                    for segment in agent.allocated_segments:
+                        if segment.min.x <= column[4] and segment.max.x >= column[0] and \
+                                segment.min.y <= column[5] and segment.max.y >= column[1] and \
+                                segment.min.z <= column[6] and segment.max.z >= column[2]:
+                            ticks.update(range(max(segment.min.t, min_tick), min(segment.max.t, max_tick) + 1))
+        self.trace_count("rtree_queries")
+        for item in self.blocker_tree.intersection(column, objects=True):
+            if self.blocker_dict[item.id].blocker_type != BlockerType.STATIC.value:
+                ticks.update(range(max(math.floor(item.bbox[3]), min_tick),
+                                   min(math.ceil(item.bbox[7]), max_tick) + 1))
+        return ticks
+
     def new_clear(self):
         """
         Returns a new environment without any allocated agents.
         """
-        new_env = Environment(self.dimension, min_height=self.min_height)
+        new_env = Environment(self.dimension, min_height=self.min_height, reservations=self.reservations.new_clear(),
+                              sliding_window=self.sliding_window)
         new_env.blocker_dict = self.blocker_dict
         new_env._blocker_id = self._blocker_id
         new_env.blocker_tree = self.blocker_tree
+        new_env.height_raster = self.height_raster
+        new_env.distance_heuristic = self.distance_heuristic
+        new_env.tracer = self.tracer
         return new_env
 
+    def __getstate__(self):
+        """
+        The rtrees cannot be pickled, they are pickled as lists of their entries instead.
+        """
+        assert self.transaction is None
+        state = self.__dict__.copy()
+        for name in ("blocker_tree", "tree", "archive"):
+            state[name] = rtree_entries(state[name])
+        return state
+
+    def __setstate__(self, state):
+        for name in ("blocker_tree", "tree", "archive"):
+            state[name] = setup_rtree(state[name]) if len(state[name]) > 0 else setup_rtree()
+        self.__dict__.update(state)
+
     def clone(self):
         """
         Returns a clone of the environment with clones of all agents.
         """
+        with span(self.tracer, "environment_clone"):
+            return self._clone()
+
+    def _clone(self):
         if len(self.tree) > 0:
             all_items = self.tree.intersection(self.tree.bounds, objects=True)
             cloned_tree: "Index" = setup_rtree(all_items)
@@ -340,11 +608,21 @@ class Environment:
         else:
             cloned_tree: "Index" = setup_rtree()
 
-        cloned = Environment(self.dimension, min_height=self.min_height)
+        cloned = Environment(self.dimension, min_height=self.min_height, reservations=self.reservations.clone(),
+                             sliding_window=self.sliding_window)
         cloned.blocker_dict = self.blocker_dict
         cloned._blocker_id = self._blocker_id
         cloned.tree = cloned_tree
+        cloned.agent_boxes = {agent_hash: list(boxes) for agent_hash, boxes in self.agent_boxes.items()}
+        if len(self.archive) > 0:
+            cloned.archive = setup_rtree(self.archive.intersection(self.archive.bounds, objects=True))
+        cloned.archived_until = self.archived_until
+        cloned._expiry_heap = list(self._expiry_heap)
+        cloned._nr_tree_inserts = self._nr_tree_inserts
         cloned.blocker_tree = self.blocker_tree
+        cloned.height_raster = self.height_raster
+        cloned.distance_heuristic = self.distance_heuristic
+        cloned.tracer = self.tracer
         for agent in self.agents.values():
             cloned.add_agent(agent.clone())
 
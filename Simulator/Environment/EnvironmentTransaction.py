@@ -0,0 +1,54 @@
+from typing import Dict, List, TYPE_CHECKING, Tuple
+
+if TYPE_CHECKING:
+    from ..Agents.Agent import Agent
+    from ..Coordinates.Coordinate4D import Coordinate4D
+    from ..Segments.Segment import Segment
+
+
+class EnvironmentTransaction:
+    """
+    Undo-log of all changes applied to an environment since the transaction was started.
+    Agents are copied on write: the first time an agent is changed, its original segments are stored and the
+    agent continues to work on clones. Rolling back restores the original segments, so the cost of a transaction
+    only depends on the agents and index entries it touched.
+    """
+
+    def __init__(self, max_near_radius: float, max_speed: int, nr_space_agents: int):
+        """
+        Remember the scalar state of the environment at the start of the transaction.
+        :param max_near_radius:
+        :param max_speed:
+        :param nr_space_agents:
+        """
+        self.max_near_radius: float = max_near_radius
+        self.max_speed: int = max_speed
+        self.nr_space_agents: int = nr_space_agents
+        self.added_agents: List[int] = []
+        self.original_segments: Dict[int, Tuple["Agent", List["Segment"]]] = {}
+        self.tree_log: List[Tuple[bool, int, List[float]]] = []
+        self.reservation_log: List[Tuple[bool, int, "Coordinate4D"]] = []
+
+    def touch_agent(self, agent: "Agent"):
+        """
+        Store the original segments of the agent and replace them with clones before the agent is changed.
+        :param agent:
+        :return:
+        """
+        agent_hash = hash(agent)
+        if agent_hash in self.original_segments:
+            return
+        self.original_segments[agent_hash] = (agent, agent.allocated_segments)
+        agent.allocated_segments = [segment.clone() for segment in agent.allocated_segments]
+
+    def log_tree_insert(self, agent_hash: int, bbox: List[float]):
+        self.tree_log.append((True, agent_hash, bbox))
+
+    def log_tree_delete(self, agent_hash: int, bbox: List[float]):
+        self.tree_log.append((False, agent_hash, bbox))
+
+    def log_reservation(self, agent_hash: int, coordinate: "Coordinate4D"):
+        self.reservation_log.append((True, agent_hash, coordinate))
+
+    def log_release(self, agent_hash: int, coordinate: "Coordinate4D"):
+        self.reservation_log.append((False, agent_hash, coordinate))
@@ -0,0 +1,94 @@
+import math
+from typing import Dict, List, Optional, Set, TYPE_CHECKING
+
+import numpy as np
+import shapely
+from shapely.geometry import Polygon
+
+if TYPE_CHECKING:
+    from ..Blocker.BuildingBlocker import BuildingBlocker
+    from ..Coordinates.Coordinate4D import Coordinate4D
+
+
+class HeightRaster:
+    """
+    2.5D raster of the buildings in an environment at grid resolution.
+    For every (x, z) cell and near-radius the raster holds the effective blocking height: the highest y at which a
+    coordinate in this cell is still within the near-radius of a building. This turns static blocker checks into
+    array lookups. Shapely is only used to build the raster.
+    Only buildings standing on the ground are rasterized, all other blockers are not covered by the raster.
+    """
+
+    def __init__(self, dimension: "Coordinate4D", buildings: List["BuildingBlocker"]):
+        """
+        :param dimension: dimension of the environment
+        :param buildings: buildings to rasterize, every building must have a valid blocker id
+        """
+        self.dimension: "Coordinate4D" = dimension
+        self.size_x: int = math.floor(dimension.x) + 1
+        self.size_z: int = math.floor(dimension.z) + 1
+        self.buildings: List["BuildingBlocker"] = [building for building in buildings if building.location.y <= 0]
+        self.blocker_ids: Set[int] = set([building.id for building in self.buildings])
+        self.effective_heights: Dict[float, np.ndarray] = {}
+        self.get_effective_heights(0)
+
+    def get_effective_heights(self, radius: float) -> np.ndarray:
+        """
+        Returns the effective blocking heights for the given radius. Computed once per distinct radius.
+        A cell blocks coordinates with y <= effective height, cells without buildings hold -inf.
+        :param radius:
+        :return:
+        """
+        if radius in self.effective_heights:
+            return self.effective_heights[radius]
+
+        heights = np.full((self.size_x, self.size_z), -np.inf)
+        for building in self.buildings:
+            min_x = max(math.ceil(building.location.x - radius), 0)
+            max_x = min(math.floor(building.location.x + building.dimension.x + radius), self.size_x - 1)
+            min_z = max(math.ceil(building.location.z - radius), 0)
+            max_z = min(math.floor(building.location.z + building.dimension.z + radius), self.size_z - 1)
+            if min_x > max_x or min_z > max_z:
+                continue
+
+            xs, zs = np.meshgrid(np.arange(min_x, max_x + 1), np.arange(min_z, max_z + 1), indexing="ij")
+            distances = self._distances(building, xs, zs)
+            building_height = building.location.y + building.dimension.y
+            if radius == 0:
+                contribution = np.where(distances == 0, building_height, -np.inf)
+            else:
+                # A coordinate above the building blocks as long as its 3D distance to the building is within the
+                # radius. Directly above the footprint the bound is exclusive, since the corrected radius is 0.
+                reach = building_height + np.sqrt(np.maximum(radius ** 2 - distances ** 2, 0))
+                reach = np.where(distances == 0, np.nextafter(building_height + radius, -np.inf), reach)
+                contribution = np.where(distances <= radius, reach, -np.inf)
+            heights[min_x:max_x + 1, min_z:max_z + 1] = np.maximum(heights[min_x:max_x + 1, min_z:max_z + 1],
+                                                                   contribution)
+
+        self.effective_heights[radius] = heights
+        return heights
+
+    @staticmethod
+    def _distances(building: "BuildingBlocker", xs: np.ndarray, zs: np.ndarray) -> np.ndarray:
+        points = shapely.points(xs, zs)
+        try:
+            return shapely.distance(building.polygon, points)
+        except shapely.errors.GEOSException:
+            return shapely.distance(Polygon(building.points), points)
+
+    def is_blocking(self, coord: "Coordinate4D", radius: float) -> Optional[bool]:
+        """
+        Returns True if a rasterized building is at the given coordinate or in its radius.
+        Returns None if the coordinate is not covered by the raster, i.e. it is not on the grid or outside the
+        environment.
+        :param coord:
+        :param radius:
+        :return:
+        """
+        x = int(coord.x)
+        z = int(coord.z)
+        if x != coord.x or z != coord.z or not 0 <= x < self.size_x or not 0 <= z < self.size_z:
+            return None
+        if coord.y < 0 or coord.t > self.dimension.t:
+            return None
+        return coord.y <= self.get_effective_heights(radius)[x, z]
@@ -0,0 +1,78 @@
+from abc import ABC, abstractmethod
+from typing import Set, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..Coordinates.Coordinate4D import Coordinate4D
+
+
+class ReservationIndex(ABC):
+    """
+    Index of the voxels reserved by path agents.
+    Every path agent occupies exactly one voxel per tick, which allows faster lookups than the generic rtree.
+    """
+
+    @abstractmethod
+    def insert(self, agent_hash: int, coordinate: "Coordinate4D") -> bool:
+        """
+        Reserve the voxel at the given coordinate for the agent.
+        Inserting the same reservation twice has no effect.
+        :param agent_hash:
+        :param coordinate:
+        :return: True if the reservation is new
+        """
+        pass
+
+    @abstractmethod
+    def remove(self, agent_hash: int, coordinate: "Coordinate4D") -> bool:
+        """
+        Release the reservation of the agent at the given coordinate if it exists.
+        :param agent_hash:
+        :param coordinate:
+        :return: True if a reservation was released
+        """
+        pass
+
+    @abstractmethod
+    def intersect(self, coordinate: "Coordinate4D", radius: float, speed: int) -> Set[int]:
+        """
+        Returns the hashes of all agents with a reservation in the qube around the given coordinate with
+        size 2 * radius. All time steps from coordinate.t to coordinate.t + speed are considered.
+        :param coordinate:
+        :param radius:
+        :param speed:
+        :return:
+        """
+        pass
+
+    @abstractmethod
+    def reserved_ticks(self, coordinate: "Coordinate4D", radius: float, min_tick: int, max_tick: int) -> Set[int]:
+        """
+        Returns the ticks in [min_tick, max_tick] at which any agent has a reservation in the qube around the given
+        coordinate with size 2 * radius. The time of the coordinate is ignored.
+        :param coordinate:
+        :param radius:
+        :param min_tick:
+        :param max_tick:
+        :return:
+        """
+        pass
+
+    @abstractmethod
+    def new_clear(self) -> "ReservationIndex":
+        """
+        Returns a new index with the same configuration but without any reservations.
+        :return:
+        """
+        pass
+
+    @abstractmethod
+    def clone(self) -> "ReservationIndex":
+        """
+        Returns an independent copy of the index.
+        :return:
+        """
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
@@ -0,0 +1,121 @@
+from typing import Dict, Set, TYPE_CHECKING, Tuple
+
+from .ReservationIndex import ReservationIndex
+
+if TYPE_CHECKING:
+    from ..Coordinates.Coordinate4D import Coordinate4D
+
+
+class SpatialHashReservationIndex(ReservationIndex):
+    """
+    Time-bucketed spatial hash of path agent reservations.
+    Space is divided into cubic cells of `cell_size` voxels, time is bucketed per tick.
+    Each bucket maps the agents present in the cell at that tick to their exact position.
+    Additionally, the ticks with reservations are kept per cell to find the busy ticks of a cell without scanning
+    every tick.
+    A query around a coordinate only visits the few cells overlapping the query cube,
+    which makes it O(1) amortized as long as the cell size is in the order of the query radius.
+    """
+
+    DEFAULT_CELL_SIZE = 4
+
+    def __init__(self, cell_size: int = DEFAULT_CELL_SIZE):
+        """
+        :param cell_size: assert cell_size >= 1
+        """
+        assert cell_size >= 1
+        self.cell_size: int = cell_size
+        self.buckets: Dict[Tuple[int, int, int, int], Dict[int, Tuple[float, float, float]]] = {}
+        self.cell_ticks: Dict[Tuple[int, int, int], Set[int]] = {}
+        self._size: int = 0
+
+    def _key(self, coordinate: "Coordinate4D") -> Tuple[int, int, int, int]:
+        return (int(coordinate.x // self.cell_size),
+                int(coordinate.y // self.cell_size),
+                int(coordinate.z // self.cell_size),
+                coordinate.t)
+
+    def insert(self, agent_hash: int, coordinate: "Coordinate4D") -> bool:
+        key = self._key(coordinate)
+        if key not in self.buckets:
+            self.buckets[key] = {}
+            cell = key[:3]
+            if cell not in self.cell_ticks:
+                self.cell_ticks[cell] = set()
+            self.cell_ticks[cell].add(key[3])
+        bucket = self.buckets[key]
+        is_new = agent_hash not in bucket
+        if is_new:
+            self._size += 1
+        bucket[agent_hash] = (coordinate.x, coordinate.y, coordinate.z)
+        return is_new
+
+    def remove(self, agent_hash: int, coordinate: "Coordinate4D") -> bool:
+        key = self._key(coordinate)
+        bucket = self.buckets.get(key)
+        if bucket is None or agent_hash not in bucket:
+            return False
+        del bucket[agent_hash]
+        self._size -= 1
+        if len(bucket) == 0:
+            del self.buckets[key]
+            cell_ticks = self.cell_ticks[key[:3]]
+            cell_ticks.discard(key[3])
+            if len(cell_ticks) == 0:
+                del self.cell_ticks[key[:3]]
+        return True
+
+    def intersect(self, coordinate: "Coordinate4D", radius: float, speed: int) -> Set[int]:
+        min_x, max_x = coordinate.x - radius, coordinate.x + radius
+        min_y, max_y = coordinate.y - radius, coordinate.y + radius
+        min_z, max_z = coordinate.z - radius, coordinate.z + radius
+        cell_xs = range(int(min_x // self.cell_size), int(max_x // self.cell_size) + 1)
+        cell_ys = range(int(min_y // self.cell_size), int(max_y // self.cell_size) + 1)
+        cell_zs = range(int(min_z // self.cell_size), int(max_z // self.cell_size) + 1)
+
+        agent_hashes: Set[int] = set()
+        for t in range(coordinate.t, coordinate.t + speed + 1):  # Include upper bound
+            for cell_x in cell_xs:
+                for cell_y in cell_ys:
+                    for cell_z in cell_zs:
+                        bucket = self.buckets.get((cell_x, cell_y, cell_z, t))
+                        if bucket is None:
+                            continue
+                        for agent_hash, (x, y, z) in bucket.items():
+                            if min_x <= x <= max_x and min_y <= y <= max_y and min_z <= z <= max_z:
+                                agent_hashes.add(agent_hash)
+        return agent_hashes
+
+    def reserved_ticks(self, coordinate: "Coordinate4D", radius: float, min_tick: int, max_tick: int) -> Set[int]:
+        min_x, max_x = coordinate.x - radius, coordinate.x + radius
+        min_y, max_y = coordinate.y - radius, coordinate.y + radius
+        min_z, max_z = coordinate.z - radius, coordinate.z + radius
+
+        ticks: Set[int] = set()
+        for cell_x in range(int(min_x // self.cell_size), int(max_x // self.cell_size) + 1):
+            for cell_y in range(int(min_y // self.cell_size), int(max_y // self.cell_size) + 1):
+                for cell_z in range(int(min_z // self.cell_size), int(max_z // self.cell_size) + 1):
+                    cell_ticks = self.cell_ticks.get((cell_x, cell_y, cell_z))
+                    if cell_ticks is None:
+                        continue
+                    for t in cell_ticks:
+                        if t in ticks or not min_tick <= t <= max_tick:
+                            continue
+                        for x, y, z in self.buckets[(cell_x, cell_y, cell_z, t)].values():
+                            if min_x <= x <= max_x and min_y <= y <= max_y and min_z <= z <= max_z:
+                                ticks.add(t)
+                                break
+        return ticks
+
+    def new_clear(self) -> "SpatialHashReservationIndex":
+        return SpatialHashReservationIndex(self.cell_size)
+
+    def clone(self) -> "SpatialHashReservationIndex":
+        cloned = self.new_clear()
+        cloned.buckets = {key: bucket.copy() for key, bucket in self.buckets.items()}
+        cloned.cell_ticks = {cell: ticks.copy() for cell, ticks in self.cell_ticks.items()}
+        cloned._size = self._size
+        return cloned
+
+    def __len__(self) -> int:
+        return self._size
@@ -0,0 +1,144 @@
+import json
+import os
+import threading
+from collections import Counter
+from contextlib import nullcontext
+from time import perf_counter_ns
+from typing import Any, Dict, List, Optional
+
+# Returned by `span` if tracing is disabled, entering it does nothing
+_NO_SPAN = nullcontext()
+
+
+class Span:
+    """
+    Measures the time between entering and leaving it and records it as complete event of its tracer.
+    """
+
+    __slots__ = ("tracer", "name", "category", "args", "start")
+
+    def __init__(self, tracer: "Tracer", name: str, category: str, args: Dict[str, Any]):
+        self.tracer: "Tracer" = tracer
+        self.name: str = name
+        self.category: str = category
+        self.args: Dict[str, Any] = args
+        self.start: int = 0
+
+    def __enter__(self) -> "Span":
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.tracer.add_span(self.name, self.category, self.start, perf_counter_ns() - self.start, self.args)
+        return False
+
+
+class Tracer:
+    """
+    Records how long the phases of the simulation take and counts expensive operations like rtree queries.
+    A tracer is attached to the environment, everything working on the environment traces to it. Without a tracer
+    the instrumentation does nothing.
+    The recorded trace can be exported in the Chrome trace event format and viewed with chrome://tracing or Perfetto.
+    """
+
+    def __init__(self, max_events: int = 1_000_000):
+        """
+        :param max_events: number of spans after which further spans are only summarized, not recorded as events
+        """
+        self.max_events: int = max_events
+        self.events: List[Dict[str, Any]] = []
+        self.counters: Counter = Counter()
+        self.span_totals: Dict[str, List[int]] = {}
+        self._reported_counters: Counter = Counter()
+        self._origin: int = perf_counter_ns()
+        self._pid: int = os.getpid()
+
+    def span(self, name: str, category: str = "simulation", **args) -> Span:
+        """
+        Returns a context manager that records the time spent inside as span.
+        :param name:
+        :param category:
+        :param args: shown with the span in the trace viewer
+        :return:
+        """
+        return Span(self, name, category, args)
+
+    def add_span(self, name: str, category: str, start: int, duration: int, args: Optional[Dict[str, Any]] = None):
+        """
+        Records a span that started at the given perf_counter_ns and took duration ns.
+        :param name:
+        :param category:
+        :param start:
+        :param duration:
+        :param args:
+        :return:
+        """
+        totals = self.span_totals.get(name)
+        if totals is None:
+            self.span_totals[name] = [1, duration]
+        else:
+            totals[0] += 1
+            totals[1] += duration
+        if len(self.events) < self.max_events:
+            self.events.append({"name": name, "cat": category, "ph": "X", "ts": (start - self._origin) / 1000,
+                                "dur": duration / 1000, "pid": self._pid, "tid": threading.get_ident(),
+                                "args": args or {}})
+
+    def count(self, name: str, value: int = 1):
+        """
+        Increases a counter.
+        :param name:
+        :param value:
+        :return:
+        """
+        self.counters[name] += value
+
+    def report_counters(self, **args):
+        """
+        Records the increase of all counters since the last report as counter event, e.g. once per tick.
+        :param args: added to the event
+        :return:
+        """
+        increase = {name: value - self._reported_counters[name] for name, value in self.counters.items()}
+        self._reported_counters = self.counters.copy()
+        if len(self.events) < self.max_events:
+            self.events.append({"name": "counters", "ph": "C", "ts": (perf_counter_ns() - self._origin) / 1000,
+                                "pid": self._pid, "tid": threading.get_ident(), "args": {**increase, **args}})
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Returns count and total milliseconds per span name and the totals of all counters.
+        :return:
+        """
+        return {"spans": {name: {"count": count, "total_ms": duration / 1e6}
+                          for name, (count, duration) in sorted(self.span_totals.items(),
+                                                                key=lambda item: -item[1][1])},
+                "counters": dict(self.counters)}
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """
+        Returns the trace in the Chrome trace event format.
+        :return:
+        """
+        return {"traceEvents": self.events, "displayTimeUnit": "ms", "otherData": self.summary()}
+
+    def export(self, path: str):
+        """
+        Writes the trace as Chrome trace event JSON file.
+        :param path:
+        :return:
+        """
+        with open(path, "w") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+
+def span(tracer: Optional[Tracer], name: str, category: str = "simulation", **args):
+    """
+    Returns a span of the tracer, or a context manager doing nothing if there is no tracer.
+    :param tracer:
+    :param name:
+    :param category:
+    :param args:
+    :return:
+    """
+    return _NO_SPAN if tracer is None else tracer.span(name, category, **args)
@@ -0,0 +1,103 @@
+import json
+import logging
+import sys
+from typing import Any, Dict, List, Optional, Union
+
+# Loggers of the packages of the simulation, every module logs to a child of one of them
+LOGGER_NAMES = ("Simulator", "Demos", "API")
+
+# Attributes every log record has, everything else was passed as structured field using `extra`
+_RECORD_ATTRIBUTES = set(logging.LogRecord("", logging.NOTSET, "", 0, "", None, None).__dict__.keys()) | {"message"}
+
+
+class JSONLinesHandler(logging.Handler):
+    """
+    Writes log records as JSON lines to a file.
+    Records are serialized when they are emitted and written in batches of `capacity` lines, records of level ERROR
+    and above are written immediately.
+    Structured fields passed to the logger with `extra` are added to the line.
+    """
+
+    def __init__(self, path: str, capacity: int = 1000):
+        super().__init__()
+        self.path: str = path
+        self.capacity: int = capacity
+        self.buffer: List[str] = []
+        self.file = open(path, "a")
+
+    def to_dict(self, record: logging.LogRecord) -> Dict[str, Any]:
+        line = {"time": record.created, "level": record.levelname, "logger": record.name,
+                "message": record.getMessage()}
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                line[key] = value
+        return line
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            self.buffer.append(json.dumps(self.to_dict(record), default=str))
+            if len(self.buffer) >= self.capacity or record.levelno >= logging.ERROR:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        self.acquire()
+        try:
+            if len(self.buffer) > 0 and not self.file.closed:
+                self.file.write("\n".join(self.buffer) + "\n")
+                self.file.flush()
+            self.buffer = []
+        finally:
+            self.release()
+
+    def close(self):
+        self.acquire()
+        try:
+            self.flush()
+            self.file.close()
+        finally:
+            self.release()
+            super().close()
+
+
+def setup_logging(level: Union[int, str] = logging.INFO, json_path: Optional[str] = None, capacity: int = 1000,
+                  stream=sys.stdout):
+    """
+    Configures the loggers of the simulation.
+    Messages of disabled levels are never formatted, so debug logging in the allocators and path finding costs nothing
+    unless it is enabled.
+    Calling it again replaces the previous configuration.
+    :param level: minimum level of the messages, e.g. "DEBUG", "INFO" or "WARNING"
+    :param json_path: optional file the messages are additionally appended to as JSON lines
+    :param capacity: number of lines the JSON lines file is written in batches of
+    :param stream: stream the messages are printed to, None disables printing
+    :return:
+    """
+    handlers: List[logging.Handler] = []
+    if stream is not None:
+        stream_handler = logging.StreamHandler(stream)
+        stream_handler.setFormatter(logging.Formatter("%(message)s"))
+        handlers.append(stream_handler)
+    if json_path is not None:
+        handlers.append(JSONLinesHandler(json_path, capacity))
+
+    for name in LOGGER_NAMES:
+        logger = logging.getLogger(name)
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
+        logger.setLevel(level.upper() if isinstance(level, str) else level)
+        logger.propagate = False
+        for handler in handlers:
+            logger.addHandler(handler)
+
+
+def flush_logging():
+    """
+    Writes the buffered messages of the loggers of the simulation, e.g. before a process forks or exits.
+    :return:
+    """
+    for name in LOGGER_NAMES:
+        for handler in logging.getLogger(name).handlers:
+            handler.flush()
@@ -566,7 +566,7 @@ class Statistics:
                     total_violations += segment_violations.total_violations
                     total_blocker_violations += segment_violations.total_blocker_violations
 
-                if len(agent.allocated_segments) > 0 and len(agent.allocated_segments[0].coordinates) > 0 and not \
+                if len(agent.allocated_segments) > 0 and agent.allocated_segments[0].nr_voxels > 0 and not \
                         agent.allocated_segments[-1].max.inter_temporal_equal(agent.locations[-1]):
                     incomplete_allocation = True
                     total_violations += 1
@@ -65,6 +65,10 @@ class Stringify:
         if hasattr(obj, "__dict__"):
             dictict = dict([(key, recall(value)) for key, value in obj.__dict__.items() if valid_entry(key, value)])
             return dictict
+        # Convert slotted class objects
+        if hasattr(obj, "__slots__"):
+            keys = [key for cls in reversed(type(obj).__mro__) for key in getattr(cls, "__slots__", ())]
+            return dict([(key, recall(getattr(obj, key))) for key in keys if valid_entry(key, getattr(obj, key))])
         # Convert objects
         if isinstance(obj, dict):
             return dict([(key, recall(value)) for key, value in obj.items() if valid_entry(key, value)])
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, TYPE_CHECKING
+from typing import Dict, List, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from Simulator.Agents.Agent import Agent
@@ -40,3 +40,15 @@ class Allocator(ABC):
         :return:
         """
         return False
+
+    def next_reallocation_tick(self, environment: "Environment", tick: int) -> Optional[int]:
+        """
+        Returns the first tick from the given one on at which `wants_to_reallocate` can return `True`,
+        None if it never does. Allocators overriding `wants_to_reallocate` without overriding this are asked every tick.
+        :param environment:
+        :param tick:
+        :return:
+        """
+        if type(self).wants_to_reallocate is Allocator.wants_to_reallocate:
+            return None
+        return tick
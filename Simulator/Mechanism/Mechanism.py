@@ -1,5 +1,7 @@
 from typing import Dict, List, TYPE_CHECKING
 
+from ..History.Tracer import span
+
 if TYPE_CHECKING:
     from ..Agents.Agent import Agent
     from ..Allocations.Allocation import Allocation
@@ -31,8 +33,10 @@ class Mechanism:
         :param tick:
         :return:
         """
-        allocations = self.allocator.allocate(agents, environment, tick)
-        self.payment_rule.calculate_preliminary_payments(allocations, self.allocator.get_bid_tracker())
+        with span(environment.tracer, "allocate", allocator=self.allocator.__class__.__name__, agents=len(agents)):
+            allocations = self.allocator.allocate(agents, environment, tick)
+        with span(environment.tracer, "payments"):
+            self.payment_rule.calculate_preliminary_payments(allocations, self.allocator.get_bid_tracker())
         return allocations
 
     def calculate_final_payments(self, environment: "Environment") -> Dict[int, float]:
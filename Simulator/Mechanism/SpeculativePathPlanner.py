@@ -0,0 +1,260 @@
+import math
+import multiprocessing
+from time import time_ns
+from typing import Callable, Dict, Iterator, List, Optional, Set, TYPE_CHECKING, Tuple
+
+from ..Agents.PathAgent import PathAgent
+from ..Allocations.Allocation import Allocation
+
+if TYPE_CHECKING:
+    from ..Agents.Agent import Agent
+    from ..Environment.Environment import Environment
+    from ..Segments.PathSegment import PathSegment
+
+Cell = Tuple[int, int, int, int]
+PlanResult = Tuple[Optional[List["PathSegment"]], Set["Agent"], str]
+Speculation = Tuple[Optional[List["PathSegment"]], Set[int], str, Set[Cell], int]
+
+# State of the running speculation, inherited by the forked worker processes
+_speculation: Optional["SpeculativePathPlanner"] = None
+_plan: Optional[Callable[["PathAgent"], PlanResult]] = None
+
+
+def _plan_group(group_index: int) -> List[Tuple[int, Speculation]]:
+    """
+    Plans the agents of one group one after another on the environment inherited from the parent process.
+    Runs in a worker process.
+    :param group_index:
+    :return:
+    """
+    assert _speculation is not None and _plan is not None
+    return _speculation.plan_group(_speculation.groups[group_index], _plan)
+
+
+class SpeculativePathPlanner:
+    """
+    Plans the paths of the pending path agents of a tick in parallel before they are allocated one after another.
+    The agents are partitioned into groups whose bounding space-time corridors are disjoint.
+    Each group is planned in a forked worker process on a snapshot of the environment, in allocation order and
+    with the allocations of its own group applied, but without the allocations of the other groups.
+    While the allocator commits the agents in its usual order, a speculative path is only used if none of the changes
+    to the environment since the snapshot, except the ones of the same group that were taken speculatively as well,
+    intersect the environment queries of the search. Otherwise the agent is planned again, so the resulting
+    allocations are the same as without speculation.
+    The changes are read from the environment transaction, without a running transaction all agents are planned
+    sequentially.
+    """
+
+    cell_size: int = 4
+    cell_ticks: int = 32
+
+    def __init__(self, environment: "Environment", workers: int, corridor_margin: int = 2):
+        """
+        :param environment:
+        :param workers: number of worker processes, with less than 2 workers nothing is planned speculatively
+        :param corridor_margin: distance by which the corridor between the locations of a bid is widened
+        """
+        self.environment: "Environment" = environment
+        self.workers: int = workers
+        self.corridor_margin: int = corridor_margin
+        self.groups: List[List["PathAgent"]] = []
+        self.group_of: Dict[int, int] = {}
+        self.speculations: Dict[int, Speculation] = {}
+        self.taken: Set[int] = set()
+
+        self._tick: int = 0
+        # Changes are widened by the largest radius any agent can have during the tick, because the workers query
+        # with the largest radius at the snapshot
+        self._radius: float = 0
+        self._nr_seen: Tuple[int, int] = (0, 0)
+        # Agents whose commit changed a cell, None for changes that are not part of a speculative commit
+        self._changes: Dict[Cell, Set[Optional[int]]] = {}
+        self._changed_agents: Set[int] = set()
+
+    @classmethod
+    def _cells(cls, bbox: List[float]) -> Iterator[Cell]:
+        """
+        Returns all grid cells intersecting the box [min x, y, z, t, max x, y, z, t].
+        :param bbox:
+        :return:
+        """
+        size, ticks = cls.cell_size, cls.cell_ticks
+        for x in range(math.floor(bbox[0] / size), math.floor(bbox[4] / size) + 1):
+            for y in range(math.floor(bbox[1] / size), math.floor(bbox[5] / size) + 1):
+                for z in range(math.floor(bbox[2] / size), math.floor(bbox[6] / size) + 1):
+                    for t in range(math.floor(bbox[3] / ticks), math.floor(bbox[7] / ticks) + 1):
+                        yield x, y, z, t
+
+    def _corridor(self, agent: "PathAgent", tick: int) -> Optional[List[float]]:
+        """
+        Returns the widened spatial bounding box [min x, y, z, max x, y, z] of the locations of the agents bid.
+        Returns None if the agent has no bid.
+        :param agent:
+        :param tick:
+        :return:
+        """
+        bid = agent.get_bid(tick, self.environment)
+        if bid is None:
+            return None
+        locations = bid.locations
+        margin = agent.near_radius + self.environment.max_near_radius + self.corridor_margin
+        return [min(location.x for location in locations) - margin,
+                min(location.y for location in locations) - margin,
+                min(location.z for location in locations) - margin,
+                max(location.x for location in locations) + margin,
+                max(location.y for location in locations) + margin,
+                max(location.z for location in locations) + margin]
+
+    def partition(self, agents: List["Agent"], tick: int) -> List[List["PathAgent"]]:
+        """
+        Partitions the path agents into groups with disjoint corridors, keeping the given order within each group.
+        :param agents: agents in allocation order
+        :param tick:
+        :return:
+        """
+        path_agents: List["PathAgent"] = []
+        corridors: List[List[float]] = []
+        for agent in agents:
+            if isinstance(agent, PathAgent):
+                corridor = self._corridor(agent, tick)
+                if corridor is not None:
+                    path_agents.append(agent)
+                    corridors.append(corridor)
+
+        parents = list(range(len(path_agents)))
+
+        def find(index: int) -> int:
+            while parents[index] != index:
+                parents[index] = parents[parents[index]]
+                index = parents[index]
+            return index
+
+        for i, first in enumerate(corridors):
+            for j in range(i + 1, len(corridors)):
+                second = corridors[j]
+                if all(first[k] <= second[k + 3] and second[k] <= first[k + 3] for k in range(3)):
+                    parents[find(j)] = find(i)
+
+        groups: Dict[int, List["PathAgent"]] = {}
+        for index, agent in enumerate(path_agents):
+            groups.setdefault(find(index), []).append(agent)
+        return sorted(groups.values(), key=len, reverse=True)
+
+    def plan_group(self, group: List["PathAgent"], plan: Callable[["PathAgent"], PlanResult]
+                   ) -> List[Tuple[int, Speculation]]:
+        """
+        Plans the agents of a group one after another and applies their allocations like the allocator would.
+        For every agent the grid cells of all queries for other agents are recorded.
+        :param group:
+        :param plan: returns the allocated path segments (None if the allocation failed), the agents that have to be
+        reallocated and the explanation
+        :return:
+        """
+        environment = self.environment
+        results: List[Tuple[int, Speculation]] = []
+        for agent in group:
+            start_time = time_ns()
+            environment.query_log = []
+            segments, collisions, explanation = plan(agent)
+            cells: Set[Cell] = set()
+            for bbox in environment.query_log:
+                cells.update(self._cells(bbox))
+            environment.query_log = None
+            results.append((hash(agent), (segments, set(hash(collision) for collision in collisions), explanation,
+                                          cells, time_ns() - start_time)))
+            if segments is not None:
+                for collision in collisions:
+                    environment.deallocate_agent(collision, self._tick)
+                environment.allocate_segments_for_agents([Allocation(agent, segments, None)], self._tick)
+        return results
+
+    def speculate(self, agents: List["Agent"], tick: int, plan: Callable[["PathAgent"], PlanResult]):
+        """
+        Plans the path agents of the given agents speculatively in worker processes.
+        :param agents: agents in allocation order
+        :param tick:
+        :param plan: returns the allocated path segments (None if the allocation failed), the agents that have to be
+        reallocated and the explanation
+        :return:
+        """
+        global _speculation, _plan
+        transaction = self.environment.transaction
+        if self.workers < 2 or transaction is None or "fork" not in multiprocessing.get_all_start_methods():
+            return
+        self._tick = tick
+        self.groups = self.partition(agents, tick)
+        if len(self.groups) < 2:
+            return
+        self.group_of = {hash(agent): index for index, group in enumerate(self.groups) for agent in group}
+        self._radius = max([self.environment.max_near_radius] +
+                           [agent.near_radius for group in self.groups for agent in group])
+        self._nr_seen = (len(transaction.tree_log), len(transaction.reservation_log))
+
+        _speculation, _plan = self, plan
+        try:
+            with multiprocessing.get_context("fork").Pool(min(self.workers, len(self.groups))) as pool:
+                for results in pool.imap_unordered(_plan_group, range(len(self.groups))):
+                    self.speculations.update(results)
+        finally:
+            _speculation, _plan = None, None
+
+    def _collect_changes(self, committed: Optional[int] = None):
+        """
+        Adds the grid cells of all changes to the environment since the last call.
+        :param committed: hash of the speculatively planned agent whose commit caused the changes
+        :return:
+        """
+        transaction = self.environment.transaction
+        assert transaction is not None
+        radius = self._radius
+        changes = [(agent_hash, [bbox[0] - radius, bbox[1] - radius, bbox[2] - radius, bbox[3],
+                                 bbox[4] + radius, bbox[5] + radius, bbox[6] + radius, bbox[7]])
+                   for _, agent_hash, bbox in transaction.tree_log[self._nr_seen[0]:]]
+        changes.extend((agent_hash, coordinate.tree_query_cube_rep(radius, 0))
+                       for _, agent_hash, coordinate in transaction.reservation_log[self._nr_seen[1]:])
+        for agent_hash, bbox in changes:
+            self._changed_agents.add(agent_hash)
+            for cell in self._cells(bbox):
+                self._changes.setdefault(cell, set()).add(agent_hash if agent_hash == committed else None)
+        self._nr_seen = (len(transaction.tree_log), len(transaction.reservation_log))
+
+    def take(self, agent: "Agent") -> Optional[Tuple[PlanResult, int]]:
+        """
+        Returns the speculative result and planning time in ns for the agent if it is still valid.
+        Returns None if the agent has to be planned again.
+        A speculative result can only be taken once.
+        :param agent:
+        :return:
+        """
+        agent_hash = hash(agent)
+        speculation = self.speculations.pop(agent_hash, None)
+        if speculation is None:
+            return None
+        segments, collisions, explanation, cells, duration = speculation
+
+        # All agents of the group that were planned before have to be taken speculatively as well
+        group = self.groups[self.group_of[agent_hash]]
+        predecessors: Set[Optional[int]] = set(hash(other) for other in group[:group.index(agent)])
+        if not predecessors.issubset(self.taken):
+            return None
+
+        self._collect_changes()
+        if agent_hash in self._changed_agents:
+            return None
+        for cell in cells:
+            changed_by = self._changes.get(cell)
+            if changed_by is not None and not changed_by.issubset(predecessors):
+                return None
+
+        self.taken.add(agent_hash)
+        return (segments, set(self.environment.agents[collision] for collision in collisions), explanation), duration
+
+    def committed(self, agent: "Agent"):
+        """
+        Has to be called by the allocator after the allocation of an agent was applied to the environment.
+        :param agent:
+        :return:
+        """
+        if len(self.speculations) > 0 or len(self.taken) > 0:
+            agent_hash = hash(agent)
+            self._collect_changes(agent_hash if agent_hash in self.taken else None)
@@ -34,3 +34,12 @@ class Owner(ABC):
     @abstractmethod
     def generate_agents(self, t: int, environment: "Environment") -> List["Agent"]:
         pass
+
+    def next_creation_tick(self, t: int) -> Optional[int]:
+        """
+        Returns the first tick from t on at which the owner can generate agents, None if it will not generate any.
+        The simulator can skip the ticks in between.
+        :param t:
+        :return:
+        """
+        return t
@@ -1,25 +1,64 @@
-from typing import List, TYPE_CHECKING, Tuple
+import logging
+from array import array
+from typing import Iterator, List, Optional, Sequence, TYPE_CHECKING, Tuple
 
 from .Segment import Segment
+from ..Coordinates.Coordinate4D import Coordinate4D
+
+logger = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
-    from ..Coordinates.Coordinate4D import Coordinate4D
     from ..Coordinates.Coordinate3D import Coordinate3D
 
 
+def _pack(values: List[float]) -> Sequence[float]:
+    """
+    Packs the values of one axis into a compact array.
+    Values of mixed types are kept in a list, so the coordinates are returned exactly as they were given.
+    :param values:
+    :return:
+    """
+    if all(type(value) is int for value in values):
+        if all(-2 ** 31 <= value < 2 ** 31 for value in values):
+            return array("i", values)
+        return array("q", values)
+    if all(type(value) is float for value in values):
+        return array("d", values)
+    return list(values)
+
+
+def _concat(first: Sequence[float], second: Sequence[float]) -> Sequence[float]:
+    if isinstance(first, array) and isinstance(second, array) and first.typecode == second.typecode:
+        return first + second
+    return _pack(list(first) + list(second))
+
+
 class PathSegment(Segment):
+    """
+    Path through consecutive ticks. The trajectory is stored as packed arrays of the x, y and z values,
+    the tick of a coordinate is implicit by its index. The arrays are never changed after they have been created,
+    so clones and splits share them and only keep their own view on them.
+    Coordinates are created on access.
+    """
+
     def __init__(self, start: "Coordinate3D", end: "Coordinate3D", index: int, coordinates: List["Coordinate4D"]):
         super().__init__(index)
-        self._coordinates: List["Coordinate4D"] = coordinates
-        self.validate()
+        self.validate(coordinates)
+        self._min_t: int = coordinates[0].t
+        self._xs: Sequence[float] = _pack([coordinate.x for coordinate in coordinates])
+        self._ys: Sequence[float] = _pack([coordinate.y for coordinate in coordinates])
+        self._zs: Sequence[float] = _pack([coordinate.z for coordinate in coordinates])
+        self._offset: int = 0
+        self._length: int = len(coordinates)
         self.start: "Coordinate3D" = start
         self.end: "Coordinate3D" = end
 
-    def validate(self):
-        _iter = self._coordinates[0]
-        for coord in self._coordinates[1:]:
+    @staticmethod
+    def validate(coordinates: List["Coordinate4D"]):
+        _iter = coordinates[0]
+        for coord in coordinates[1:]:
             if not coord.t == _iter.t + 1 or coord.distance(_iter) > 1:
-                print(f"{coord} - {_iter}")
+                logger.error("Invalid path step %s - %s", coord, _iter)
             assert coord.distance(_iter) <= 1
             assert coord.t == _iter.t + 1
             _iter = coord
@@ -31,11 +70,30 @@ class PathSegment(Segment):
         elif other.min.inter_temporal_equal(self.max):
             join_index = self.max.t - other.min.t + 1
         else:
-            print(f"other: {other.min.t}, self: {self.max.t}")
+            logger.debug("Joining with gap, other: %s, self: %s", other.min.t, self.max.t)
             assert other.min.t == self.max.t + 1
 
-        self.coordinates.extend(other.coordinates[join_index:])
-        self.validate()
+        if join_index >= other.nr_voxels:
+            return
+        self.validate([self.max, other.coordinate_at(join_index)])
+
+        xs, ys, zs = self._packed()
+        other_xs, other_ys, other_zs = other._packed(join_index)
+        self._xs = _concat(xs, other_xs)
+        self._ys = _concat(ys, other_ys)
+        self._zs = _concat(zs, other_zs)
+        self._offset = 0
+        self._length = len(self._xs)
+
+    def _packed(self, start: int = 0) -> Tuple[Sequence[float], Sequence[float], Sequence[float]]:
+        """
+        Returns the x, y and z values of the coordinates from the given index on.
+        :param start:
+        :return:
+        """
+        begin = self._offset + start
+        end = self._offset + self._length
+        return self._xs[begin:end], self._ys[begin:end], self._zs[begin:end]
 
     def same(self, other: "PathSegment"):
         same_index = self.index == other.index
@@ -43,37 +101,76 @@ class PathSegment(Segment):
             assert self.end == other.end
         return same_index
 
+    def coordinate_at(self, index: int) -> "Coordinate4D":
+        """
+        Returns the coordinate at the given index, negative indices count from the end.
+        :param index:
+        :return:
+        """
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(f"Index {index} out of range for {self}")
+        buffer_index = self._offset + index
+        return Coordinate4D(self._xs[buffer_index], self._ys[buffer_index], self._zs[buffer_index],
+                            self._min_t + index)
+
+    def iter_coordinates(self, start: int = 0, stop: Optional[int] = None, step: int = 1) -> Iterator["Coordinate4D"]:
+        """
+        Iterate over the coordinates in the given index range, same semantics as slicing a list.
+        :param start:
+        :param stop:
+        :param step:
+        :return:
+        """
+        for index in range(*slice(start, stop, step).indices(self._length)):
+            yield self.coordinate_at(index)
+
     @property
     def coordinates(self) -> List["Coordinate4D"]:
-        return self._coordinates
+        return list(self.iter_coordinates())
 
     @property
     def nr_voxels(self) -> int:
-        return len(self.coordinates)
+        return self._length
 
     @property
     def min(self) -> "Coordinate4D":
-        return self.coordinates[0]
+        return self.coordinate_at(0)
 
     @property
     def max(self) -> "Coordinate4D":
-        return self.coordinates[-1]
+        return self.coordinate_at(-1)
 
     def clone(self):
-        return PathSegment(self.start.clone(), self.end.clone(), self.index, [x.clone() for x in self.coordinates])
+        cloned = PathSegment.__new__(PathSegment)
+        cloned.__dict__.update(self.__dict__)
+        cloned.start = self.start.clone()
+        cloned.end = self.end.clone()
+        return cloned
+
+    def _view(self, start: int, stop: int) -> "PathSegment":
+        """
+        Returns a clone that only contains the coordinates in the given index range.
+        The packed arrays are shared with this segment.
+        :param start:
+        :param stop:
+        :return:
+        """
+        start, stop, _ = slice(start, stop).indices(self._length)
+        view = self.clone()
+        view._offset = self._offset + start
+        view._length = max(stop - start, 0)
+        view._min_t = self._min_t + start
+        return view
 
     def contains(self, coordinate: "Coordinate4D") -> bool:
-        return coordinate in self.coordinates
+        index = coordinate.t - self._min_t
+        return 0 <= index < self._length and self.coordinate_at(index) == coordinate
 
     def split_temporal(self, t: int) -> Tuple["PathSegment", "PathSegment"]:
         t_index = t - self.min.t
-        first_segment = self.clone()
-        first_segment._coordinates = first_segment.coordinates[:t_index + 1]
-
-        second_segment = self.clone()
-        second_segment._coordinates = second_segment.coordinates[t_index + 1:]
-
-        return first_segment, second_segment
+        return self._view(0, t_index + 1), self._view(t_index + 1, None)
 
     def __str__(self):
         return f"PathSegment: {self.min} -> {self.max}"
@@ -1,7 +1,14 @@
+import logging
+import os
+import pickle
+import random
 from time import time_ns
-from typing import Dict, List, TYPE_CHECKING
+from typing import Dict, List, Optional, TYPE_CHECKING
 
 from .History.History import History
+from .History.Tracer import span
+
+logger = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
     from .Allocations.Allocation import Allocation
@@ -53,36 +60,118 @@ class Simulator:
         if self.time_step > self.environment.dimension.t:
             return False
 
-        new_agents: Dict[int, "Agent"] = self.generate_new_agents()
+        tracer = self.environment.tracer
+        with span(tracer, "tick", tick=self.time_step):
+            with span(tracer, "generate_agents"):
+                new_agents: Dict[int, "Agent"] = self.generate_new_agents()
+
+            if len(new_agents) > 0 or self.mechanism.allocator.wants_to_reallocate(self.environment, self.time_step):
+                self.allocate(new_agents)
 
-        if len(new_agents) > 0 or self.mechanism.allocator.wants_to_reallocate(self.environment, self.time_step):
-            start_time = time_ns()
+            with span(tracer, "evict_expired"):
+                self.environment.evict_expired(self.time_step)
+        if tracer is not None:
+            tracer.report_counters(tick=self.time_step)
 
-            temporary_environment = self.environment.clone()
+        self.time_step += 1
+        return True
+
+    def allocate(self, new_agents: Dict[int, "Agent"]):
+        """
+        Allocates the new agents and the agents the allocator wants to reallocate at the current time-step.
+        :param new_agents:
+        :return:
+        """
+        tracer = self.environment.tracer
+        start_time = time_ns()
+
+        # The mechanism allocates on a transaction of the environment, which is rolled back afterwards.
+        # Only the resulting allocations are then applied to the real environment.
+        with span(tracer, "clone_agents", agents=len(new_agents)):
             temporary_agents = [agent.clone() for agent in new_agents.values()]
+        self.environment.begin_transaction()
+        try:
             temporary_allocations: Dict["Agent", "Allocation"] = self.mechanism.do(
                 temporary_agents,
-                temporary_environment,
+                self.environment,
                 self.time_step)
+        finally:
+            with span(tracer, "rollback"):
+                self.environment.rollback_transaction()
 
+        with span(tracer, "commit"):
             real_allocations = self.environment.create_real_allocations(list(temporary_allocations.values()),
                                                                         new_agents)
             self.environment.allocate_segments_for_agents(real_allocations, self.time_step)
-            self.history.update_history(real_allocations, self.time_step, time_ns() - start_time)
+        self.history.update_history(real_allocations, self.time_step, time_ns() - start_time)
 
-            print(f"STEP: {self.time_step}")
-            print("-------------")
+        logger.debug("STEP: %s", self.time_step, extra={"tick": self.time_step})
 
-        self.time_step += 1
-        return True
+    def next_event_tick(self) -> int:
+        """
+        Returns the first tick from the current time-step on at which an owner can generate agents or the allocator
+        wants to reallocate. Returns the tick after the end of the simulation if nothing happens anymore.
+        :return:
+        """
+        ticks = [owner.next_creation_tick(self.time_step) for owner in self.owners]
+        ticks.append(self.mechanism.allocator.next_reallocation_tick(self.environment, self.time_step))
+        return min([tick for tick in ticks if tick is not None] + [self.environment.dimension.t + 1])
+
+    def skip_idle_ticks(self):
+        """
+        Advances the time-step to the next tick at which something happens, the skipped ticks would not change
+        the simulation. Once no more agents are generated and the allocator does not want to reallocate anymore,
+        the simulation is done.
+        :return:
+        """
+        self.time_step = max(self.time_step, self.next_event_tick())
+
+    def save_checkpoint(self, path: str):
+        """
+        Writes the complete state of the simulation including the state of the random generator to a file.
+        The file is replaced atomically, so an interrupted write keeps the previous checkpoint and leaves no
+        temporary file behind.
+        :param path:
+        :return:
+        """
+        temporary_path = f"{path}.tmp"
+        try:
+            with open(temporary_path, "wb") as f:
+                pickle.dump({"simulator": self, "random": random.getstate()}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+        os.replace(temporary_path, path)
+
+    @staticmethod
+    def load_checkpoint(path: str) -> "Simulator":
+        """
+        Restores a simulation and the state of the random generator from a checkpoint, it continues at the tick after
+        the checkpoint was written.
+        Only load checkpoints you trust, they are unpickled.
+        :param path:
+        :return:
+        """
+        with open(path, "rb") as f:
+            checkpoint = pickle.load(f)
+        random.setstate(checkpoint["random"])
+        return checkpoint["simulator"]
 
-    def run(self) -> int:
+    def run(self, checkpoint_path: Optional[str] = None, checkpoint_interval: int = 0) -> int:
         """
         Runs the simulation and returns the simulation time in seconds.
+        A simulation restored with `load_checkpoint` continues where the checkpoint was written.
+        :param checkpoint_path: file the state is written to every checkpoint_interval ticks
+        :param checkpoint_interval: number of ticks between checkpoints, 0 disables checkpoints
         :return: simulation time in seconds
         """
         start = time_ns()
+        next_checkpoint = self.time_step + checkpoint_interval
+        self.skip_idle_ticks()
         while self.tick():
-            pass
+            if checkpoint_path is not None and checkpoint_interval > 0 and self.time_step >= next_checkpoint:
+                self.save_checkpoint(checkpoint_path)
+                next_checkpoint = self.time_step + checkpoint_interval
+            self.skip_idle_ticks()
         simulation_time = int((time_ns() - start) // 1e9)
         return simulation_time
@@ -1,7 +1,10 @@
 # AStar
 from .AStar.AStar import AStar
+from .AStar.DistanceField import DistanceField
+from .AStar.DistanceHeuristic import DistanceHeuristic
+from .AStar.SIPP import SIPP
 # Agents
-from .Agents.Agent import Agent
+from .Agents.Agent import Agent, stable_hash
 from .Agents.AgentType import AgentType
 from .Agents.PathAgent import PathAgent
 from .Agents.SpaceAgent import SpaceAgent
@@ -23,15 +26,22 @@ from .Coordinates.Coordinate3D import Coordinate3D
 from .Coordinates.Coordinate4D import Coordinate4D
 # Environment
 from .Environment.Environment import Environment
+from .Environment.EnvironmentTransaction import EnvironmentTransaction
+from .Environment.HeightRaster import HeightRaster
+from .Environment.ReservationIndex import ReservationIndex
+from .Environment.SpatialHashReservationIndex import SpatialHashReservationIndex
 # History
 from .History.History import History
+from .History.Tracer import Tracer
 # IO
 from .IO.JSONS import JSONOwnerDescription, get_simulation_dict
+from .IO.Logging import JSONLinesHandler, flush_logging, setup_logging
 from .IO.Statistics import Statistics, get_statistics_dict
 # Mechanism
 from .Mechanism.Allocator import Allocator
 from .Mechanism.Mechanism import Mechanism
 from .Mechanism.PaymentRule import PaymentRule
+from .Mechanism.SpeculativePathPlanner import SpeculativePathPlanner
 # Owners
 from .Owners.Owner import Owner
 from .Owners.PathOwner import PathOwner
@@ -1,11 +1,12 @@
 import math
-from typing import Iterator, Optional, Set, TYPE_CHECKING, Tuple
+from typing import Any, Iterator, List, Optional, Set, TYPE_CHECKING, Tuple, Union
 
 from rtree import Index
 from rtree.index import Item, Property
 
 from Simulator.Agents.PathAgent import PathAgent
 from Simulator.Agents.SpaceAgent import SpaceAgent
+from Simulator.Blocker.BlockerType import BlockerType
 
 if TYPE_CHECKING:
     from Simulator.Bids.BidTracker import BidTracker
@@ -19,6 +20,7 @@ def find_valid_path_tick(tick: int, environment: "Environment", bid_tracker: "Bi
     """
     Checks if the given position is valid to allocate.
     If not, it tries to find a later tick where an allocation is possible.
+    Ticks at which the position is still blocked by the same blockers or higher bidding agents are skipped.
     The returned tick is in the range [max{position.t, min_tick}, max_tick] or None if no valid tick is found.
     :param tick: the current simulation tick
     :param environment: the environment in which to find a valid allocation
@@ -38,7 +40,7 @@ def find_valid_path_tick(tick: int, environment: "Environment", bid_tracker: "Bi
             return None
         if valid:
             break
-        pos_clone.t += 1
+        pos_clone.t = max(_path_blocked_until(tick, environment, bid_tracker, pos_clone, agent), pos_clone.t) + 1
 
     return pos_clone.t
 
@@ -49,6 +51,7 @@ def find_valid_space_tick(tick: int, environment: "Environment", bid_tracker: "B
     """
     Checks if the given space is valid to allocate.
     If not, it tries to find a later tick where an allocation is possible.
+    Ticks at which the space is still blocked by the same blockers or higher bidding agents are skipped.
     The returned tick is in the range [max{min_position.t, min_tick}, min{max_position.t, max_tick}] or None if no
     valid tick is found.
     :param tick: the current simulation tick
@@ -72,7 +75,8 @@ def find_valid_space_tick(tick: int, environment: "Environment", bid_tracker: "B
                                                  avoid_blockers=avoid_blockers)
         if valid:
             break
-        min_pos_clone.t += 1
+        min_pos_clone.t = max(_space_blocked_until(tick, environment, bid_tracker, min_pos_clone, max_position,
+                                                   agent, avoid_blockers), min_pos_clone.t) + 1
 
     return min_pos_clone.t
 
@@ -95,6 +99,7 @@ def is_valid_for_space_allocation(allocation_tick: int,
     :param avoid_blockers: if True, it is not allowed to allocate space containing blocker
     :return: Whether the allocation is valid and a set of agents that need to be reallocated if valid.
     """
+    environment.trace_count("space_validity_checks")
     if min_position.t < allocation_tick:
         raise Exception(f"Cannot validate position in the past. Position: {min_position}, Tick: {allocation_tick}.")
 
@@ -155,7 +160,7 @@ def is_valid_for_path_allocation(allocation_tick: int,
     :param path_agent: the agent that should be allocated
     :return: Whether the allocation is valid and a set of agents that need to be reallocated if valid.
     """
-
+    environment.trace_count("path_validity_checks")
     if environment.is_coordinate_blocked(position, path_agent):
         return False, None
 
@@ -226,9 +231,133 @@ def _path_agent_can_escape(intersecting_coordinate: "Coordinate4D",
     return can_escape
 
 
-def setup_rtree(data: Optional[Iterator["Item"]] = None) -> Index:
+def _blocked_until(tick: int, intervals: List[Tuple[int, int]]) -> int:
+    """
+    Returns the last tick of the run of consecutive blocked ticks that starts at the given tick.
+    Returns tick - 1 if the tick itself is not blocked.
+    :param tick:
+    :param intervals: blocked ranges of ticks [first, last]
+    :return:
+    """
+    until = tick - 1
+    changed = True
+    while changed:
+        changed = False
+        for first, last in intervals:
+            if first <= until + 1 and last > until:
+                until = last
+                changed = True
+    return until
+
+
+def _path_blocked_until(allocation_tick: int,
+                        environment: "Environment",
+                        bid_tracker: "BidTracker",
+                        position: "Coordinate4D",
+                        path_agent: "PathAgent") -> int:
+    """
+    Returns the last tick until which an invalid position stays invalid for sure, because the blockers and agents
+    with a higher or equal bid that block it at position.t are still in its radius.
+    The result is only a lower bound, ticks after it have to be validated.
+    :param allocation_tick: the current simulation tick
+    :param environment: the environment in which to find a valid allocation
+    :param bid_tracker: the bid-tracker to get past and new agent bids
+    :param position: the invalid position
+    :param path_agent: the agent that should be allocated
+    :return:
+    """
+    if environment.is_coordinate_blocked_forever(position, path_agent.near_radius):
+        return environment.dimension.t
+
+    my_bid = bid_tracker.get_last_bid_for_tick(allocation_tick, path_agent, environment)
+    if my_bid is None:
+        return position.t
+
+    speed = path_agent.speed
+    intervals: List[Tuple[int, int]] = []
+    query = position.tree_query_cube_rep(path_agent.near_radius, environment.dimension.t - position.t)
+    environment.trace_count("rtree_queries")
+    for item in environment.blocker_tree.intersection(query, objects=True):
+        blocker = environment.blocker_dict[item.id]
+        if blocker.blocker_type != BlockerType.STATIC.value and blocker.is_blocking(position, path_agent.near_radius):
+            intervals.append((math.floor(item.bbox[3]) - speed, math.ceil(item.bbox[7])))
+
+    for other_agent in environment.intersect_path_coordinate(position, path_agent):
+        other_bid = bid_tracker.get_last_bid_for_tick(allocation_tick, other_agent, environment)
+        if other_bid is None or my_bid > other_bid:
+            continue
+        if isinstance(other_agent, PathAgent):
+            max_near_radius = max(path_agent.near_radius, other_agent.near_radius)
+            t = position.t
+            while any(position.distance(path_coordinate, l2=True) <= max_near_radius
+                      for path_coordinate in other_agent.get_positions_at_ticks(t, t + speed - 1)):
+                t += 1
+            intervals.append((position.t, t - 1))
+        elif isinstance(other_agent, SpaceAgent):
+            for segment in other_agent.allocated_segments:
+                if position.distance_to_space(segment.min, segment.max) <= path_agent.near_radius:
+                    intervals.append((segment.min.t - speed, segment.max.t))
+
+    until = _blocked_until(position.t, intervals)
+    radius = max(path_agent.near_radius, environment.max_near_radius)
+    environment.record_query(position.tree_query_cube_rep(radius, max(until - position.t, 0) + speed))
+    return until
+
+
+def _space_blocked_until(allocation_tick: int,
+                         environment: "Environment",
+                         bid_tracker: "BidTracker",
+                         min_position: "Coordinate4D",
+                         max_position: "Coordinate4D",
+                         space_agent: "SpaceAgent",
+                         avoid_blockers: bool) -> int:
+    """
+    Returns the last tick until which an invalid space stays invalid for sure, because the blockers and agents
+    with a higher or equal bid that block it at min_position.t still intersect it.
+    The result is only a lower bound, ticks after it have to be validated.
+    :param allocation_tick: the current simulation tick
+    :param environment: the environment in which to find a valid allocation
+    :param bid_tracker: the bid-tracker to get past and new agent bids
+    :param min_position: the minimum coordinate of the invalid space
+    :param max_position: the maximum coordinate of the invalid space
+    :param space_agent: the agent that should be allocated
+    :param avoid_blockers: if True, it is not allowed to allocate space containing blocker
+    :return:
+    """
+    my_bid = bid_tracker.get_last_bid_for_tick(allocation_tick, space_agent, environment)
+    if my_bid is None:
+        return min_position.t
+
+    # The validated space shrinks from below, so everything intersecting it blocks until it ends
+    intervals: List[Tuple[int, int]] = []
+    if avoid_blockers:
+        environment.trace_count("rtree_queries")
+        for item in environment.blocker_tree.intersection(min_position.list_rep() + max_position.list_rep(),
+                                                          objects=True):
+            blocker = environment.blocker_dict[item.id]
+            if blocker.is_box_blocking(min_position, max_position):
+                intervals.append((min_position.t, environment.dimension.t if
+                                  blocker.blocker_type == BlockerType.STATIC.value else math.ceil(item.bbox[7])))
+
+    for other_agent in environment.intersect_space_coordinates(min_position, max_position, space_agent,
+                                                               use_max_radius=False):
+        other_bid = bid_tracker.get_last_bid_for_tick(allocation_tick, other_agent, environment)
+        if other_bid is None or my_bid > other_bid:
+            continue
+        space = min_position.list_rep() + max_position.list_rep()
+        for bbox in environment.agent_boxes.get(hash(other_agent), []):
+            if all(bbox[i] <= space[i + 4] and bbox[i + 4] >= space[i] for i in range(4)):
+                intervals.append((min_position.t, math.ceil(bbox[7])))
+
+    return _blocked_until(min_position.t, intervals)
+
+
+RtreeEntry = Tuple[int, List[float], Any]
+
+
+def setup_rtree(data: Optional[Iterator[Union["Item", RtreeEntry]]] = None) -> Index:
     """
-    Returns a rtree instance with 4 dimensions.
+    Returns a rtree instance with 4 dimensions, bulk loaded with the given items or (id, bbox, object) entries.
     Used internally by the Environment and Statistics modules.
     """
     props = Property()
@@ -239,6 +368,15 @@ def setup_rtree(data: Optional[Iterator["Item"]] = None) -> Index:
         return Index(_generate_data(data), properties=props)
 
 
-def _generate_data(data: Iterator["Item"]):
+def _generate_data(data: Iterator[Union["Item", RtreeEntry]]):
     for item in data:
-        yield item.id, item.bbox, item.object
+        yield item if isinstance(item, tuple) else (item.id, item.bbox, item.object)
+
+
+def rtree_entries(tree: Index) -> List[RtreeEntry]:
+    """
+    Returns all entries of a rtree as (id, bbox, object), which can be pickled unlike the rtree itself.
+    """
+    if len(tree) == 0:
+        return []
+    return [(item.id, item.bbox, item.object) for item in tree.intersection(tree.bounds, objects=True)]
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+
+from Benchmarks import Scenario, compare, format_results, load_baseline, measure, missing_baselines, save_baseline
+from Simulator import Coordinate4D
+
+
+class BenchmarksTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.scenario = Scenario("tiny", Coordinate4D(60, 15, 60, 150), nr_agents=6, nr_routes=4,
+                                 allocation_period=20, nr_owners=2)
+
+    def test_routes(self):
+        environment = self.scenario.environment()
+        routes = self.scenario.routes(environment)
+        self.assertEqual(4, len(routes))
+        self.assertEqual(routes, self.scenario.routes(self.scenario.environment()))
+        for start, end in routes:
+            self.assertFalse(environment.is_coordinate_blocked_forever(start, 1))
+            self.assertFalse(environment.is_coordinate_blocked_forever(end, 1))
+
+    def test_measure(self):
+        astar = measure(self.scenario, "astar", repeat=2)
+        self.assertEqual(4, astar["paths"])
+        self.assertGreater(astar["expansions"], 0)
+        self.assertGreater(astar["wall_time_s"], 0)
+        self.assertGreater(astar["peak_memory_mb"], 0)
+        self.assertEqual(astar["expansions"], measure(self.scenario, "astar", repeat=1, memory=False)["expansions"])
+        allocation = measure(self.scenario, "priority_allocate", repeat=1, memory=False)
+        self.assertEqual(6, allocation["allocated_agents"])
+        self.assertNotIn("peak_memory_mb", allocation)
+        self.assertIn("wall_time_s", measure(self.scenario, "simulation_dict", repeat=1, memory=False))
+        self.assertRaises(Exception, measure, self.scenario, "unknown")
+
+    def test_baseline(self):
+        results = {"astar": {"wall_time_s": 1.3, "peak_memory_mb": 2., "expansions": 100, "paths": 4},
+                   "statistics": {"wall_time_s": 0.5}}
+        baseline = {"astar": {"wall_time_s": 1., "peak_memory_mb": 2., "expansions": 0}}
+        comparison = {(entry["benchmark"], entry["metric"]): entry for entry in compare(results, baseline, 0.2)}
+        self.assertEqual({("astar", "wall_time_s"), ("astar", "peak_memory_mb"), ("astar", "expansions")},
+                         set(comparison))
+        self.assertAlmostEqual(0.3, comparison[("astar", "wall_time_s")]["change"])
+        self.assertTrue(comparison[("astar", "wall_time_s")]["regression"])
+        self.assertFalse(comparison[("astar", "peak_memory_mb")]["regression"])
+        self.assertTrue(comparison[("astar", "expansions")]["regression"])
+        self.assertFalse(any(entry["regression"] for entry in compare(results, baseline, 0.5)
+                             if entry["metric"] == "wall_time_s"))
+        self.assertIn("+30%!", format_results(results, list(comparison.values())))
+        self.assertEqual(["statistics"], missing_baselines(results, baseline))
+        self.assertEqual([], missing_baselines({}, baseline))
+        table = format_results({"priority_allocate": {"wall_time_s": 2., "allocate_s": 0.75}}, [])
+        self.assertIn("allocate [s]", table)
+        self.assertIn("0.7500", table)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "baselines", "tiny.json")
+            self.assertEqual({}, load_baseline(path))
+            save_baseline(path, baseline)
+            save_baseline(path, {"statistics": results["statistics"]})
+            self.assertEqual({**baseline, "statistics": results["statistics"]}, load_baseline(path))
@@ -0,0 +1,77 @@
+import random
+import unittest
+
+from API import APISimulationConfig, CityGen, EnvironmentGen
+from API.Runners import init_generator, init_map
+from Demos.Priority import PriorityAllocator, PriorityPathBiddingStrategy, PriorityPathValueFunction, \
+    PriorityPaymentRule
+from Simulator import BuildingBlocker, Coordinate4D, DynamicBlocker, Mechanism, Simulator
+
+
+class CityGenTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dimensions = Coordinate4D(200, 40, 150, 400)
+
+    def test_deterministic(self):
+        city = CityGen(self.dimensions, seed=1, weather_fronts=2)
+        blockers = city.blockers()
+        same = CityGen(self.dimensions, seed=1, weather_fronts=2).blockers()
+        other = CityGen(self.dimensions, seed=2, weather_fronts=2).blockers()
+        self.assertGreater(len(blockers), 0)
+        self.assertEqual([blocker.points for blocker in blockers if isinstance(blocker, BuildingBlocker)],
+                         [blocker.points for blocker in same if isinstance(blocker, BuildingBlocker)])
+        self.assertEqual([blocker.dimension.y for blocker in blockers], [blocker.dimension.y for blocker in same])
+        self.assertNotEqual([blocker.points for blocker in blockers if isinstance(blocker, BuildingBlocker)],
+                            [blocker.points for blocker in other if isinstance(blocker, BuildingBlocker)])
+
+    def test_buildings(self):
+        self.assertEqual(0, len(CityGen(self.dimensions, density=0).buildings()))
+        # 3 x 2 blocks with 2 x 2 lots each
+        buildings = CityGen(self.dimensions, density=1, block_size=50, street_width=25, min_building_size=10,
+                            max_building_size=25, max_height=0.5).buildings()
+        self.assertEqual(24, len(buildings))
+        for building in buildings:
+            self.assertTrue(0 <= building.location.x and building.location.x + building.dimension.x <= 200)
+            self.assertTrue(0 <= building.location.z and building.location.z + building.dimension.z <= 150)
+            self.assertTrue(1 <= building.dimension.y <= 20)
+        self.assertRaises(Exception, CityGen, self.dimensions, density=2)
+        self.assertRaises(Exception, CityGen, self.dimensions, min_building_size=30, max_building_size=20)
+
+    def test_fronts(self):
+        fronts = CityGen(self.dimensions, seed=3, weather_fronts=3, front_width=10).fronts()
+        self.assertEqual(3, len(fronts))
+        for front in fronts:
+            self.assertIsInstance(front, DynamicBlocker)
+            self.assertEqual(self.dimensions.y, front.dimension.y)
+            first, last = front.locations[0], front.locations[-1]
+            self.assertGreater(last.t, first.t)
+            self.assertFalse(first.inter_temporal_equal(last))
+            self.assertLessEqual(last.t, self.dimensions.t)
+
+    def test_simulation(self):
+        random.seed(0)
+        city = CityGen(self.dimensions, seed=4, weather_fronts=1)
+        environment = EnvironmentGen(self.dimensions, [], None, city=city).generate()
+        self.assertEqual(len(city.blockers()), len(environment.blocker_dict))
+        owners = city.path_owners(3, 20, 50, PriorityPathBiddingStrategy, PriorityPathValueFunction,
+                                  config={"priority": 0.5})
+        self.assertEqual([7, 7, 6], [len(owner.creation_ticks) for owner in owners])
+        simulator = Simulator(owners, Mechanism(PriorityAllocator(), PriorityPaymentRule()), environment)
+        simulator.run()
+        self.assertEqual(20, len(environment.agents))
+
+    def test_config(self):
+        config = APISimulationConfig(**{
+            "name": "synthetic", "description": "", "allocator": "FCFSAllocator", "paymentRule": "FCFSPaymentRule",
+            "map": {"coordinates": {"long": 8.54, "lat": 47.37}, "locationName": "-", "neighbouringTiles": 0,
+                    "resolution": 10, "height": 100, "timesteps": 300, "minHeight": 20, "allocationPeriod": 50,
+                    "synthetic": {"seed": 5, "weatherFronts": 1}},
+            "owners": [{"color": "#e53935", "name": "A", "agents": 4, "valueFunction": "FCFSPathValueFunction",
+                        "locations": [{"type": "random", "points": []}, {"type": "random", "points": []}],
+                        "biddingStrategy": {"minLocations": 2, "maxLocations": 10, "allocationType": "path",
+                                            "classname": "FCFSPathBiddingStrategy", "meta": []}}]})
+        _, _, dimensions = init_map(config)
+        generator = init_generator(config)
+        self.assertEqual(len(CityGen(dimensions, seed=5, weather_fronts=1).blockers()),
+                         len(generator.environment.blocker_dict))
+        self.assertGreater(len(generator.environment.blocker_dict), 0)
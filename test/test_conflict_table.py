@@ -0,0 +1,40 @@
+import unittest
+
+from Demos.CBS.Allocator.CBSAllocatorHelpers import ConflictTable
+from Simulator import Coordinate4D, PathSegment
+from test.EnvHelpers import generate_path_agent
+
+
+def straight_path(x: int, z: int, t: int, length: int):
+    coordinates = [Coordinate4D(x + i, 0, z, t + i) for i in range(length)]
+    return [PathSegment(coordinates[0].to_3D(), coordinates[-1].to_3D(), 0, coordinates)]
+
+
+class ConflictTableTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.agents = [generate_path_agent() for _ in range(3)]
+        self.table = ConflictTable(self.agents, 1)
+        self.table.update(self.agents[0], straight_path(0, 0, 0, 10))
+        self.table.update(self.agents[1], straight_path(0, 5, 0, 10))
+        self.table.update(self.agents[2], straight_path(4, 1, 4, 5))
+
+    def test_first_conflict(self):
+        conflict = self.table.first_conflict(0, 20)
+        self.assertEqual(self.agents[2], conflict.agent_1)
+        self.assertEqual(self.agents[0], conflict.agent_2)
+        self.assertEqual(Coordinate4D(4, 0, 1, 4), conflict.location_1)
+        self.assertIsNone(self.table.first_conflict(0, 4))
+
+    def test_update(self):
+        self.table.update(self.agents[2], straight_path(4, 4, 4, 5))
+        conflict = self.table.first_conflict(0, 20)
+        self.assertEqual(self.agents[2], conflict.agent_1)
+        self.assertEqual(self.agents[1], conflict.agent_2)
+        self.table.update(self.agents[2], straight_path(4, 3, 4, 5))
+        self.assertIsNone(self.table.first_conflict(0, 20))
+
+    def test_copy(self):
+        cpy = self.table.copy()
+        cpy.update(self.agents[2], straight_path(4, 3, 4, 5))
+        self.assertIsNone(cpy.first_conflict(0, 20))
+        self.assertIsNotNone(self.table.first_conflict(0, 20))
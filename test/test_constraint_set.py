@@ -0,0 +1,75 @@
+import unittest
+
+from Demos.CBS.Allocator.CBSAllocatorHelpers import ConstraintSet, HighLevelNode
+from Demos.CBS.BiddingStrategy.CBSPathBiddingStrategy import CBSPathBiddingStrategy
+from Demos.CBS.ValueFunction.CBSPathValueFunction import CBSPathValueFunction
+from Simulator import Coordinate4D, PathAgent
+
+
+class ConstraintSetTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.agents = [PathAgent(f"{i}-0", CBSPathBiddingStrategy(), CBSPathValueFunction(),
+                                 [Coordinate4D(0, 0, 0, 1), Coordinate4D(5, 0, 5, 1)], [])
+                       for i in range(3)]
+
+    @staticmethod
+    def build(pairs) -> ConstraintSet:
+        constraints = ConstraintSet()
+        for agent, constraint in pairs:
+            constraints = constraints.add(agent, constraint)
+        return constraints
+
+    def test_order_independent(self):
+        a, b, c = self.agents
+        pairs = [(a, 1), (b, 1), (a, 7), (c, 3), (b, 2)]
+        constraints = self.build(pairs)
+        reversed_constraints = self.build(reversed(pairs))
+        self.assertEqual(constraints, reversed_constraints)
+        self.assertEqual(hash(constraints), hash(reversed_constraints))
+        self.assertEqual(5, constraints.size)
+        self.assertEqual(set(pairs), constraints.pairs())
+        self.assertEqual({1, 7}, constraints.of(a))
+        self.assertEqual({1, 2}, reversed_constraints.of(b))
+        self.assertNotEqual(constraints, self.build(pairs[:-1]))
+        self.assertNotEqual(constraints, self.build(pairs[:-1] + [(c, 2)]))
+        self.assertEqual(ConstraintSet(), ConstraintSet())
+        self.assertEqual(0, hash(ConstraintSet()))
+
+    def test_siblings(self):
+        a, b, _ = self.agents
+        parent = self.build([(a, 1), (b, 4)])
+        left = parent.add(a, 2).add(b, 5)
+        right = parent.add(b, 5).add(a, 2)
+        self.assertEqual(left, right)
+        self.assertEqual(hash(left), hash(right))
+        self.assertEqual({1, 2}, left.of(a))
+        self.assertEqual({4, 5}, right.of(b))
+        # Adding to a child does not change the parent or a sibling
+        sibling = parent.add(a, 3)
+        self.assertEqual({1}, parent.of(a))
+        self.assertEqual({1, 3}, sibling.of(a))
+        self.assertIs(parent.of(b), sibling.of(b))
+        self.assertNotEqual(left, sibling)
+
+    def test_contains(self):
+        a, b, c = self.agents
+        constraints = self.build([(a, 1), (b, 2)])
+        self.assertTrue(constraints.contains(a, 1))
+        self.assertFalse(constraints.contains(a, 2))
+        self.assertFalse(constraints.contains(c, 1))
+        self.assertEqual({a, b}, set(constraints.agents()))
+        self.assertNotIn(c, constraints.agents())
+        self.assertEqual(set(), constraints.of(c))
+
+    def test_nodes(self):
+        a, b, _ = self.agents
+        node = HighLevelNode()
+        node.add_constraint(a, 1)
+        left, right = node.copy(), node.copy()
+        left.add_constraint(b, 2)
+        right.add_constraint(b, 2)
+        self.assertEqual(left, right)
+        self.assertEqual(1, len({left, right}))
+        self.assertIs(b, left.newly_constraint)
+        self.assertEqual({1}, node.constraints.of(a))
+        self.assertEqual(set(), node.constraints.of(b))
@@ -1,6 +1,7 @@
 import unittest
 
 from Simulator import Coordinate2D, Coordinate3D, Coordinate4D
+from Simulator.IO.Stringify import Stringify
 
 
 class CoordinatesTest(unittest.TestCase):
@@ -71,3 +72,15 @@ class CoordinatesTest(unittest.TestCase):
         self.assertListEqual(aa.list_rep(), [21, 1, 19, 8])
         self.assertListEqual(aa.tree_query_cube_rep(2, 4), [19, -1, 17, 8, 23, 3, 21, 12])
         self.assertEqual(aa.distance(cc), 0)
+
+    def test_4D_hash_and_key(self):
+        dimension = Coordinate4D(40, 10, 40, 100)
+        aa = Coordinate4D(21, 1, 19, 8)
+        self.assertEqual(hash(aa), hash(Coordinate4D(21., 1., 19., 8)))
+        self.assertNotEqual(hash(aa), hash(Coordinate4D(21, 1, 19, 9)))
+        self.assertEqual(aa.packed_key(dimension), Coordinate4D(21, 1, 19, 8).packed_key(dimension))
+        keys = set([Coordinate4D(x, y, z, t).packed_key(dimension)
+                    for x in [0, 1, 40] for y in [0, 9, 10] for z in [0, 1, 40] for t in [0, 1, 100]])
+        self.assertEqual(81, len(keys))
+        self.assertRaises(AttributeError, setattr, aa, "w", 1)
+        self.assertEqual({"x": 21, "z": 19, "y": 1, "t": 8}, Stringify.to_dict(aa))
@@ -0,0 +1,87 @@
+import math
+import pickle
+import unittest
+from collections import deque
+
+from Demos.FCFS.BidTracker.FCFSBidTracker import FCFSBidTracker
+from Simulator import AStar, Coordinate3D, Coordinate4D, DistanceField, DistanceHeuristic, DynamicBlocker, \
+    Environment, StaticBlocker
+from test.EnvHelpers import generate_path_agent
+
+
+class DistanceHeuristicTest(unittest.TestCase):
+    def setUp(self) -> None:
+        wall = StaticBlocker(Coordinate3D(8, 0, 0), Coordinate3D(1, 1, 16))
+        self.env = Environment(Coordinate4D(20, 1, 20, 1000), [wall])
+
+    def bfs(self, target, radius):
+        distances = {target: 0}
+        queue = deque([target])
+        field = DistanceField(target, self.env.dimension, lambda _: True)
+        while queue:
+            cell = queue.popleft()
+            for neighbor in field._neighbors(cell):
+                if neighbor not in distances and not self.env.is_coordinate_blocked_forever(
+                        Coordinate4D(neighbor[0], neighbor[1], neighbor[2], 0), radius):
+                    distances[neighbor] = distances[cell] + 1
+                    queue.append(neighbor)
+        return distances
+
+    def test_exact_distances(self):
+        target = Coordinate4D(17, 0, 2, 0)
+        expected = self.bfs((17, 0, 2), 1)
+        for x in range(0, 20):
+            for z in range(0, 20):
+                position = Coordinate4D(x, 0, z, 0)
+                distance = self.env.distance_heuristic.distance(position, target, 1)
+                self.assertEqual(expected.get((x, 0, z), math.inf), distance, f"{position}")
+                if distance < math.inf:
+                    self.assertGreaterEqual(distance, position.distance(target))
+        self.assertEqual(17 + 2 * 16, self.env.distance_heuristic.distance(Coordinate4D(0, 0, 2, 0), target, 1))
+
+    def test_lru(self):
+        heuristic = DistanceHeuristic(self.env, capacity=2)
+        first = heuristic.get_field(Coordinate4D(1, 0, 1, 0), 1)
+        heuristic.get_field(Coordinate4D(2, 0, 2, 0), 1)
+        self.assertIs(first, heuristic.get_field(Coordinate4D(1, 0, 1, 0), 1))
+        heuristic.get_field(Coordinate4D(3, 0, 3, 0), 1)
+        self.assertEqual([((1, 0, 1), 1), ((3, 0, 3), 1)], list(heuristic.fields.keys()))
+        self.assertIsNot(heuristic.get_field(Coordinate4D(1, 0, 1, 0), 2), first)
+        self.assertIs(self.env.distance_heuristic, self.env.clone().distance_heuristic)
+        self.assertIs(self.env.distance_heuristic, self.env.new_clear().distance_heuristic)
+
+    def test_pickle(self):
+        target = Coordinate4D(17, 0, 2, 0)
+        distance = self.env.distance_heuristic.distance(Coordinate4D(0, 0, 2, 0), target, 1)
+        restored = pickle.loads(pickle.dumps(self.env))
+        self.assertEqual(0, len(restored.distance_heuristic.fields))
+        self.assertIs(restored, restored.distance_heuristic.environment)
+        self.assertEqual(distance, restored.distance_heuristic.distance(Coordinate4D(0, 0, 2, 0), target, 1))
+        self.assertEqual(1, len(self.env.distance_heuristic.fields))
+
+    def test_astar(self):
+        agent = generate_path_agent()
+        start = Coordinate4D(0, 0, 2, 2)
+        end = Coordinate4D(17, 0, 2, 2)
+        plain = AStar(self.env, FCFSBidTracker(), 1, g_sum=1, height_adjust=0, max_iter=-1)
+        guided = AStar(self.env, FCFSBidTracker(), 1, g_sum=1, height_adjust=0, max_iter=-1, distance_heuristic=True)
+        plain_path, plain_steps, _ = plain.astar_loop(start, end, agent, set())
+        guided_path, guided_steps, _ = guided.astar_loop(start, end, agent, set())
+        self.assertEqual(len(plain_path), len(guided_path))
+        self.assertLess(guided_steps, plain_steps)
+
+    def test_astar_step_cost(self):
+        # The gap in the wall is closed until t=80, the detour around the wall is shorter than waiting for it
+        blockers = [StaticBlocker(Coordinate3D(8, 0, 0), Coordinate3D(1, 1, 1)),
+                    StaticBlocker(Coordinate3D(8, 0, 5), Coordinate3D(1, 1, 10)),
+                    DynamicBlocker([Coordinate4D(8, 0, 3, t) for t in range(0, 80)], Coordinate3D(1, 1, 1))]
+        env = Environment(Coordinate4D(20, 1, 20, 1000), blockers)
+        agent = generate_path_agent()
+        start = Coordinate4D(0, 0, 3, 0)
+        end = Coordinate4D(17, 0, 3, 0)
+        plain = AStar(env, FCFSBidTracker(), 0, height_adjust=0, max_iter=-1)
+        guided = AStar(env, FCFSBidTracker(), 0, height_adjust=0, max_iter=-1, distance_heuristic=True)
+        plain_path, _, _ = plain.astar_loop(start, end, agent, set())
+        guided_path, _, _ = guided.astar_loop(start, end, agent, set())
+        self.assertEqual(45, plain_path[-1].t)
+        self.assertEqual(plain_path[-1].t, guided_path[-1].t)
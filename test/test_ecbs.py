@@ -0,0 +1,53 @@
+import unittest
+
+from Demos.CBS.Allocator.CBSAllocator import CBSAllocator
+from Demos.CBS.Allocator.CBSAllocatorHelpers import ConflictTable, FocalList
+from Demos.CBS.Allocator.CBSCostFunctions import Welfare
+from Demos.CBS.BiddingStrategy.CBSPathBiddingStrategy import CBSPathBiddingStrategy
+from Demos.CBS.ValueFunction.CBSPathValueFunction import CBSPathValueFunction
+from Simulator import Coordinate4D, Environment, PathAgent
+
+
+class ECBSTest(unittest.TestCase):
+    def setUp(self) -> None:
+        # Three agents crossing each other in the middle of the map
+        self.routes = [((0, 5), (11, 5)), ((5, 0), (5, 11)), ((11, 0), (0, 11))]
+
+    def allocate(self, suboptimality: float):
+        env = Environment(Coordinate4D(12, 1, 12, 120))
+        agents = [PathAgent(f"{i}-0", CBSPathBiddingStrategy(), CBSPathValueFunction(),
+                            [Coordinate4D(start[0], 0, start[1], 1), Coordinate4D(end[0], 0, end[1], 1)], [],
+                            speed=1, battery=200, near_radius=1)
+                  for i, (start, end) in enumerate(self.routes)]
+        allocations = CBSAllocator(suboptimality=suboptimality).allocate(agents, env, 0)
+        table = ConflictTable(agents, 1)
+        for allocation in allocations.values():
+            table.update(allocation.agent, allocation.segments)
+        self.assertEqual(0, table.nr_conflicts())
+        return sum([segment.nr_voxels for allocation in allocations.values() for segment in allocation.segments])
+
+    def test_bound(self):
+        optimal_cost = self.allocate(1.)
+        self.assertLessEqual(optimal_cost, self.allocate(1.5))
+        self.assertLessEqual(self.allocate(1.5), optimal_cost * 1.5)
+
+    def test_invalid_suboptimality(self):
+        self.assertRaises(Exception, CBSAllocator, suboptimality=0.5)
+        self.assertRaises(Exception, CBSAllocator, Welfare, suboptimality=2)
+
+    def test_focal_list(self):
+        focal_list = FocalList(1.5)
+        focal_list.push(10, 3, "a")
+        focal_list.push(14, 1, "b")
+        focal_list.push(16, 0, "c")
+        self.assertEqual(3, len(focal_list))
+        self.assertEqual("b", focal_list.pop())
+        self.assertEqual("a", focal_list.pop())
+        self.assertEqual("c", focal_list.pop())
+        self.assertIsNone(focal_list.pop())
+
+        focal_list = FocalList(1.)
+        focal_list.push(10, 3, "a")
+        focal_list.push(10, 1, "b")
+        focal_list.push(9, 5, "c")
+        self.assertEqual(["c", "b", "a"], [focal_list.pop() for _ in range(3)])
@@ -39,7 +39,7 @@ class EnvironmentTest(unittest.TestCase):
         self.assertEqual(len(list(r_tree_no_voxel)), 0)
         self.assertEqual(len(list(r_tree_double_voxel)), 1)
         r_tree_object = list(r_tree_end_voxel)
-        self.assertEqual(r_tree_object[0].id, hash(agi.id))
+        self.assertEqual(r_tree_object[0].id, hash(agi))
 
     def test_allocate_space_segment_for_agent(self):
         agi = generate_space_agent()
@@ -55,7 +55,7 @@ class EnvironmentTest(unittest.TestCase):
         self.assertEqual(len(list(off_block)), 0)
         r_tree_object = list(block_obj)
         self.assertEqual(len(r_tree_object), 1)
-        self.assertEqual(r_tree_object[0].id, hash(agi.id))
+        self.assertEqual(r_tree_object[0].id, hash(agi))
 
     def test_allocate_segments_for_agents(self):
         allocation = generate_path_allocation()
@@ -89,7 +89,7 @@ class EnvironmentTest(unittest.TestCase):
     def test_register_agent(self):
         agi = generate_space_agent()
         self.env.register_or_reset_agent(agi, 0)
-        self.assertIn(hash(agi.id), self.env.agents)
+        self.assertIn(hash(agi), self.env.agents)
 
     def test_deallocate_path_agent(self):
         alloc = generate_path_allocation()
@@ -98,6 +98,15 @@ class EnvironmentTest(unittest.TestCase):
         allocations = self.env.tree.intersection([0, 0, 0, 0, 100, 100, 100, 100])
         self.assertEqual(len(list(allocations)), 0)
 
+    def test_deallocate_future_path_segment(self):
+        agi = generate_path_agent()
+        other = generate_path_agent()
+        self.env.allocate_path_segment_for_agent(agi, generate_path_segment(Coordinate4D(1, 1, 1, 20)))
+        self.env.deallocate_path_agent(agi, 10)
+        self.assertEqual(0, len(self.env.reservations))
+        self.assertEqual(0, len(list(self.env.tree.intersection([0, 0, 0, 0, 100, 100, 100, 100]))))
+        self.assertEqual(set(), self.env.intersect_path_coordinate(Coordinate4D(1, 1, 1, 20), other))
+
     def test_deallocate_space_agent(self):
         alloc = generate_space_allocation()
         self.env.allocate_segments_for_agents([alloc], 0)
@@ -128,7 +137,7 @@ class EnvironmentTest(unittest.TestCase):
         real_agent_2 = alloc_2.agent
         alloc_2.agent = real_agent_2.clone()
 
-        new_agents = {hash(real_agent_2.id): real_agent_2}
+        new_agents = {hash(real_agent_2): real_agent_2}
         converted = self.env.create_real_allocations([alloc_1, alloc_2], new_agents)
         self.assertFalse(converted[0].agent.is_clone)
         self.assertFalse(converted[1].agent.is_clone)
@@ -325,6 +334,95 @@ class EnvironmentTest(unittest.TestCase):
         res = self.env.intersect_space_segment(segi, agi_2)
         self.assertTrue(1 == len(res))
 
+    def test_transaction_rollback(self):
+        agi = generate_path_agent()
+        path_segment = generate_path_segment(Coordinate4D(11, 11, 11, 3))
+        self.env.add_agent(agi)
+        self.env.allocate_path_segment_for_agent(agi, path_segment)
+        space_allocation = generate_space_allocation()
+
+        self.env.begin_transaction()
+        self.env.deallocate_path_agent(agi, 6)
+        self.env.allocate_segments_for_agents([space_allocation], 1)
+        self.assertEqual(4, len(agi.allocated_segments[0].coordinates))
+        self.assertEqual(set(), self.env.reservations.intersect(Coordinate4D(14, 14, 14, 14), 0, 0))
+        self.assertEqual(1, len(list(self.env.tree.intersection([45, 45, 45, 20, 45, 45, 45, 20]))))
+        self.env.rollback_transaction()
+
+        self.assertNotIn(hash(space_allocation.agent), self.env.agents)
+        self.assertEqual(0, self.env.nr_space_agents)
+        self.assertIs(path_segment, agi.allocated_segments[0])
+        self.assertEqual(12, len(path_segment.coordinates))
+        self.assertEqual({hash(agi)}, self.env.reservations.intersect(Coordinate4D(14, 14, 14, 14), 0, 0))
+        self.assertEqual(1, len(list(self.env.tree.intersection([14, 14, 14, 14, 14, 14, 14, 14]))))
+        self.assertEqual(0, len(list(self.env.tree.intersection([45, 45, 45, 20, 45, 45, 45, 20]))))
+        self.assertEqual(12, len(self.env.reservations))
+
+    def test_transaction_commit(self):
+        agi = generate_path_agent()
+        path_segment = generate_path_segment(Coordinate4D(11, 11, 11, 3))
+        self.env.add_agent(agi)
+        self.env.allocate_path_segment_for_agent(agi, path_segment)
+
+        self.env.begin_transaction()
+        self.env.deallocate_path_agent(agi, 6)
+        self.env.commit_transaction()
+
+        self.assertIsNone(self.env.transaction)
+        self.assertEqual(Coordinate4D(11, 11, 13, 6), agi.allocated_segments[0].max)
+        self.assertEqual(12, len(path_segment.coordinates))
+        self.assertEqual(4, len(self.env.reservations))
+
+    def test_agent_boxes(self):
+        agi = generate_path_agent()
+        self.env.add_agent(agi)
+        self.env.allocate_path_segment_for_agent(agi, generate_path_segment(Coordinate4D(11, 11, 11, 3)))
+        tree_boxes = [item.bbox for item in self.env.tree.intersection(self.env.tree.bounds, objects=True)]
+        self.assertEqual(sorted(tree_boxes), sorted(self.env.agent_boxes[hash(agi)]))
+
+        self.env.deallocate_path_agent(agi, 6)
+        tree_boxes = [item.bbox for item in self.env.tree.intersection(self.env.tree.bounds, objects=True)]
+        self.assertEqual(sorted(tree_boxes), sorted(self.env.agent_boxes[hash(agi)]))
+        self.assertEqual(6, max([bbox[7] for bbox in tree_boxes]))
+
+        cloned = self.env.clone()
+        cloned.deallocate_path_agent(cloned.agents[hash(agi)], 3)
+        self.assertEqual(sorted(tree_boxes), sorted(self.env.agent_boxes[hash(agi)]))
+        self.assertEqual(1, len(cloned.agent_boxes[hash(agi)]))
+
+    def test_evict_expired(self):
+        env = Environment(Coordinate4D(100, 100, 100, 1000), sliding_window=True)
+        agi = generate_path_agent()
+        env.add_agent(agi)
+        env.allocate_path_segment_for_agent(agi, generate_path_segment(Coordinate4D(11, 11, 11, 3)))
+        space_agent = generate_space_agent()
+        env.add_agent(space_agent)
+        nr_boxes = len(env.tree)
+
+        env.evict_expired(10)
+        self.assertEqual(nr_boxes, len(env.tree) + len(env.archive))
+        self.assertTrue(len(env.archive) > 0)
+        self.assertTrue(all([bbox[7] >= 10 - agi.speed for bbox in env.agent_boxes[hash(agi)]]))
+        past = env.intersect_space_coordinates(Coordinate4D(11, 11, 11, 3), Coordinate4D(11, 11, 13, 5), space_agent,
+                                               use_max_radius=False)
+        self.assertEqual({agi}, past)
+        self.assertEqual({agi}, env.intersect_space_coordinates(Coordinate4D(14, 14, 14, 14),
+                                                                Coordinate4D(14, 14, 14, 14), space_agent))
+
+        env.deallocate_path_agent(agi, 12)
+        self.assertEqual(Coordinate4D(14, 12, 14, 12), agi.allocated_segments[0].max)
+        self.assertEqual(set(), env.intersect_space_coordinates(Coordinate4D(14, 14, 14, 14),
+                                                                Coordinate4D(14, 14, 14, 14), space_agent))
+
+    def test_evict_expired_disabled(self):
+        agi = generate_path_agent()
+        self.env.add_agent(agi)
+        self.env.allocate_path_segment_for_agent(agi, generate_path_segment(Coordinate4D(11, 11, 11, 3)))
+        nr_boxes = len(self.env.tree)
+        self.env.evict_expired(100)
+        self.assertEqual(nr_boxes, len(self.env.tree))
+        self.assertEqual(0, len(self.env.archive))
+
 
 if __name__ == '__main__':
     unittest.main()
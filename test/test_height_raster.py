@@ -0,0 +1,42 @@
+import unittest
+
+from Simulator import BuildingBlocker, Coordinate3D, Coordinate4D, Environment, HeightRaster, StaticBlocker
+
+
+class HeightRasterTest(unittest.TestCase):
+    def setUp(self) -> None:
+        vertices = [[10.5, 10.5], [30.5, 12.5], [25.5, 30.5], [12.5, 25.5]]
+        self.building = BuildingBlocker(vertices, [Coordinate3D(10.5, 0, 10.5), Coordinate3D(30.5, 20, 30.5)], [])
+        self.env = Environment(Coordinate4D(40, 40, 40, 100), [self.building])
+
+    def test_matches_building_blocker(self):
+        raster = HeightRaster(self.env.dimension, [self.building])
+        for radius in [0, 1, 2.5]:
+            for x in range(0, 41):
+                for y in range(15, 26):
+                    for z in range(0, 41):
+                        coord = Coordinate4D(x, y, z, 10)
+                        expected = len(self.env.get_blockers_at_coordinate(coord, radius, 0)) > 0 and \
+                            self.building.is_blocking(coord, radius)
+                        self.assertEqual(expected, raster.is_blocking(coord, radius), f"{coord}, r={radius}")
+
+    def test_not_covered(self):
+        self.assertIsNone(self.env.height_raster.is_blocking(Coordinate4D(20.5, 10, 20, 10), 1))
+        self.assertIsNone(self.env.height_raster.is_blocking(Coordinate4D(20, 10, 20, 101), 1))
+        self.assertIsNone(self.env.height_raster.is_blocking(Coordinate4D(41, 10, 20, 10), 1))
+        self.assertTrue(self.env.is_coordinate_blocked_forever(Coordinate4D(20.5, 10, 20, 10), 1))
+        self.assertFalse(self.env.is_coordinate_blocked_forever(Coordinate4D(20, 10, 20, 101), 1))
+
+    def test_mixed_blockers(self):
+        static = StaticBlocker(Coordinate3D(32, 0, 32), Coordinate3D(4, 4, 4))
+        env = Environment(Coordinate4D(40, 40, 40, 100), [self.building, static])
+        self.assertEqual({self.building.id}, env.height_raster.blocker_ids)
+        self.assertTrue(env.is_coordinate_blocked_forever(Coordinate4D(20, 10, 20, 10), 0))
+        self.assertTrue(env.is_coordinate_blocked_forever(Coordinate4D(33, 2, 33, 10), 0))
+        self.assertFalse(env.is_coordinate_blocked_forever(Coordinate4D(33, 6, 20, 10), 0))
+        self.assertIs(env.height_raster, env.clone().height_raster)
+        self.assertIs(env.height_raster, env.new_clear().height_raster)
+
+
+if __name__ == '__main__':
+    unittest.main()
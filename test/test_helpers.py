@@ -38,6 +38,22 @@ class HelpersTest(unittest.TestCase):
                                                  position=Coordinate4D(11, 11, 5, 6), agent=self.path_agent, min_tick=3,
                                                  max_tick=1000))
 
+    def test_find_valid_path_tick_jumps(self):
+        calls = []
+        original = self.env.is_coordinate_blocked
+        self.env.is_coordinate_blocked = lambda *args: calls.append(args) or original(*args)
+        self.assertIsNone(find_valid_path_tick(tick=0, environment=self.env, bid_tracker=self.FCFSBidTracker,
+                                               position=Coordinate4D(35, 35, 5, 1), agent=self.path_agent, min_tick=0,
+                                               max_tick=1000))
+        self.assertEqual(2, len(calls))
+
+        self.env.allocate_segments_for_agents([generate_path_allocation()], 1)
+        calls.clear()
+        self.assertEqual(20, find_valid_path_tick(tick=0, environment=self.env, bid_tracker=self.FCFSBidTracker,
+                                                  position=Coordinate4D(4, 4, 5, 16), agent=self.path_agent,
+                                                  min_tick=0, max_tick=1000))
+        self.assertEqual(2, len(calls))
+
     def test_find_valid_space_tick(self):
         self.assertEqual(1, find_valid_space_tick(tick=0, environment=self.env, bid_tracker=self.FCFSBidTracker,
                                                   min_position=Coordinate4D(11, 11, 3, 1),
@@ -0,0 +1,82 @@
+import io
+import json
+import logging
+import os
+import tempfile
+import unittest
+
+from Demos.FCFS.BidTracker.FCFSBidTracker import FCFSBidTracker
+from Simulator import AStar, Coordinate4D, Environment, flush_logging, setup_logging
+from Simulator.IO.Logging import LOGGER_NAMES
+from test.EnvHelpers import generate_path_agent
+
+
+class FormatCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __str__(self):
+        self.count += 1
+        return "counted"
+
+
+class LoggingTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "log.jsonl")
+        self.logger = logging.getLogger("Simulator.test")
+
+    def tearDown(self) -> None:
+        for name in LOGGER_NAMES:
+            logger = logging.getLogger(name)
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+                handler.close()
+            logger.setLevel(logging.NOTSET)
+            logger.propagate = True
+        self.directory.cleanup()
+
+    def read_lines(self):
+        with open(self.path) as f:
+            return [json.loads(line) for line in f.read().splitlines()]
+
+    def test_disabled_level_is_not_formatted(self):
+        stream = io.StringIO()
+        setup_logging("INFO", stream=stream)
+        counter = FormatCounter()
+        self.logger.debug("value %s", counter)
+        self.assertEqual(0, counter.count)
+        self.logger.info("value %s", counter)
+        self.assertEqual(1, counter.count)
+        self.assertEqual("value counted\n", stream.getvalue())
+
+    def test_json_lines(self):
+        setup_logging("DEBUG", self.path, capacity=2, stream=None)
+        self.logger.debug("first %s", 1, extra={"tick": 1})
+        self.assertFalse(os.path.exists(self.path) and os.path.getsize(self.path) > 0)
+        self.logger.debug("second %s", 2)
+        self.logger.info("third")
+        lines = self.read_lines()
+        self.assertEqual(2, len(lines))
+        self.assertEqual("first 1", lines[0]["message"])
+        self.assertEqual(1, lines[0]["tick"])
+        self.assertEqual("Simulator.test", lines[1]["logger"])
+
+        setup_logging("WARNING", stream=None)
+        lines = self.read_lines()
+        self.assertEqual(3, len(lines))
+        self.assertEqual("INFO", lines[2]["level"])
+
+    def test_astar_event(self):
+        setup_logging("DEBUG", self.path, stream=None)
+        agent = generate_path_agent()
+        astar = AStar(Environment(Coordinate4D(20, 1, 20, 1000)), FCFSBidTracker(), 1)
+        path, _ = astar.astar(Coordinate4D(0, 0, 5, 2), Coordinate4D(17, 0, 8, 25), agent)
+        flush_logging()
+        lines = self.read_lines()
+        self.assertEqual(1, len(lines))
+        self.assertEqual("Simulator.AStar.AStar", lines[0]["logger"])
+        self.assertEqual(agent.id, lines[0]["agent"])
+        self.assertGreater(len(path), 0)
+        self.assertTrue(lines[0]["message"].startswith("ASTAR:"))
+        self.assertGreater(lines[0]["steps"], 0)
@@ -0,0 +1,100 @@
+import json
+import re
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from API import APIWorldCoordinates, EnvironmentGen, MapTile, OverpassClient, warm_overpass_cache
+from API.Area import Area
+from Simulator import BuildingBlocker, Coordinate4D
+
+
+class OverpassStandIn(BaseHTTPRequestHandler):
+    """
+    Answers Overpass queries with one building in the center of the queried bounding box, or with an error if the
+    server is set to fail.
+    """
+
+    def do_POST(self):
+        query = parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode())["data"][0]
+        self.server.queries.append(query)
+        if self.server.fail:
+            self.send_response(500)
+            self.end_headers()
+            return
+        s, w, n, e = [float(value) for value in re.search(r"\(([-0-9.,]+)\)", query).group(1).split(",")]
+        lat, lon, d_lat, d_lon = (s + n) / 2, (w + e) / 2, (n - s) / 10, (e - w) / 10
+        outline = [{"lat": lat, "lon": lon}, {"lat": lat + d_lat, "lon": lon}, {"lat": lat + d_lat, "lon": lon + d_lon},
+                   {"lat": lat, "lon": lon + d_lon}, {"lat": lat, "lon": lon}]
+        body = json.dumps({"elements": [
+            {"type": "way", "id": len(self.server.queries), "tags": {"building:levels": "4"}, "geometry": outline},
+            {"type": "node", "id": 0}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class OverpassTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), OverpassStandIn)
+        self.server.queries = []
+        self.server.fail = False
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api/interpreter"
+        self.cache_directory = tempfile.TemporaryDirectory()
+        self.tiles = MapTile.tiles_from_coordinates(APIWorldCoordinates(long=8.5418, lat=47.3723), 1, 10)
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        self.cache_directory.cleanup()
+        OverpassClient.set_default(None)
+
+    def test_cache(self):
+        client = OverpassClient(self.url, self.cache_directory.name, max_workers=4)
+        buildings = client.buildings(self.tiles + self.tiles[:2])
+        self.assertEqual(9, len(self.server.queries))
+        self.assertEqual(9, len(buildings))
+        building = buildings[(self.tiles[0].z, self.tiles[0].x, self.tiles[0].y)][0]
+        self.assertEqual(12, building["height"])
+        self.assertEqual(5, len(building["outline"]))
+
+        cached = OverpassClient(self.url, self.cache_directory.name).buildings(self.tiles)
+        self.assertEqual(9, len(self.server.queries))
+        self.assertEqual(buildings, cached)
+
+        OverpassClient(self.url, None).buildings(self.tiles[:1])
+        self.assertEqual(10, len(self.server.queries))
+
+    def test_failed_requests(self):
+        self.server.fail = True
+        client = OverpassClient(self.url, self.cache_directory.name)
+        self.assertEqual([], client.buildings(self.tiles[:1])[(self.tiles[0].z, self.tiles[0].x, self.tiles[0].y)])
+        self.server.fail = False
+        self.assertEqual(1, len(client.buildings(self.tiles[:1])[(self.tiles[0].z, self.tiles[0].x, self.tiles[0].y)]))
+        self.assertEqual(2, len(self.server.queries))
+
+    def test_environment(self):
+        OverpassClient.set_default(OverpassClient(self.url, self.cache_directory.name))
+        self.assertEqual(9, warm_overpass_cache([{"map": {"coordinates": {"long": 8.5418, "lat": 47.3723},
+                                                          "neighbouringTiles": 1, "resolution": 10}},
+                                                 {"map": {"coordinates": {"long": 8.5418, "lat": 47.3723},
+                                                          "synthetic": {"seed": 1}}}]))
+        self.assertEqual(9, len(self.server.queries))
+
+        bottom_left, top_right = MapTile.bounding_box_from_maptiles_group(self.tiles)
+        area = Area(bottom_left, top_right, 10)
+        dimensions = Coordinate4D(*area.dimension[:1], 20, area.dimension[1], 100)
+        environment = EnvironmentGen(dimensions, self.tiles, area).generate()
+        self.assertEqual(9, len(self.server.queries))
+        self.assertEqual(9, len(environment.blocker_dict))
+        for blocker in environment.blocker_dict.values():
+            self.assertIsInstance(blocker, BuildingBlocker)
+            self.assertAlmostEqual(1.2, blocker.dimension.y)
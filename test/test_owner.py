@@ -63,6 +63,16 @@ class OwnerTest(unittest.TestCase):
                                 stops_2[0].locations[-1].distance(stops_2[0].locations[0]) * stops_2[
                                     0].speed)
 
+    def test_creation_schedule(self):
+        self.path_owner = WebPathOwner("Test Path Owner", "testosteroni", "#123456",
+                                       [GridLocation(str(GridLocationType.RANDOM.value)),
+                                        GridLocation(str(GridLocationType.RANDOM.value))],
+                                       [10, 3, 10], FCFSPathBiddingStrategy(), FCFSPathValueFunction(), 1, 1000, 1, {})
+        self.assertEqual(3, self.path_owner.next_creation_tick(0))
+        self.assertEqual(10, self.path_owner.next_creation_tick(4))
+        self.assertIsNone(self.path_owner.next_creation_tick(11))
+        self.assertEqual(2, len(self.path_owner.generate_agents(10, self.env)))
+
     def test_generate_stop_coordinate(self):
         stop = WebSpaceOwner.generate_stop_coordinates(GridLocation(str(GridLocationType.HEATMAP.value),
                                                                     heatmap=Heatmap(
@@ -47,6 +47,26 @@ class PathAgentTest(unittest.TestCase):
         self.assertEqual(Coordinate4D(6, 6, 8, 22), self.agent.get_position_at_tick(22))
         self.assertIsNone(self.agent.get_position_at_tick(50))
 
+    def test_get_positions_at_ticks(self):
+        segment = generate_path_segment(Coordinate4D(3, 3, 3, 3))
+        segment2 = generate_path_segment(Coordinate4D(6, 6, 6, 20))
+        segment2.index = 1
+        self.agent.add_allocated_segment(segment)
+        self.assertEqual(segment.coordinates[-2:], self.agent.get_positions_at_ticks(13, 30))
+        self.agent.add_allocated_segment(segment2)
+        self.assertEqual(segment.coordinates[-2:] + segment2.coordinates[:3], self.agent.get_positions_at_ticks(13, 22))
+        self.assertEqual([], self.agent.get_positions_at_ticks(0, 2))
+
+    def test_position_index_after_deallocation(self):
+        env = Environment(Coordinate4D(100, 100, 100, 1000))
+        env.add_agent(self.agent)
+        env.allocate_path_segment_for_agent(self.agent, generate_path_segment(Coordinate4D(3, 3, 3, 3)))
+        self.assertEqual(Coordinate4D(3, 3, 5, 5), self.agent.get_position_at_tick(5))
+        self.assertIsNotNone(self.agent.get_position_at_tick(12))
+        env.deallocate_path_agent(self.agent, 8)
+        self.assertIsNotNone(self.agent.get_position_at_tick(8))
+        self.assertIsNone(self.agent.get_position_at_tick(12))
+
     def test_get_allocated_coords(self):
         segment = generate_path_segment(Coordinate4D(3, 3, 3, 3))
         segment2 = generate_path_segment(Coordinate4D(6, 6, 6, 20))
@@ -0,0 +1,46 @@
+import unittest
+
+from Demos.CBS.Allocator.CBSAllocator import CBSAllocator
+from Demos.CBS.Allocator.CBSAllocatorHelpers import PathCache
+from Demos.CBS.BiddingStrategy.CBSPathBiddingStrategy import CBSPathBiddingStrategy
+from Demos.CBS.CBSAstar.CBSAstar import CBSAStar
+from Demos.CBS.ValueFunction.CBSPathValueFunction import CBSPathValueFunction
+from Simulator import Coordinate4D, Environment, PathAgent
+from test.EnvHelpers import generate_path_agent, generate_path_segment
+
+
+class PathCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.env = Environment(Coordinate4D(12, 1, 12, 120))
+        self.agent = PathAgent("0-0", CBSPathBiddingStrategy(), CBSPathValueFunction(),
+                               [Coordinate4D(0, 0, 0, 1), Coordinate4D(6, 0, 6, 1)], [], speed=1, battery=200)
+        self.allocator = CBSAllocator()
+        self.astar = CBSAStar(self.env)
+        self.path, _ = self.allocator.allocate_path(self.agent, set(), self.env, 0, self.astar)
+
+    def test_eviction(self):
+        agents = [generate_path_agent() for _ in range(3)]
+        result = ([generate_path_segment(Coordinate4D(1, 1, 1, 5))], "Path allocated.")
+        cache = PathCache(30)
+        cache.put(agents[0], frozenset(), result)
+        cache.put(agents[1], frozenset(), result)
+        self.assertIs(result, cache.get(agents[0], frozenset()))
+        self.assertIsNone(cache.get(agents[0], frozenset([1])))
+        cache.put(agents[2], frozenset(), result)
+        self.assertIsNone(cache.get(agents[1], frozenset()))
+        self.assertIsNotNone(cache.get(agents[0], frozenset()))
+        self.assertEqual(26, cache.nr_voxels)
+
+    def test_reuse(self):
+        constraints = {Coordinate4D(5, 0, 0, 6).packed_key(self.env.dimension)}
+        path, _ = self.allocator.allocate_path(self.agent, constraints, self.env, 0, self.astar, previous=self.path)
+        self.assertIs(self.path, path)
+
+    def test_warm_start(self):
+        constraints = {self.path[0].coordinates[5].packed_key(self.env.dimension)}
+        self.assertEqual((0, 4), self.allocator.first_violation(self.path, constraints, self.agent, self.env))
+        path, _ = self.allocator.allocate_path(self.agent, constraints, self.env, 0, self.astar, previous=self.path)
+        # There are other shortest paths, so the search from the position before the violation finds one of them
+        self.assertEqual(self.path[0].coordinates[:5], path[0].coordinates[:5])
+        self.assertNotIn(self.path[0].coordinates[5], path[0].coordinates)
+        self.assertEqual(self.path[0].max, path[0].max)
@@ -0,0 +1,45 @@
+import unittest
+
+from Demos.Priority.Allocator.PriorityAgentQueue import PriorityAgentQueue
+from test.EnvHelpers import generate_path_agent
+
+
+class PriorityAgentQueueTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.agents = [generate_path_agent() for _ in range(6)]
+        self.priorities = {agent: float(i % 3) for i, agent in enumerate(self.agents)}
+        self.queue = PriorityAgentQueue(lambda agent: self.priorities[agent])
+
+    def expected_order(self, agents):
+        remaining = set(agents)
+        order = []
+        while len(remaining) > 0:
+            max_prio = max([self.priorities[agent] for agent in remaining])
+            agent = max([agent for agent in remaining if self.priorities[agent] == max_prio], key=hash)
+            remaining.remove(agent)
+            order.append(agent)
+        return order
+
+    def test_order(self):
+        for agent in self.agents:
+            self.queue.push(agent)
+        self.assertEqual(self.expected_order(self.agents), [self.queue.pop() for _ in range(6)])
+        self.assertIsNone(self.queue.pop())
+        self.assertEqual(0, len(self.queue))
+
+    def test_push_again(self):
+        for agent in self.agents:
+            self.queue.push(agent)
+        first = self.queue.pop()
+        self.queue.push(self.agents[0])
+        self.queue.push(first)
+        self.assertEqual(6, len(self.queue))
+        self.assertEqual(self.expected_order(self.agents), [self.queue.pop() for _ in range(6)])
+        self.assertIsNone(self.queue.pop())
+
+    def test_priority_changed(self):
+        for agent in self.agents:
+            self.queue.push(agent)
+        self.priorities[self.agents[2]] = -1.
+        self.assertNotEqual(self.agents[2], self.queue.pop())
+        self.assertEqual(self.agents[2], [self.queue.pop() for _ in range(5)][-1])
@@ -0,0 +1,65 @@
+import unittest
+
+from Simulator import Coordinate4D, Environment, SpatialHashReservationIndex
+from test.EnvHelpers import generate_path_agent, generate_path_segment
+
+
+class ReservationIndexTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.index = SpatialHashReservationIndex(cell_size=4)
+
+    def test_insert_intersect(self):
+        self.index.insert(1, Coordinate4D(5, 5, 5, 10))
+        self.index.insert(2, Coordinate4D(9, 5, 5, 10))
+        self.assertEqual({1}, self.index.intersect(Coordinate4D(6, 6, 6, 10), 1, 0))
+        self.assertEqual({1, 2}, self.index.intersect(Coordinate4D(7, 5, 5, 10), 2, 0))
+        self.assertEqual(set(), self.index.intersect(Coordinate4D(5, 5, 5, 11), 2, 0))
+        self.assertEqual({1, 2}, self.index.intersect(Coordinate4D(7, 5, 5, 8), 2, 2))
+        self.assertEqual(2, len(self.index))
+
+    def test_insert_twice(self):
+        self.index.insert(1, Coordinate4D(5, 5, 5, 10))
+        self.index.insert(1, Coordinate4D(5, 5, 5, 10))
+        self.assertEqual(1, len(self.index))
+        self.index.remove(1, Coordinate4D(5, 5, 5, 10))
+        self.assertEqual(0, len(self.index))
+        self.assertEqual(set(), self.index.intersect(Coordinate4D(5, 5, 5, 10), 1, 0))
+
+    def test_remove_unknown(self):
+        self.index.remove(1, Coordinate4D(5, 5, 5, 10))
+        self.assertEqual(0, len(self.index))
+
+    def test_reserved_ticks(self):
+        self.index.insert(1, Coordinate4D(5, 5, 5, 10))
+        self.index.insert(1, Coordinate4D(6, 5, 5, 11))
+        self.index.insert(2, Coordinate4D(7, 5, 5, 14))
+        self.assertEqual({10, 11}, self.index.reserved_ticks(Coordinate4D(5, 5, 5, 0), 1, 0, 20))
+        self.assertEqual({11, 14}, self.index.reserved_ticks(Coordinate4D(6, 5, 5, 0), 1, 11, 20))
+        self.index.remove(1, Coordinate4D(6, 5, 5, 11))
+        self.assertEqual({14}, self.index.reserved_ticks(Coordinate4D(6, 5, 5, 0), 1, 11, 20))
+        self.assertEqual({10}, self.index.clone().reserved_ticks(Coordinate4D(5, 5, 5, 0), 0, 0, 20))
+
+    def test_clone(self):
+        self.index.insert(1, Coordinate4D(5, 5, 5, 10))
+        cloned = self.index.clone()
+        cloned.remove(1, Coordinate4D(5, 5, 5, 10))
+        self.assertEqual({1}, self.index.intersect(Coordinate4D(5, 5, 5, 10), 0, 0))
+        self.assertEqual(set(), cloned.intersect(Coordinate4D(5, 5, 5, 10), 0, 0))
+        self.assertEqual(0, len(self.index.new_clear()))
+
+    def test_environment_keeps_index_updated(self):
+        env = Environment(Coordinate4D(100, 100, 100, 1000))
+        agi = generate_path_agent()
+        env.add_agent(agi)
+        env.allocate_path_segment_for_agent(agi, generate_path_segment(Coordinate4D(1, 1, 1, 5)))
+        self.assertEqual(12, len(env.reservations))
+        self.assertEqual({hash(agi)}, env.reservations.intersect(Coordinate4D(4, 2, 3, 13), 0, 0))
+
+        env.deallocate_path_agent(agi, 10)
+        self.assertEqual(6, len(env.reservations))
+        self.assertEqual(set(), env.reservations.intersect(Coordinate4D(4, 2, 3, 13), 0, 0))
+        self.assertEqual({hash(agi)}, env.reservations.intersect(Coordinate4D(2, 2, 3, 10), 0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
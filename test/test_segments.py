@@ -30,6 +30,29 @@ class SegmentsTest(unittest.TestCase):
         self.assertEqual(Coordinate4D(2, 3, 6, 8), first.max)
         self.assertEqual(Coordinate4D(2, 4, 6, 9), second.min)
 
+    def test_split_temporal_join(self):
+        first, second = self.segment.split_temporal(8)
+        self.assertEqual(4, first.nr_voxels)
+        self.assertEqual(8, second.nr_voxels)
+        first.join(second)
+        self.assertEqual(self.segment.coordinates, first.coordinates)
+        self.assertEqual(12, self.segment.nr_voxels)
+
+    def test_clone(self):
+        cloned = self.segment.clone()
+        cloned.join(generate_path_segment(Coordinate4D(5, 6, 7, 16)))
+        self.assertEqual(12, self.segment.nr_voxels)
+        self.assertEqual(23, cloned.nr_voxels)
+        self.assertEqual(self.segment.coordinates, cloned.coordinates[:12])
+
+    def test_coordinate_access(self):
+        self.assertEqual(Coordinate4D(2, 3, 6, 8), self.segment.coordinate_at(3))
+        self.assertEqual(self.segment.max, self.segment.coordinate_at(-1))
+        self.assertEqual(self.segment.coordinates[2::3], list(self.segment.iter_coordinates(2, None, 3)))
+        self.assertTrue(self.segment.contains(Coordinate4D(2, 3, 6, 8)))
+        self.assertFalse(self.segment.contains(Coordinate4D(2, 3, 6, 9)))
+        self.assertRaises(IndexError, self.segment.coordinate_at, 12)
+
     def test_join(self):
         other = generate_path_segment(Coordinate4D(9, 3, 4, 5))
         self.assertRaises(AssertionError, self.segment.join, other)
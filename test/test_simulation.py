@@ -1,3 +1,7 @@
+import os
+import subprocess
+import sys
+import tempfile
 import unittest
 
 from API.GridLocation.GridLocation import GridLocation
@@ -5,7 +9,8 @@ from API.GridLocation.GridLocationType import GridLocationType
 from API.WebClasses import WebPathOwner
 from Demos.Priority import PriorityAllocator, PriorityPathBiddingStrategy, PriorityPathValueFunction, \
     PriorityPaymentRule
-from Simulator import Coordinate2D, Coordinate3D, Coordinate4D, Environment, Mechanism, Simulator, StaticBlocker
+from Simulator import Coordinate2D, Coordinate3D, Coordinate4D, Environment, Mechanism, Simulator, StaticBlocker, \
+    stable_hash
 
 
 class SimulationTest(unittest.TestCase):
@@ -14,30 +19,33 @@ class SimulationTest(unittest.TestCase):
                          StaticBlocker(Coordinate3D(0, 0, 0), Coordinate3D(1, 1, 1))]
         self.env = Environment(Coordinate4D(10, 1, 10, 200), self.blockers)
 
+    def generate_owners(self):
+        return [WebPathOwner("po_1",
+                             "Ghettobox",
+                             "#123456",
+                             [GridLocation(str(GridLocationType.POSITION.value), position=Coordinate2D(3, 3)),
+                              GridLocation(str(GridLocationType.POSITION.value), position=Coordinate2D(7, 7))],
+                             [3],
+                             PriorityPathBiddingStrategy(),
+                             PriorityPathValueFunction(),
+                             near_radius=1,
+                             battery=100,
+                             speed=1,
+                             config={"priority": 0.1}),
+                WebPathOwner("po_2", "SCHMITTAG", "#654321",
+                             [GridLocation(str(GridLocationType.POSITION.value), position=Coordinate2D(6, 7)),
+                              GridLocation(str(GridLocationType.POSITION.value), position=Coordinate2D(3, 3))],
+                             [4], PriorityPathBiddingStrategy(), PriorityPathValueFunction(), near_radius=1,
+                             battery=100, speed=1, config={"priority": 0.2}),
+                WebPathOwner("po_3", "EHHHH", "#999999",
+                             [GridLocation(str(GridLocationType.POSITION.value), position=Coordinate2D(1, 8)),
+                              GridLocation(str(GridLocationType.POSITION.value), position=Coordinate2D(4, 0))],
+                             [5], PriorityPathBiddingStrategy(), PriorityPathValueFunction(), near_radius=1,
+                             battery=100, speed=5, config={"priority": 0.2})
+                ]
+
     def test_tick(self):
-        owners = [WebPathOwner("po_1",
-                               "Ghettobox",
-                               "#123456",
-                               [GridLocation(str(GridLocationType.POSITION.value), position=Coordinate2D(3, 3)),
-                                GridLocation(str(GridLocationType.POSITION.value), position=Coordinate2D(7, 7))],
-                               [3],
-                               PriorityPathBiddingStrategy(),
-                               PriorityPathValueFunction(),
-                               near_radius=1,
-                               battery=100,
-                               speed=1,
-                               config={"priority": 0.1}),
-                  WebPathOwner("po_2", "SCHMITTAG", "#654321",
-                               [GridLocation(str(GridLocationType.POSITION.value), position=Coordinate2D(6, 7)),
-                                GridLocation(str(GridLocationType.POSITION.value), position=Coordinate2D(3, 3))],
-                               [4], PriorityPathBiddingStrategy(), PriorityPathValueFunction(), near_radius=1,
-                               battery=100, speed=1, config={"priority": 0.2}),
-                  WebPathOwner("po_3", "EHHHH", "#999999",
-                               [GridLocation(str(GridLocationType.POSITION.value), position=Coordinate2D(1, 8)),
-                                GridLocation(str(GridLocationType.POSITION.value), position=Coordinate2D(4, 0))],
-                               [5], PriorityPathBiddingStrategy(), PriorityPathValueFunction(), near_radius=1,
-                               battery=100, speed=5, config={"priority": 0.2})
-                  ]
+        owners = self.generate_owners()
         mechi = Mechanism(PriorityAllocator(), PriorityPaymentRule(0.02))
         simi = Simulator(owners, mechi, self.env)
         simi.tick()
@@ -46,10 +54,101 @@ class SimulationTest(unittest.TestCase):
         simi.tick()
         simi.tick()
         self.assertEqual(len(self.env.agents), 1)
-        self.assertIn(Coordinate4D(4, 0, 6, 8), self.env.agents[hash('po_1-0')].allocated_segments[0].coordinates)
+        self.assertIn(Coordinate4D(4, 0, 6, 8),
+                      self.env.agents[stable_hash('po_1-0')].allocated_segments[0].coordinates)
         simi.tick()
         self.assertEqual(len(self.env.agents), 2)
-        self.assertIn(Coordinate4D(4, 0, 6, 8), self.env.agents[hash('po_2-0')].allocated_segments[0].coordinates)
-        self.assertNotIn(Coordinate4D(4, 0, 6, 8), self.env.agents[hash('po_1-0')].allocated_segments[0].coordinates)
+        self.assertIn(Coordinate4D(4, 0, 6, 8),
+                      self.env.agents[stable_hash('po_2-0')].allocated_segments[0].coordinates)
+        self.assertNotIn(Coordinate4D(4, 0, 6, 8),
+                         self.env.agents[stable_hash('po_1-0')].allocated_segments[0].coordinates)
+        simi.tick()
+        self.assertEqual(len(self.env.agents), 3)
+
+    def test_skip_idle_ticks(self):
+        simi = Simulator(self.generate_owners(), Mechanism(PriorityAllocator(), PriorityPaymentRule(0.02)), self.env)
+        simi.skip_idle_ticks()
+        self.assertEqual(3, simi.time_step)
+        simi.tick()
+        simi.skip_idle_ticks()
+        self.assertEqual(4, simi.time_step)
+        self.assertEqual(len(self.env.agents), 1)
+        simi.tick()
         simi.tick()
         self.assertEqual(len(self.env.agents), 3)
+        simi.skip_idle_ticks()
+        self.assertEqual(self.env.dimension.t + 1, simi.time_step)
+        self.assertFalse(simi.tick())
+
+    def check_checkpoint(self, distance_heuristic: bool):
+        mechanism = Mechanism(PriorityAllocator(distance_heuristic=distance_heuristic), PriorityPaymentRule(0.02))
+        simi = Simulator(self.generate_owners(), mechanism, self.env)
+        simi.run()
+        expected = {agent_hash: [segment.coordinates for segment in agent.allocated_segments]
+                    for agent_hash, agent in self.env.agents.items()}
+
+        env = Environment(Coordinate4D(10, 1, 10, 200), self.blockers)
+        mechanism = Mechanism(PriorityAllocator(distance_heuristic=distance_heuristic), PriorityPaymentRule(0.02))
+        simi = Simulator(self.generate_owners(), mechanism, env)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "checkpoint.pkl")
+            for _ in range(5):
+                simi.tick()
+            simi.save_checkpoint(path)
+            restored = Simulator.load_checkpoint(path)
+            self.assertEqual(["checkpoint.pkl"], os.listdir(directory))
+        self.assertEqual(5, restored.time_step)
+        self.assertEqual(2, len(restored.environment.agents))
+        self.assertEqual(len(env.tree), len(restored.environment.tree))
+        self.assertEqual(len(env.blocker_tree), len(restored.environment.blocker_tree))
+        restored.run()
+        self.assertEqual(expected.keys(), restored.environment.agents.keys())
+        for agent_hash, coordinates in expected.items():
+            segments = restored.environment.agents[agent_hash].allocated_segments
+            self.assertEqual(coordinates, [segment.coordinates for segment in segments])
+
+    def test_checkpoint(self):
+        self.check_checkpoint(False)
+
+    def test_checkpoint_distance_heuristic(self):
+        self.check_checkpoint(True)
+        self.assertGreater(len(self.env.distance_heuristic.fields), 0)
+
+    def test_failed_checkpoint(self):
+        simi = Simulator(self.generate_owners(), Mechanism(PriorityAllocator(), PriorityPaymentRule(0.02)), self.env)
+        simi.unpicklable = lambda: None
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "checkpoint.pkl")
+            self.assertRaises(Exception, simi.save_checkpoint, path)
+            self.assertEqual([], os.listdir(directory))
+
+    def test_checkpoint_new_process(self):
+        simi = Simulator(self.generate_owners(), Mechanism(PriorityAllocator(), PriorityPaymentRule(0.02)), self.env)
+        for _ in range(5):
+            simi.tick()
+        # The checkpoint is resumed in processes whose string hashes differ from this one and each other
+        script = """
+import sys
+from Simulator import Simulator
+simi = Simulator.load_checkpoint(sys.argv[1])
+env = simi.environment
+assert all(hash(agent) == agent_hash for agent_hash, agent in env.agents.items())
+agent = env.agents[max(env.agents)]
+tree, reservations = len(env.tree), len(env.reservations)
+env.deallocate_agent(agent, 5)
+assert len(env.tree) < tree and len(env.reservations) < reservations, (len(env.tree), len(env.reservations))
+simi.run()
+print(sorted((agent.id, [segment.coordinates[-1].t for segment in agent.allocated_segments])
+             for agent in env.agents.values()))
+"""
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        outputs = []
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "checkpoint.pkl")
+            simi.save_checkpoint(path)
+            for seed in ("1", "2"):
+                result = subprocess.run([sys.executable, "-c", script, path], cwd=root, capture_output=True, text=True,
+                                        env={**os.environ, "PYTHONHASHSEED": seed})
+                self.assertEqual(0, result.returncode, result.stderr)
+                outputs.append(result.stdout)
+        self.assertEqual(outputs[0], outputs[1])
@@ -0,0 +1,61 @@
+import unittest
+
+from Demos.FCFS.BidTracker.FCFSBidTracker import FCFSBidTracker
+from Simulator import AStar, Coordinate3D, Coordinate4D, DynamicBlocker, Environment, PathSegment, SIPP, \
+    StaticBlocker
+from Simulator.helpers.helpers import is_valid_for_path_allocation
+from test.EnvHelpers import generate_path_agent
+
+
+class SIPPTest(unittest.TestCase):
+    def setUp(self) -> None:
+        blockers = [StaticBlocker(Coordinate3D(3, 0, 3), Coordinate3D(4, 1, 5)),
+                    StaticBlocker(Coordinate3D(9, 0, 6), Coordinate3D(2, 1, 8)),
+                    DynamicBlocker([Coordinate4D(16, 0, 7, t) for t in range(0, 100)], Coordinate3D(2, 1, 2))]
+        self.env = Environment(Coordinate4D(20, 1, 20, 1000), blockers)
+
+    def assert_valid_path(self, path, agent):
+        PathSegment.validate(path)
+        for coordinate in path:
+            self.assertTrue(is_valid_for_path_allocation(1, self.env, FCFSBidTracker(), coordinate, agent)[0])
+
+    def test_sipp(self):
+        agent = generate_path_agent()
+        sipp = SIPP(self.env, FCFSBidTracker(), 1)
+        path, collisions = sipp.astar(Coordinate4D(0, 0, 5, 2), Coordinate4D(17, 0, 3, 25), agent)
+        self.assertEqual(0, len(collisions))
+        self.assert_valid_path(path, agent)
+
+        astar = AStar(self.env, FCFSBidTracker(), 1, g_sum=1, height_adjust=0, max_iter=-1)
+        astar_path, _ = astar.astar(Coordinate4D(0, 0, 5, 2), Coordinate4D(17, 0, 3, 25), agent)
+        self.assertEqual(astar_path[-1], path[-1])
+
+    def test_invalid_start(self):
+        agent = generate_path_agent()
+        sipp = SIPP(self.env, FCFSBidTracker(), 1)
+        self.assertEqual(([], set()), sipp.astar(Coordinate4D(4, 0, 5, 2), Coordinate4D(17, 0, 8, 25), agent))
+        self.assertEqual(([], set()), sipp.astar(Coordinate4D(0, 0, 5, 999), Coordinate4D(17, 0, 8, 25), agent))
+
+    def test_long_wait(self):
+        agent = generate_path_agent()
+        start = Coordinate4D(14, 0, 8, 2)
+        end = Coordinate4D(17, 0, 8, 2)
+        sipp = SIPP(self.env, FCFSBidTracker(), 1)
+        sipp._min_tick, sipp._max_tick, sipp._start = start.t, self.env.dimension.t, (14, 0, 8)
+        path, sipp_steps, _ = sipp.sipp_loop(start, end, agent)
+        self.assert_valid_path(path, agent)
+        self.assertEqual(end.to_3D(), path[-1].to_3D())
+        self.assertGreaterEqual(path[-1].t, 100)
+
+        astar = AStar(self.env, FCFSBidTracker(), 1, g_sum=1, height_adjust=0, max_iter=-1)
+        astar_path, astar_steps, _ = astar.astar_loop(start, end, agent, set())
+        self.assertEqual(path[-1], astar_path[-1])
+        self.assertLess(sipp_steps * 10, astar_steps)
+
+    def test_speed(self):
+        agent = generate_path_agent()
+        agent.speed = 3
+        sipp = SIPP(self.env, FCFSBidTracker(), 1)
+        path, _ = sipp.astar(Coordinate4D(14, 0, 8, 2), Coordinate4D(17, 0, 8, 2), agent)
+        self.assert_valid_path(path, agent)
+        self.assertEqual(0, (path[-1].t - 2 + 1) % 3)
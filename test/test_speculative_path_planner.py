@@ -0,0 +1,80 @@
+import random
+import unittest
+
+from Demos.FCFS import FCFSAllocator, FCFSPathBiddingStrategy, FCFSPathValueFunction
+from Demos.Priority import PriorityAllocator, PriorityPathBiddingStrategy, PriorityPathValueFunction
+from Simulator import Allocation, Coordinate3D, Coordinate4D, Environment, PathAgent, SpeculativePathPlanner, \
+    StaticBlocker
+
+
+class SpeculativePathPlannerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.blockers = [StaticBlocker(Coordinate3D(20, 0, 20), Coordinate3D(4, 2, 4))]
+        # Two agents in each corner crossing each other and two agents crossing all corners
+        self.routes = [((1, 1), (12, 10)), ((12, 1), (1, 10)),
+                       ((48, 1), (37, 12)), ((37, 1), (48, 10)),
+                       ((1, 48), (12, 37)), ((12, 48), (1, 39)),
+                       ((48, 48), (37, 37)), ((37, 48), (48, 38)),
+                       ((5, 5), (45, 45)), ((45, 5), (5, 45))]
+
+    def generate_agents(self, bidding_strategy, value_function):
+        return [PathAgent(f"agent-{i}", bidding_strategy(), value_function(),
+                          [Coordinate4D(start[0], 0, start[1], 0), Coordinate4D(end[0], 0, end[1], 0)], [],
+                          config={"priority": i % 3 / 3}, speed=1 + i % 2, battery=400, near_radius=1 + i % 2)
+                for i, (start, end) in enumerate(self.routes)]
+
+    def allocate(self, allocator, agents):
+        env = Environment(Coordinate4D(50, 2, 50, 400), self.blockers)
+        env.begin_transaction()
+        allocations = allocator.allocate(agents, env, 0)
+        return {allocation.agent.id: [coordinate for segment in allocation.segments
+                                      for coordinate in segment.coordinates]
+                for allocation in allocations.values()}
+
+    def test_partition(self):
+        env = Environment(Coordinate4D(50, 2, 50, 400), self.blockers)
+        agents = self.generate_agents(PriorityPathBiddingStrategy, PriorityPathValueFunction)
+        groups = SpeculativePathPlanner(env, 2, corridor_margin=0).partition(agents[:8], 0)
+        self.assertEqual(4, len(groups))
+        self.assertEqual([[agents[0], agents[1]], [agents[2], agents[3]], [agents[4], agents[5]],
+                          [agents[6], agents[7]]], sorted(groups, key=lambda group: group[0].id))
+        self.assertEqual(1, len(SpeculativePathPlanner(env, 2, corridor_margin=0).partition(agents, 0)))
+
+    def test_priority(self):
+        sequential = self.allocate(PriorityAllocator(),
+                                   self.generate_agents(PriorityPathBiddingStrategy, PriorityPathValueFunction))
+        speculative = self.allocate(PriorityAllocator(parallel_workers=2),
+                                    self.generate_agents(PriorityPathBiddingStrategy, PriorityPathValueFunction))
+        self.assertEqual(sequential, speculative)
+
+    def test_fcfs(self):
+        random.seed(0)
+        sequential = self.allocate(FCFSAllocator(),
+                                   self.generate_agents(FCFSPathBiddingStrategy, FCFSPathValueFunction))
+        random.seed(0)
+        speculative = self.allocate(FCFSAllocator(parallel_workers=2),
+                                    self.generate_agents(FCFSPathBiddingStrategy, FCFSPathValueFunction))
+        self.assertEqual(sequential, speculative)
+
+    def test_conflict(self):
+        env = Environment(Coordinate4D(50, 2, 50, 400), self.blockers)
+        env.begin_transaction()
+        agents = self.generate_agents(FCFSPathBiddingStrategy, FCFSPathValueFunction)[:8]
+        allocator = FCFSAllocator()
+        astar = allocator.path_planner(env, allocator.bid_tracker, 0)
+        speculation = SpeculativePathPlanner(env, 2, corridor_margin=0)
+        speculation.speculate(agents, 0, lambda _agent: allocator.speculate_path(_agent, env, astar, 0))
+        self.assertEqual(len(agents), len(speculation.speculations))
+
+        # An agent crossing the first corner after the snapshot invalidates the speculation of that corner
+        crossing = PathAgent("crossing", FCFSPathBiddingStrategy(), FCFSPathValueFunction(),
+                             [Coordinate4D(6, 0, 0, 0), Coordinate4D(6, 0, 12, 0)], [])
+        crossing_segments, _, _ = allocator.speculate_path(crossing, env, astar, 0)
+        env.allocate_segments_for_agents([Allocation(crossing, crossing_segments, None)], 0)
+        speculation.committed(crossing)
+
+        self.assertIsNone(speculation.take(agents[0]))
+        self.assertIsNone(speculation.take(agents[1]))
+        self.assertIsNotNone(speculation.take(agents[2]))
+        self.assertIsNotNone(speculation.take(agents[3]))
+        self.assertIsNone(speculation.take(agents[3]))
@@ -0,0 +1,38 @@
+import unittest
+
+from API import APISimulationConfig, expand_grid
+from API.Sweep import map_key
+
+
+class SweepTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.base = APISimulationConfig(**{
+            "name": "sweep", "description": "", "allocator": "FCFSAllocator", "paymentRule": "FCFSPaymentRule",
+            "map": {"coordinates": {"long": 8.54, "lat": 47.37}, "locationName": "-", "neighbouringTiles": 0,
+                    "resolution": 10, "height": 100, "timesteps": 300, "minHeight": 20, "allocationPeriod": 50},
+            "owners": [{"color": "#e53935", "name": "A", "agents": 8, "valueFunction": "FCFSPathValueFunction",
+                        "locations": [{"type": "random", "points": []}, {"type": "random", "points": []}],
+                        "biddingStrategy": {"minLocations": 2, "maxLocations": 10, "allocationType": "path",
+                                            "classname": "FCFSPathBiddingStrategy", "meta": []}}]})
+
+    def test_expand_grid(self):
+        runs = expand_grid(self.base, {"seed": [1, 2],
+                                       "allocator,paymentRule": [["FCFSAllocator", "FCFSPaymentRule"],
+                                                                 ["PriorityAllocator", "PriorityPaymentRule"]],
+                                       "owners.0.agents": [3, 4, 5]})
+        self.assertEqual(12, len(runs))
+        self.assertEqual(list(range(12)), [index for index, _, _ in runs])
+        index, params, config = runs[-1]
+        self.assertEqual(2, params["seed"])
+        self.assertEqual("PriorityAllocator", config.allocator)
+        self.assertEqual("PriorityPaymentRule", config.paymentRule)
+        self.assertEqual(5, config.owners[0].agents)
+        self.assertEqual(8, self.base.owners[0].agents)
+
+    def test_unknown_parameter(self):
+        self.assertRaises(Exception, expand_grid, self.base, {"map.unknown": [1]})
+        self.assertRaises(Exception, expand_grid, self.base, {"owners.1.agents": [1]})
+
+    def test_map_key(self):
+        runs = expand_grid(self.base, {"map.allocationPeriod": [10, 20], "map.timesteps": [300, 400]})
+        self.assertEqual(2, len(set([map_key(config) for _, _, config in runs])))
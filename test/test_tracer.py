@@ -0,0 +1,78 @@
+import json
+import os
+import tempfile
+import unittest
+
+from API.GridLocation.GridLocation import GridLocation
+from API.GridLocation.GridLocationType import GridLocationType
+from API.WebClasses import WebPathOwner
+from Demos.Priority import PriorityAllocator, PriorityPathBiddingStrategy, PriorityPathValueFunction, \
+    PriorityPaymentRule
+from Simulator import Coordinate2D, Coordinate4D, Environment, Mechanism, Simulator, Tracer
+from Simulator.History.Tracer import span
+
+
+class TracerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.env = Environment(Coordinate4D(10, 1, 10, 100))
+        self.tracer = Tracer()
+        self.env.tracer = self.tracer
+        owners = [WebPathOwner("po_1", "A", "#123456", [self.position(0, 0), self.position(9, 9)], [2, 4],
+                               PriorityPathBiddingStrategy(), PriorityPathValueFunction(), near_radius=1, battery=100,
+                               speed=1, config={"priority": 0.1}),
+                  WebPathOwner("po_2", "B", "#654321", [self.position(9, 0), self.position(0, 9)], [3],
+                               PriorityPathBiddingStrategy(), PriorityPathValueFunction(), near_radius=1, battery=100,
+                               speed=1, config={"priority": 0.2})]
+        self.simulator = Simulator(owners, Mechanism(PriorityAllocator(), PriorityPaymentRule(0.02)), self.env)
+
+    @staticmethod
+    def position(x: int, z: int) -> GridLocation:
+        return GridLocation(str(GridLocationType.POSITION.value), position=Coordinate2D(x, z))
+
+    def test_trace_simulation(self):
+        self.simulator.run()
+        summary = self.tracer.summary()
+        for name in ["tick", "generate_agents", "clone_agents", "allocate", "payments", "rollback", "commit", "astar"]:
+            self.assertIn(name, summary["spans"])
+        self.assertEqual(3, summary["spans"]["allocate"]["count"])
+        self.assertGreaterEqual(summary["spans"]["astar"]["count"], 3)
+        self.assertEqual(summary["spans"]["astar"]["count"], summary["counters"]["astar_searches"])
+        self.assertGreater(summary["counters"]["astar_expansions"], 0)
+        self.assertGreater(summary["counters"]["path_validity_checks"], 0)
+        self.assertGreater(summary["counters"]["reservation_queries"], 0)
+
+        counter_events = [event for event in self.tracer.events if event["ph"] == "C"]
+        self.assertEqual(self.tracer.span_totals["tick"][0], len(counter_events))
+        self.assertEqual(summary["counters"]["astar_searches"],
+                         sum([event["args"].get("astar_searches", 0) for event in counter_events]))
+
+    def test_export(self):
+        self.simulator.run()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.json")
+            self.tracer.export(path)
+            with open(path) as f:
+                trace = json.load(f)
+        self.assertEqual(len(self.tracer.events), len(trace["traceEvents"]))
+        ticks = [event for event in trace["traceEvents"] if event["name"] == "tick"]
+        allocations = [event for event in trace["traceEvents"] if event["name"] == "allocate"]
+        self.assertEqual([2, 3, 4], [tick["args"]["tick"] for tick in ticks[:3]])
+        for allocation in allocations:
+            self.assertTrue(any(tick["ts"] <= allocation["ts"] and
+                                allocation["ts"] + allocation["dur"] <= tick["ts"] + tick["dur"] for tick in ticks))
+
+    def test_max_events(self):
+        tracer = Tracer(max_events=2)
+        for _ in range(3):
+            with tracer.span("a"):
+                pass
+        self.assertEqual(2, len(tracer.events))
+        self.assertEqual(3, tracer.summary()["spans"]["a"]["count"])
+
+    def test_no_tracer(self):
+        with span(None, "a"):
+            pass
+        self.env.tracer = None
+        self.env.trace_count("rtree_queries")
+        self.simulator.run()
+        self.assertEqual(0, len(self.tracer.events))